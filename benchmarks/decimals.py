@@ -0,0 +1,117 @@
+"""Compares converting numbers to Decimal with `to_decimal` against the
+previous replace-and-try conversion - for the amounts alone, and for
+transforming money-heavy streams' records with PrecisionSafeTransformer
+
+Usage: python -m benchmarks.decimals [--values N] [--records N] [--repeat N]
+"""
+from typing import Any, Callable, List
+import argparse
+import random
+import time
+from copy import deepcopy
+from decimal import Decimal
+from singer.metadata import to_map
+from tap_ordway import discover
+from tap_ordway.transformers.base import PrecisionSafeTransformer, transformer_prehook
+from tap_ordway.transformers.decimals import to_decimal
+from .transform import sample_value, time_transformer
+
+STREAMS = ["invoices", "payments", "credits", "refunds"]
+
+# Amounts as Ordway returns them, and as they're passed in by other callers
+AMOUNTS = {
+    "plain": ["1234.50", "0.10", "-42", "99"],
+    "grouped": ["1,234.50", "12,000", "-1,000,000.01"],
+    "missing": ["", "-", None],
+    "int": [0, 42, 1000],
+    "float": [0.1, 2.5, 1e6],
+}
+
+
+def legacy_to_decimal(data: Any) -> Any:
+    if isinstance(data, str):
+        data = data.replace(",", "")
+
+    try:
+        return Decimal(data)
+    except:  # pylint: disable=bare-except
+        return None
+
+
+class LegacyPrecisionSafeTransformer(PrecisionSafeTransformer):
+    """ PrecisionSafeTransformer as it converted numbers previously """
+
+    def _transform(self, data, typ, schema, path):
+        if typ == "number":
+            if self.pre_hook:
+                data = self.pre_hook(data, typ, schema)
+
+            value = legacy_to_decimal(data)
+
+            return value is not None, value
+
+        return super()._transform(data, typ, schema, path)
+
+
+def time_conversion(convert: Callable[[Any], Any], values: List[Any], repeat: int):
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in values:
+            convert(value)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--values", type=int, default=100000)
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+
+    print(f"{'amounts':<22}{'legacy val/s':>16}{'to_decimal val/s':>18}{'speedup':>10}")
+
+    for kind, amounts in AMOUNTS.items():
+        values = [rng.choice(amounts) for _ in range(args.values)]
+        legacy = time_conversion(legacy_to_decimal, values, args.repeat)
+        fast = time_conversion(to_decimal, values, args.repeat)
+
+        print(
+            f"{kind:<22}{args.values / legacy:>16,.0f}"
+            f"{args.values / fast:>18,.0f}{legacy / fast:>9.1f}x"
+        )
+
+    print(f"\n{'stream':<22}{'legacy rec/s':>16}{'to_decimal rec/s':>18}{'speedup':>10}")
+
+    catalog_entries = {entry.tap_stream_id: entry for entry in discover().streams}
+
+    for tap_stream_id in STREAMS:
+        catalog_entry = catalog_entries[tap_stream_id]
+        schema = catalog_entry.schema.to_dict()
+        metadata = to_map(catalog_entry.metadata)
+        records = [sample_value(schema, rng) for _ in range(args.records)]
+
+        legacy = time_transformer(
+            LegacyPrecisionSafeTransformer,
+            deepcopy(records),
+            schema,
+            metadata,
+            args.repeat,
+        )
+        fast = time_transformer(
+            PrecisionSafeTransformer, records, schema, metadata, args.repeat
+        )
+
+        print(
+            f"{tap_stream_id:<22}{args.records / legacy:>16,.0f}"
+            f"{args.records / fast:>18,.0f}{legacy / fast:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
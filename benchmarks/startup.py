@@ -0,0 +1,164 @@
+"""Measures the tap's launch path - importing it, then `main()` and its
+argument parsing, up to the first request of a sync - with the request itself
+intercepted, so no network is involved
+
+`import` and `first_request` are timed in the launched interpreter from its
+first statement, so leave out the interpreter's own startup. `process` is
+timed by the benchmark, from spawning the interpreter until it exits.
+
+Usage: python -m benchmarks.startup [--repeat N] [--stream ID] [--top N]
+"""
+from typing import Dict, List
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from tempfile import TemporaryDirectory
+from singer import metadata
+from tap_ordway import discover
+
+# Run in a fresh interpreter for each launch, timing from its first statement -
+# after the interpreter itself has started
+LAUNCH_SCRIPT = """
+import json, os, sys, time
+started = time.perf_counter()
+import tap_ordway
+from tap_ordway.api.base import RequestHandler
+imported = time.perf_counter()
+
+result_path = sys.argv[1]
+
+def first_request(*_):
+    with open(result_path, "w") as file:
+        json.dump(
+            {
+                "import": imported - started,
+                "first_request": time.perf_counter() - started,
+            },
+            file,
+        )
+    os._exit(0)
+
+RequestHandler._get = first_request
+sys.argv = ["tap-ordway", "--config", sys.argv[2], "--catalog", sys.argv[3]]
+tap_ordway.main()
+sys.exit("The sync finished without making a request")
+"""
+
+
+def write_inputs(directory: str, stream: str) -> List[str]:
+    """ Writes the launches' config and a catalog selecting only `stream` """
+
+    config = {
+        "company": "Acme",
+        "api_key": "key",
+        "user_email": "user@example.com",
+        "user_token": "token",
+        "start_date": "2021-01-01T00:00:00Z",
+    }
+
+    catalog = discover()
+
+    for entry in catalog.streams:
+        if entry.tap_stream_id == stream:
+            mdata = metadata.to_map(entry.metadata)
+            entry.metadata = metadata.to_list(
+                metadata.write(mdata, (), "selected", True)
+            )
+
+    paths = [os.path.join(directory, name) for name in ["config.json", "catalog.json"]]
+
+    for path, obj in zip(paths, [config, catalog.to_dict()]):
+        with open(path, "w") as file:
+            json.dump(obj, file)
+
+    return paths
+
+
+def launch(directory: str, inputs: List[str]) -> Dict[str, float]:
+    result_path = os.path.join(directory, "result.json")
+    started = time.perf_counter()
+
+    subprocess.run(
+        [sys.executable, "-c", LAUNCH_SCRIPT, result_path, *inputs],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=True,
+    )
+
+    timings = {"process": time.perf_counter() - started}
+
+    with open(result_path) as file:
+        timings.update(json.load(file))
+
+    return timings
+
+
+def print_slowest_imports(inputs: List[str], directory: str, top: int) -> None:
+    """ Prints the modules taking the longest to import, themselves included """
+
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            LAUNCH_SCRIPT,
+            os.path.join(directory, "result.json"),
+            *inputs,
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    imports = []
+
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, module = line.split("|")
+        imports.append((int(cumulative), module.strip()))
+
+    print(f"\n{'module':<48}{'cumulative ms':>16}")
+
+    for cumulative, module in sorted(imports, reverse=True)[:top]:
+        print(f"{module:<48}{cumulative / 1000:>16.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--stream", default="invoices")
+    parser.add_argument(
+        "--top", type=int, default=0, help="Also list the N slowest imports"
+    )
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as directory:
+        inputs = write_inputs(directory, args.stream)
+
+        # Warms up the bytecode and filesystem caches
+        launch(directory, inputs)
+
+        runs = [launch(directory, inputs) for _ in range(args.repeat)]
+
+        print(f"{'phase':<16}{'median ms':>12}{'min ms':>12}")
+
+        for phase in ["import", "first_request", "process"]:
+            seconds = [run[phase] for run in runs]
+            print(
+                f"{phase:<16}{statistics.median(seconds) * 1000:>12.1f}"
+                f"{min(seconds) * 1000:>12.1f}"
+            )
+
+        if args.top:
+            print_slowest_imports(inputs, directory, args.top)
+
+
+if __name__ == "__main__":
+    main()
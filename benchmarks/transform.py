@@ -0,0 +1,136 @@
+"""Compares the throughput of PrecisionSafeTransformer and
+CompiledSchemaTransformer - per record and per page - for every stream's schema
+
+Usage: python -m benchmarks.transform [--records N] [--repeat N] [--page-size N]
+"""
+from typing import Any, Dict, List, Optional
+import argparse
+import random
+import time
+from copy import deepcopy
+from singer.metadata import to_map
+from tap_ordway import discover
+from tap_ordway.transformers.base import (
+    CompiledSchemaTransformer,
+    PrecisionSafeTransformer,
+    transformer_prehook,
+)
+
+# API-like values - with the empty ones handled by transformer_prehook only
+# used for nullable properties
+SAMPLE_VALUES = {
+    "string": ["INV-0001", "Sirius Cybernetics Corp", "USD"],
+    "number": ["1,234.50", "0.10", "42"],
+    "integer": ["1", "1,000"],
+    "boolean": [True, False, "false"],
+    "date-time": ["2020-11-14", "2020-11-14T05:59:48.842000Z"],
+}
+EMPTY_VALUES = ["", "-", None]
+
+
+def sample_value(schema: Dict[str, Any], rng: random.Random) -> Any:
+    if "anyOf" in schema:
+        return sample_value(rng.choice(schema["anyOf"]), rng)
+
+    types = schema.get("type", "string")
+    types = types if isinstance(types, list) else [types]
+
+    if "null" in types and rng.random() < 0.2:
+        # "-" isn't a date, so it'd only be logged as a failed parse
+        if schema.get("format") == "date-time":
+            return rng.choice(["", None])
+
+        return rng.choice(EMPTY_VALUES)
+
+    typ = rng.choice([typ for typ in types if typ != "null"] or ["null"])
+
+    if typ == "object":
+        return {
+            key: sample_value(subschema, rng)
+            for key, subschema in schema.get("properties", {}).items()
+        }
+    if typ == "array":
+        return [sample_value(schema["items"], rng) for _ in range(rng.randint(1, 3))]
+    if typ == "string" and schema.get("format") == "date-time":
+        return rng.choice(SAMPLE_VALUES["date-time"])
+
+    return rng.choice(SAMPLE_VALUES.get(typ, [None]))
+
+
+def time_transformer(
+    transformer_class,
+    records: List[Dict[str, Any]],
+    schema,
+    metadata,
+    repeat: int,
+    page_size: Optional[int] = None,
+) -> float:
+    """Returns the best time taken to transform `records`, in seconds - in
+    pages of `page_size` records if specified
+    """
+
+    best = float("inf")
+
+    for _ in range(repeat):
+        transformer = transformer_class(pre_hook=transformer_prehook)
+        batch = deepcopy(records)
+
+        start = time.perf_counter()
+        if page_size is None:
+            for record in batch:
+                transformer.transform(record, schema, metadata)
+        else:
+            for index in range(0, len(batch), page_size):
+                transformer.transform_batch(
+                    batch[index : index + page_size], schema, metadata
+                )
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+
+    print(
+        f"{'stream':<22}{'generic rec/s':>16}{'compiled rec/s':>16}"
+        f"{'batch rec/s':>16}{'speedup':>10}"
+    )
+
+    for catalog_entry in sorted(discover().streams, key=lambda s: s.tap_stream_id):
+        schema = catalog_entry.schema.to_dict()
+        metadata = to_map(catalog_entry.metadata)
+        records = [sample_value(schema, rng) for _ in range(args.records)]
+
+        generic = time_transformer(
+            PrecisionSafeTransformer, records, schema, metadata, args.repeat
+        )
+        compiled = time_transformer(
+            CompiledSchemaTransformer, records, schema, metadata, args.repeat
+        )
+        batched = time_transformer(
+            CompiledSchemaTransformer,
+            records,
+            schema,
+            metadata,
+            args.repeat,
+            args.page_size,
+        )
+
+        print(
+            f"{catalog_entry.tap_stream_id:<22}"
+            f"{args.records / generic:>16,.0f}"
+            f"{args.records / compiled:>16,.0f}"
+            f"{args.records / batched:>16,.0f}"
+            f"{generic / batched:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
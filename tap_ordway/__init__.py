@@ -1,22 +1,57 @@
 #!/usr/bin/env python3
-from typing import TYPE_CHECKING, Any, Dict, Optional, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ContextManager,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
 import json
 import os
+import sys
+from argparse import ArgumentParser, Namespace
+from contextlib import ExitStack, nullcontext
 from _datetime import datetime
 from singer import get_logger
 from singer.bookmarks import set_currently_syncing, write_bookmark
 from singer.catalog import Catalog, CatalogEntry
-from singer.messages import write_schema, write_state
 from singer.schema import Schema
-from singer.utils import handle_top_exception, parse_args, strptime_to_utc
+from singer.utils import check_config, handle_top_exception, parse_args
 import tap_ordway.configs as TAP_CONFIG
+from .__version__ import __version__
 from .api.consts import DEFAULT_API_VERSION
+from .bookmarks import (
+    DEFAULT_CHECKPOINT_RECORDS,
+    BookmarkTracker,
+    get_bookmark_tracker,
+)
+from .catalog import (
+    get_discovery_key,
+    index_catalog,
+    read_cached_catalog,
+    write_cached_catalog,
+)
+from .companies import (
+    check_companies,
+    get_api_credentials,
+    get_company_configs,
+    get_company_directory,
+    get_company_path,
+    use_company,
+)
+from .datetimes import log_cache_metrics, parse_datetime
 from .property import (
     get_key_properties,
     get_replication_key,
     get_replication_method,
     get_stream_metadata,
 )
+from .scheduler import StreamScheduler, get_resumed_streams
+from .stats import RunStats, SyncProgress, load_run_stats
 from .streams import AVAILABLE_STREAMS, check_dependency_conflicts, is_substream
 from .utils import (
     get_filter_datetime,
@@ -24,11 +59,20 @@ from .utils import (
     is_first_run,
     print_record,
     write_activate_version,
+    write_schema,
+    write_state,
 )
 
+# Modules only needed by some modes - planning, sharding, deduplicating,
+# tracking FULL_TABLE streams or writing messages other than to stdout - are
+# imported where they're used, so launching the tap doesn't import them all
+
 if TYPE_CHECKING:
     from .base import DataContext
+    from .dedupe import RecordDeduplicator
+    from .shards import Shard
     from .streams.base import Stream, Substream
+    from .tracking import FullTableTracker
 
 
 REQUIRED_CONFIG_KEYS = [
@@ -38,6 +82,8 @@ REQUIRED_CONFIG_KEYS = [
     "user_token",
     "start_date",
 ]
+# The credentials may instead be set by each of `companies`
+REQUIRED_MULTI_COMPANY_CONFIG_KEYS = ["companies", "start_date"]
 LOGGER = get_logger()
 
 
@@ -82,6 +128,39 @@ def discover() -> Catalog:
     return Catalog(streams)
 
 
+def get_discovered_catalog() -> Catalog:
+    """Discovers the catalog - or reads it from `discovery_cache_path`, when
+    it was cached by the same version of the tap with the same schemas and
+    metadata-generating code
+    """
+
+    if TAP_CONFIG.discovery_cache_path is None:
+        return discover()
+
+    key = get_discovery_key(
+        __version__,
+        [
+            _get_abs_path(path)
+            for path in [
+                "schemas",
+                # discover and load_schemas
+                "__init__.py",
+                "property.py",
+                os.path.join("streams", "__init__.py"),
+                os.path.join("streams", "base.py"),
+                os.path.join("streams", "definitions.py"),
+            ]
+        ],
+    )
+    catalog = read_cached_catalog(TAP_CONFIG.discovery_cache_path, key)
+
+    if catalog is None:
+        catalog = discover()
+        write_cached_catalog(TAP_CONFIG.discovery_cache_path, key, catalog)
+
+    return catalog
+
+
 def filter_record(record: Dict[str, Any], context: "DataContext") -> bool:
     """Filter hook for ensuring records are less than filter_datetime for
     streams that don't support filtering by updated_date via Ordway's API
@@ -97,7 +176,7 @@ def filter_record(record: Dict[str, Any], context: "DataContext") -> bool:
 
         return False
 
-    if strptime_to_utc(record_updated_date) <= context.filter_datetime:
+    if parse_datetime(record_updated_date) <= context.filter_datetime:
         LOGGER.debug(
             "Skipping record for stream '%s': %s is <= %s",
             context.tap_stream_id,
@@ -113,47 +192,86 @@ def filter_record(record: Dict[str, Any], context: "DataContext") -> bool:
 def handle_record(
     tap_stream_id: str,
     record: Dict[str, Any],
-    stream_def: Union["Stream", "Substream"],
     stream_version: Optional[int],
-    state: Dict[str, Any],
-) -> Dict[str, Any]:
-    """Handles a single record's emission"""
+    bookmark: Optional[BookmarkTracker] = None,
+) -> None:
+    """Handles a single record's emission, advancing the stream's bookmark -
+    only written to the state when it's checkpointed
+    """
 
     print_record(tap_stream_id, record, version=stream_version)
 
-    if not is_substream(stream_def):
-        state = set_currently_syncing(state, tap_stream_id)
-
-    if not stream_def.is_valid_incremental:
-        return state
-
-    replication_key = stream_def.replication_key
+    if bookmark is None:
+        return
 
-    # mypy ignoring is_valid_incremental above
-    bookmark_date = record.get(replication_key)  # type: ignore
+    bookmark_date = record.get(bookmark.replication_key)
 
     if bookmark_date is None:
         LOGGER.warning(
             'State not updated. Replication key "%s" not found in record for stream "%s": %s',
-            replication_key,
+            bookmark.replication_key,
             tap_stream_id,
             record,
         )
 
-        return state
+        return
 
-    LOGGER.debug("Adding bookmark for %s at %s", tap_stream_id, bookmark_date)
+    bookmark.update(bookmark_date)
 
-    state = write_bookmark(
-        state,
-        tap_stream_id,
-        replication_key,
-        bookmark_date,
-    )
 
-    write_state(state)
+def checkpoint_bookmarks(
+    bookmarks: Iterable[Optional[BookmarkTracker]], state: Dict[str, Any]
+) -> bool:
+    """Writes each of the bookmarks that advanced to `state`, returning
+    whether any did
+    """
+
+    # Every bookmark has to be checkpointed, so don't short-circuit
+    checkpointed = [
+        bookmark.checkpoint(state) for bookmark in bookmarks if bookmark is not None
+    ]
+
+    return any(checkpointed)
 
-    return state
+
+def get_stream_version(
+    stream_def: Union["Stream", "Substream"],
+    state: Dict[str, Any],
+    trackers: Sequence["FullTableTracker"] = (),
+) -> Optional[int]:
+    """Determines the table version a stream's records are emitted with -
+    None for INCREMENTAL streams and FULL_TABLE streams whose trackers all
+    allow emitting records without replacing the table
+    """
+
+    if stream_def.is_valid_incremental:
+        return None
+
+    enabled_trackers = [
+        tracker for tracker in trackers if tracker.is_enabled(stream_def)
+    ]
+    # Every tracker has to be started, whether or not a previous one failed
+    started = [tracker.start(stream_def, state) for tracker in enabled_trackers]
+
+    if enabled_trackers and all(started):
+        return None
+
+    for tracker in enabled_trackers:
+        tracker.fall_back(stream_def.tap_stream_id)
+
+    return get_full_table_version()
+
+
+def get_stream_schema(
+    stream_def: Union["Stream", "Substream"],
+    trackers: Sequence["FullTableTracker"] = (),
+) -> Dict[str, Any]:
+    schema = stream_def.schema_dict
+
+    for tracker in trackers:
+        schema = tracker.extend_schema(stream_def, schema)
+
+    return schema
 
 
 _STREAM_DEFS = Dict[str, Union["Stream", "Substream"]]  # pylint: disable=invalid-name
@@ -169,6 +287,7 @@ def prepare_stream(
     catalog: Catalog,
     config: Dict[str, Any],
     state: Dict[str, Any],
+    trackers: Sequence["FullTableTracker"] = (),
 ) -> datetime:
     """Prepares a stream and any of its substreams by instantiating them and
     handling their preliminary Singer messages
@@ -190,18 +309,20 @@ def prepare_stream(
             # ignored type errors below seem to be caused by same issue as
             # https://github.com/python/mypy/issues/8993
             stream_defs[substream_def.tap_stream_id] = substream_def
-            substream_version = get_full_table_version()
+            substream_version = get_stream_version(substream_def, state, trackers)
             stream_versions[substream_def.tap_stream_id] = substream_version
 
             write_schema(
                 stream_name=substream_def.tap_stream_id,
-                schema=substream_def.schema_dict,
+                schema=get_stream_schema(substream_def, trackers),
                 key_properties=substream_def.key_properties,
             )
 
             # All substreams are necessarily FULL_TABLE, so no need to
             # check if they're INCREMENTAL
-            if is_first_run(substream_def.tap_stream_id, state):
+            if substream_version is not None and is_first_run(
+                substream_def.tap_stream_id, state
+            ):
                 write_activate_version(
                     substream_def.tap_stream_id,
                     substream_version,
@@ -214,19 +335,15 @@ def prepare_stream(
 
     write_schema(
         stream_name=stream_def.tap_stream_id,
-        schema=stream_def.schema_dict,
+        schema=get_stream_schema(stream_def, trackers),
         key_properties=stream_def.key_properties,
     )
 
     filter_datetime = get_filter_datetime(stream_def, config["start_date"], state)
-    stream_version = (
-        None if stream_def.is_valid_incremental else get_full_table_version()
-    )
+    stream_version = get_stream_version(stream_def, state, trackers)
     stream_versions[stream_def.tap_stream_id] = stream_version
 
-    if not stream_def.is_valid_incremental and is_first_run(
-        stream_def.tap_stream_id, state
-    ):
+    if stream_version is not None and is_first_run(stream_def.tap_stream_id, state):
         write_activate_version(
             stream_def.tap_stream_id,
             stream_version,
@@ -238,54 +355,166 @@ def prepare_stream(
     return filter_datetime
 
 
-def sync(config: Dict[str, Any], state: Dict[str, Any], catalog: Catalog) -> None:
-    # For looking up Catalog-configured streams more efficiently
-    # later Singer stores catalog entries as a list and iterates
-    # over it with .get_stream()
-    stream_defs: Dict[str, Union["Stream", "Substream"]] = {}
-    stream_versions: Dict[str, Optional[int]] = {}
+def get_trackers() -> List["FullTableTracker"]:
+    """ Instantiates the configured FULL_TABLE trackers """
 
-    check_dependency_conflicts(catalog)
+    trackers: List["FullTableTracker"] = []
 
-    for stream in catalog.get_selected_streams(state):
-        if is_substream(AVAILABLE_STREAMS[stream.tap_stream_id]):
-            LOGGER.info(
-                'Skipping substream "%s" until parent stream is reached',
-                stream.tap_stream_id,
+    # Each company synced in the same process keeps its own stores
+    if TAP_CONFIG.fingerprint_dir is not None:
+        from .fingerprints import ChangeDetection  # pylint: disable=import-outside-toplevel
+
+        trackers.append(
+            ChangeDetection(
+                get_company_directory(TAP_CONFIG.fingerprint_dir),
+                TAP_CONFIG.fingerprint_streams,
             )
+        )
+    if TAP_CONFIG.deleted_keys_dir is not None:
+        from .deletions import DeletionDetection  # pylint: disable=import-outside-toplevel
 
-            continue
+        trackers.append(
+            DeletionDetection(
+                get_company_directory(TAP_CONFIG.deleted_keys_dir),
+                TAP_CONFIG.deleted_keys_streams,
+            )
+        )
 
-        LOGGER.info("Syncing stream: %s", stream.tap_stream_id)
+    return trackers
+
+
+def get_run_stats() -> Optional[RunStats]:
+    """ Loads the configured run statistics - kept per company """
+
+    if TAP_CONFIG.run_stats_path is None:
+        return None
+
+    return load_run_stats(get_company_path(TAP_CONFIG.run_stats_path))
+
+
+# pylint: disable=too-many-locals
+def sync_stream(
+    tap_stream_id: str,
+    catalog: Catalog,
+    config: Dict[str, Any],
+    state: Dict[str, Any],
+    trackers: Sequence["FullTableTracker"] = (),
+    lock: Optional[ContextManager] = None,
+    progress: Optional[SyncProgress] = None,
+) -> Dict[str, Any]:
+    """Syncs a top-level stream along with its substreams - holding `lock`,
+    if any, while emitting messages or changing `state` or `progress`
+    """
+
+    # For looking up Catalog-configured streams more efficiently
+    # later Singer stores catalog entries as a list and iterates
+    # over it with .get_stream()
+    stream_defs: _STREAM_DEFS = {}
+    stream_versions: _STREAM_VERSIONS = {}
+    emitting = nullcontext() if lock is None else lock
+    record_count = 0
+
+    LOGGER.info("Syncing stream: %s", tap_stream_id)
+
+    with emitting:
+        if progress is not None:
+            progress.start(tap_stream_id)
 
         filter_datetime = prepare_stream(
-            stream.tap_stream_id, stream_defs, stream_versions, catalog, config, state
+            tap_stream_id,
+            stream_defs,
+            stream_versions,
+            catalog,
+            config,
+            state,
+            trackers,
         )
-        stream_def = stream_defs[stream.tap_stream_id]
 
-        LOGGER.info("Querying since: %s", filter_datetime)
+        # Streams synced concurrently - holding the scheduler's lock - are
+        # tracked by the scheduler instead
+        if lock is None:
+            state = set_currently_syncing(state, tap_stream_id)
 
-        for tap_stream_id, record in stream_def.sync(filter_datetime):  # type: ignore
-            state = handle_record(
-                tap_stream_id,
-                record,
-                stream_defs[tap_stream_id],
-                stream_versions[tap_stream_id],
-                state,
+    stream_def = stream_defs[tap_stream_id]
+    bookmarks = {
+        synced_stream_id: get_bookmark_tracker(synced_def, state)
+        for synced_stream_id, synced_def in stream_defs.items()
+    }
+    checkpoint_records = (
+        TAP_CONFIG.state_checkpoint_records or DEFAULT_CHECKPOINT_RECORDS
+    )
+    emitted_count = 0
+
+    LOGGER.info("Querying since: %s", filter_datetime)
+
+    with ExitStack() as stack:
+        deduplicator: Optional["RecordDeduplicator"] = None
+
+        if TAP_CONFIG.deduplicate_records:
+            from .dedupe import (  # pylint: disable=import-outside-toplevel
+                DEFAULT_MAX_MEMORY_BYTES,
+                RecordDeduplicator,
+            )
+
+            deduplicator = stack.enter_context(
+                RecordDeduplicator(
+                    TAP_CONFIG.deduplicate_max_memory_bytes
+                    or DEFAULT_MAX_MEMORY_BYTES,
+                    TAP_CONFIG.deduplicate_spill_dir,
+                )
             )
 
+        for record_stream_id, record in stream_def.sync(filter_datetime):  # type: ignore
+            record_count += 1
+
+            if deduplicator is not None and deduplicator.is_duplicate(
+                record_stream_id, record, stream_defs[record_stream_id]
+            ):
+                continue
+
+            # Every tracker has to see every record, so don't short-circuit
+            emit = [
+                tracker.should_emit(record_stream_id, record) for tracker in trackers
+            ]
+            if not all(emit):
+                continue
+
+            with emitting:
+                handle_record(
+                    record_stream_id,
+                    record,
+                    stream_versions[record_stream_id],
+                    bookmarks[record_stream_id],
+                )
+
+                emitted_count += 1
+                if emitted_count % checkpoint_records == 0 and checkpoint_bookmarks(
+                    bookmarks.values(), state
+                ):
+                    write_state(state)
+
+    with emitting:
+        for tracker in trackers:
+            tracker.emit(stream_versions)
+
+        checkpoint_bookmarks(bookmarks.values(), state)
         write_state(state)
 
+        # Only once the STATE following the trackers' records is written
+        for tracker in trackers:
+            tracker.commit()
+
         for substream_def in stream_def.substreams:  # type: ignore
             if not substream_def.is_selected:
                 continue
 
-            # All substreams are necessarily FULL_TABLE and thus have a version,
-            # so write their ACTIVATE_VERSION messages without check.
-            write_activate_version(
-                substream_def.tap_stream_id,
-                stream_versions[substream_def.tap_stream_id],
-            )
+            # All substreams are necessarily FULL_TABLE, but only have a
+            # version when all of their records were emitted.
+            if stream_versions[substream_def.tap_stream_id] is not None:
+                write_activate_version(
+                    substream_def.tap_stream_id,
+                    stream_versions[substream_def.tap_stream_id],
+                )
 
         if stream_versions[stream_def.tap_stream_id] is not None:
             write_activate_version(
@@ -293,24 +522,92 @@ def sync(config: Dict[str, Any], state: Dict[str, Any], catalog: Catalog) -> Non
                 stream_versions[stream_def.tap_stream_id],
             )
 
+        if progress is not None:
+            progress.finish(
+                tap_stream_id,
+                sum(synced_def.page_count for synced_def in stream_defs.values()),
+                record_count,
+            )
+
+    return state
+
+
+def sync(config: Dict[str, Any], state: Dict[str, Any], catalog: Catalog) -> None:
+    # Every stream looks up its entry, selection and metadata in the catalog
+    catalog = index_catalog(catalog)
+    check_dependency_conflicts(catalog)
+
+    tap_stream_ids: List[str] = []
+
+    for stream in get_resumed_streams(catalog, state):
+        if is_substream(AVAILABLE_STREAMS[stream.tap_stream_id]):
+            LOGGER.info(
+                'Skipping substream "%s" until parent stream is reached',
+                stream.tap_stream_id,
+            )
+
+            continue
+
+        tap_stream_ids.append(stream.tap_stream_id)
+
+    concurrency = TAP_CONFIG.stream_concurrency or 1
+    run_stats = get_run_stats()
+
+    if run_stats is not None and concurrency > 1:
+        # The longest streams would otherwise dominate the sync when started
+        # last. Streams being synced when a sync was interrupted still resume
+        # first.
+        currently_syncing = state.get("currently_syncing")
+        tap_stream_ids = run_stats.order_longest_first(
+            tap_stream_ids,
+            currently_syncing if isinstance(currently_syncing, list) else (),
+        )
+
+    progress = SyncProgress(run_stats, tap_stream_ids, concurrency)
+    progress.log_estimate()
+
+    if concurrency > 1 and len(tap_stream_ids) > 1:
+        scheduler = StreamScheduler(concurrency)
+
+        # Each stream gets its own trackers, so committing them only
+        # finishes tracking the streams they've seen
+        scheduler.run(
+            tap_stream_ids,
+            lambda tap_stream_id: sync_stream(
+                tap_stream_id,
+                catalog,
+                config,
+                state,
+                get_trackers(),
+                scheduler.lock,
+                progress,
+            ),
+            state,
+        )
+    else:
+        trackers = get_trackers()
+
+        for tap_stream_id in tap_stream_ids:
+            state = sync_stream(
+                tap_stream_id, catalog, config, state, trackers, progress=progress
+            )
+
     state = set_currently_syncing(state, None)
     write_state(state)
 
+    log_cache_metrics()
+
 
 def set_global_config(config: Dict[str, Any]) -> None:
     """Sets global configuration variables"""
 
     # Set global configuration variables
-    TAP_CONFIG.api_credentials = {
-        "company": config["company"],
-        "api_key": config["api_key"],
-        "user_email": config["user_email"],
-        "user_token": config["user_token"],
-    }
+    TAP_CONFIG.companies = config.get("companies") or None
 
-    company_token = config.get("company_token")
-    if company_token is not None:
-        TAP_CONFIG.api_credentials["company_token"] = company_token
+    if TAP_CONFIG.companies is None:
+        TAP_CONFIG.api_credentials = get_api_credentials(config)
+    else:
+        check_companies(config)
 
     TAP_CONFIG.api_version = config.get("api_version", DEFAULT_API_VERSION)
     TAP_CONFIG.staging = config.get("staging", False)
@@ -326,28 +623,282 @@ def set_global_config(config: Dict[str, Any]) -> None:
             "`rate_limit_rps` must be set to `null` or a number GREATER THAN 0"
         )
 
+    TAP_CONFIG.writer_thread = config.get("writer_thread", False)
+    TAP_CONFIG.writer_max_queue_bytes = config.get("writer_max_queue_bytes")
+
+    if (
+        TAP_CONFIG.writer_max_queue_bytes is not None
+        and TAP_CONFIG.writer_max_queue_bytes <= 0
+    ):
+        raise ValueError(
+            "`writer_max_queue_bytes` must be set to `null` or a number GREATER THAN 0"
+        )
+
+    TAP_CONFIG.sink_dir = config.get("sink_dir")
+    TAP_CONFIG.sink_compression = config.get("sink_compression")
+    TAP_CONFIG.sink_shard_max_records = config.get("sink_shard_max_records")
+
+    TAP_CONFIG.deduplicate_records = config.get("deduplicate_records", False)
+    TAP_CONFIG.deduplicate_max_memory_bytes = config.get(
+        "deduplicate_max_memory_bytes"
+    )
+    TAP_CONFIG.deduplicate_spill_dir = config.get("deduplicate_spill_dir")
+
+    TAP_CONFIG.fingerprint_dir = config.get("fingerprint_dir")
+    TAP_CONFIG.fingerprint_streams = config.get("fingerprint_streams")
+
+    TAP_CONFIG.deleted_keys_dir = config.get("deleted_keys_dir")
+    TAP_CONFIG.deleted_keys_streams = config.get("deleted_keys_streams")
+
+    TAP_CONFIG.compile_schemas = config.get("compile_schemas", True)
+    TAP_CONFIG.discovery_cache_path = config.get("discovery_cache_path")
+
+    TAP_CONFIG.transform_processes = config.get("transform_processes")
+    TAP_CONFIG.transform_process_streams = config.get("transform_process_streams")
+
+    TAP_CONFIG.trusted_streams = config.get("trusted_streams")
+    TAP_CONFIG.trusted_validation_interval = config.get(
+        "trusted_validation_interval", 100
+    )
+
+    TAP_CONFIG.state_checkpoint_records = config.get("state_checkpoint_records")
+
+    if (
+        TAP_CONFIG.state_checkpoint_records is not None
+        and TAP_CONFIG.state_checkpoint_records < 1
+    ):
+        raise ValueError(
+            "`state_checkpoint_records` must be set to `null` or a number GREATER THAN 0"
+        )
+
+    TAP_CONFIG.stream_concurrency = config.get("stream_concurrency")
+    TAP_CONFIG.run_stats_path = config.get("run_stats_path")
+
+    TAP_CONFIG.shard_dir = config.get("shard_dir")
+    TAP_CONFIG.shard_workers = config.get("shard_workers")
+    TAP_CONFIG.shard_windows = config.get("shard_windows")
+    TAP_CONFIG.shard_window_streams = config.get("shard_window_streams")
+
+    if TAP_CONFIG.shard_dir is not None and TAP_CONFIG.companies is not None:
+        raise ValueError("`shard_dir` can't be combined with `companies`")
+
+    if (
+        TAP_CONFIG.stream_concurrency is not None
+        and TAP_CONFIG.stream_concurrency < 1
+    ):
+        raise ValueError(
+            "`stream_concurrency` must be set to `null` or a number GREATER THAN 0"
+        )
+
+
+def enter_output_context(stack: ExitStack) -> None:
+    """Routes Singer messages to the configured destination - a local
+    sink directory, a dedicated writer thread or, by default, stdout
+    """
+
+    if TAP_CONFIG.sink_dir is not None:
+        from .sink import DEFAULT_SHARD_MAX_RECORDS, use_local_sink  # pylint: disable=import-outside-toplevel
+
+        stack.enter_context(
+            use_local_sink(
+                TAP_CONFIG.sink_dir,
+                TAP_CONFIG.sink_compression,
+                TAP_CONFIG.sink_shard_max_records or DEFAULT_SHARD_MAX_RECORDS,
+            )
+        )
+    elif TAP_CONFIG.writer_thread:
+        from .writer import DEFAULT_MAX_QUEUE_BYTES, use_message_writer  # pylint: disable=import-outside-toplevel
+
+        stack.enter_context(
+            use_message_writer(
+                TAP_CONFIG.writer_max_queue_bytes or DEFAULT_MAX_QUEUE_BYTES
+            )
+        )
+
+
+def sync_shard(
+    shard: "Shard", config: Dict[str, Any], catalog: Catalog
+) -> Dict[str, Any]:
+    """ Syncs a shard's stream, returning its final state """
+
+    state = sync_stream(
+        shard.tap_stream_id, catalog, config, shard.state, get_trackers()
+    )
+
+    return set_currently_syncing(state, None)
+
+
+def run_shard_worker(
+    config: Dict[str, Any], catalog_dict: Dict[str, Any], shard_dir: str
+) -> None:
+    """Syncs the shards of a coordinated sync - in a process spawned by the
+    coordinator, or one started with `--shard-worker` on a node sharing
+    `shard_dir`
+    """
+
+    set_global_config(config)
+    # The coordinator's shards can't all update the same statistics
+    TAP_CONFIG.run_stats_path = None
+
+    catalog = index_catalog(Catalog.from_dict(catalog_dict))
+    TAP_CONFIG.catalog = catalog
+
+    from .shards import run_worker  # pylint: disable=import-outside-toplevel
+
+    run_worker(shard_dir, lambda shard: sync_shard(shard, config, catalog))
+
+
+def sync_sharded(
+    config: Dict[str, Any], state: Dict[str, Any], catalog: Catalog
+) -> None:
+    """Splits the selected streams - and time windows of the streams in
+    `shard_window_streams` - into shards synced by worker processes, then
+    writes their messages and merged state
+    """
+
+    from .shards import coordinate, plan_shards  # pylint: disable=import-outside-toplevel
+
+    catalog = index_catalog(catalog)
+    check_dependency_conflicts(catalog)
+
+    # mypy doesn't consider that shard_dir is set in sharded mode
+    shard_dir: str = TAP_CONFIG.shard_dir  # type: ignore
+    processes = (
+        os.cpu_count() or 1
+        if TAP_CONFIG.shard_workers is None
+        else TAP_CONFIG.shard_workers
+    )
+    streams = get_resumed_streams(catalog, state)
+    run_stats = get_run_stats()
+
+    if run_stats is not None:
+        # The longest streams are claimed first
+        positions = {
+            tap_stream_id: position
+            for position, tap_stream_id in enumerate(
+                run_stats.order_longest_first(
+                    stream.tap_stream_id for stream in streams
+                )
+            )
+        }
+        streams.sort(key=lambda stream: positions[stream.tap_stream_id])
+
+    shards = plan_shards(
+        config,
+        state,
+        streams,
+        catalog,
+        TAP_CONFIG.shard_windows or max(processes, 1),
+        TAP_CONFIG.shard_window_streams or (),
+    )
+
+    coordinate(
+        shard_dir,
+        shards,
+        state,
+        run_shard_worker,
+        (config, catalog.to_dict(), shard_dir),
+        processes,
+    )
+
+    log_cache_metrics()
+
+
+def sync_companies(
+    config: Dict[str, Any], state: Dict[str, Any], catalog: Catalog, plan: bool = False
+) -> None:
+    """Syncs - or plans the sync of - each configured company in turn
+
+    Companies synced in the same process share its HTTP sessions, compiled
+    schemas and rate limit, while their streams and state are namespaced.
+    """
+
+    for company_config in get_company_configs(config, state):
+        with use_company(company_config, state) as company_state:
+            if TAP_CONFIG.companies is not None:
+                LOGGER.info("Syncing company: %s", company_config["company"])
+
+            if plan:
+                from .planner import plan_sync, write_report  # pylint: disable=import-outside-toplevel
+
+                write_report(
+                    plan_sync(company_config, company_state, catalog),
+                    title=None
+                    if TAP_CONFIG.companies is None
+                    else company_config["company"],
+                )
+            elif TAP_CONFIG.shard_dir is not None:
+                sync_sharded(company_config, company_state, catalog)
+            else:
+                sync(company_config, company_state, catalog)
+
+    if TAP_CONFIG.companies is not None and not plan:
+        state.pop("currently_syncing_company", None)
+        write_state(state)
+
+
+def parse_tap_args() -> Namespace:
+    """Parses the tap's own flags - `--plan` and `--shard-worker` - removing
+    them from the arguments left for Singer's standard parser
+    """
+
+    parser = ArgumentParser(add_help=False)
+    parser.add_argument("--plan", action="store_true")
+    parser.add_argument("--shard-worker", action="store_true")
+    tap_args, remaining = parser.parse_known_args()
+
+    sys.argv[1:] = remaining
+
+    return tap_args
+
 
 @handle_top_exception(LOGGER)
 def main():
     # Parse command line arguments
-    args = parse_args(REQUIRED_CONFIG_KEYS)
+    tap_args = parse_tap_args()
+    args = parse_args([])
+    check_config(
+        args.config,
+        REQUIRED_MULTI_COMPANY_CONFIG_KEYS
+        if args.config.get("companies")
+        else REQUIRED_CONFIG_KEYS,
+    )
 
     set_global_config(args.config)
 
     # If discover flag was passed, run discovery mode and dump output to stdout
     if args.discover:
-        catalog = discover()
+        catalog = get_discovered_catalog()
         catalog.dump()
     # Otherwise run in sync mode
     else:
         if args.catalog:
             catalog = args.catalog
         else:
-            catalog = discover()
+            catalog = get_discovered_catalog()
 
+        # Indexed once for every company, shard and stream synced from it
+        catalog = index_catalog(catalog)
         TAP_CONFIG.catalog = catalog
 
-        sync(args.config, args.state, catalog)
+        if tap_args.shard_worker:
+            if TAP_CONFIG.shard_dir is None:
+                raise ValueError("`--shard-worker` requires `shard_dir` to be set")
+
+            run_shard_worker(args.config, catalog.to_dict(), TAP_CONFIG.shard_dir)
+
+            return
+
+        # Estimate the sync's requests, without emitting any Singer messages
+        if tap_args.plan:
+            sync_companies(args.config, args.state, catalog, plan=True)
+
+            return
+
+        with ExitStack() as stack:
+            enter_output_context(stack)
+
+            sync_companies(args.config, args.state, catalog)
 
 
 if __name__ == "__main__":
@@ -91,7 +91,18 @@ class RequestHandler:
         self.sort = sort
 
         self._exhausted = False
-        self._session = Session()
+        # Every stream's handler is instantiated when the streams are defined,
+        # so sessions are only created for the streams synced
+        self._session: Optional[Session] = None
+
+    @property
+    def session(self) -> Session:
+        """ The handler's HTTP session, created by its first request """
+
+        if self._session is None:
+            self._session = Session()
+
+        return self._session
 
     @ratelimit
     @backoff_on_exception(expo, RequestException, max_tries=3)
@@ -100,7 +111,7 @@ class RequestHandler:
     ) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
         """ Perform a GET request with Ordway-related headers """
 
-        response = self._session.get(
+        response = self.session.get(
             _get_url(path),
             headers=_get_headers(),
             params=params,
@@ -131,7 +142,7 @@ class RequestHandler:
     def resolve_params(self, context: "DataContext") -> Dict[str, Optional[str]]:
         """ Returns query params to send with the Ordway synchronization request """
 
-        params = {}
+        params: Dict[str, Optional[str]] = {}
 
         if context.stream.is_valid_incremental:
             if self.sort is None:
@@ -141,34 +152,69 @@ class RequestHandler:
                 context.filter_datetime
             )
 
+            # Set when syncing a time window of the stream
+            if TAP_CONFIG.sync_until is not None:
+                params[f"{context.stream.replication_key}<="] = TAP_CONFIG.sync_until
+
             return params
 
         return params
 
-    def fetch(self, context: "DataContext") -> Generator[Dict[str, Any], None, None]:
-        """ Fetches all pages constrained by `resolve_params` """
+    def get_params(self, context: "DataContext") -> "_DEFAULT_QUERY_PARAMS":
+        """ The query params of the first page constrained by `resolve_params` """
 
-        self._exhausted = False
-
-        default_params: "_DEFAULT_QUERY_PARAMS" = {
+        params: "_DEFAULT_QUERY_PARAMS" = {
             "sort": self.sort,
             "size": self.page_size,
             "page": 1,
         }
-        default_params.update(self.resolve_params(context))  # type: ignore
+        params.update(self.resolve_params(context))  # type: ignore
 
-        endpoint = self.resolve_endpoint(context)
+        return params
 
-        while not self._exhausted:
-            with http_request_timer(endpoint=endpoint):
-                results = self._get(endpoint, default_params)
+    def _get_page(
+        self, endpoint: str, params: "_DEFAULT_QUERY_PARAMS"
+    ) -> List[Dict[str, Any]]:
+        with http_request_timer(endpoint=endpoint):
+            results = self._get(endpoint, params)  # type: ignore
+
+        return [results] if isinstance(results, dict) else results
+
+    def fetch_page(
+        self, context: "DataContext", page: int, size: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """ Fetches a single page - of `size` records, rather than page_size, if set """
 
-            if isinstance(results, dict):
-                results = [results]
+        params = self.get_params(context)
+        params["page"] = page
 
-            yield from results
+        if size is not None:
+            params["size"] = size
+
+        return self._get_page(self.resolve_endpoint(context), params)
+
+    def fetch_pages(
+        self, context: "DataContext"
+    ) -> Generator[List[Dict[str, Any]], None, None]:
+        """ Fetches all pages constrained by `resolve_params` """
+
+        self._exhausted = False
+
+        default_params = self.get_params(context)
+        endpoint = self.resolve_endpoint(context)
+
+        while not self._exhausted:
+            results = self._get_page(endpoint, default_params)
 
             if len(results) == 0:
                 self._exhausted = True
             else:
+                yield results
+
                 default_params["page"] += 1
+
+    def fetch(self, context: "DataContext") -> Generator[Dict[str, Any], None, None]:
+        """ Fetches all records constrained by `resolve_params` """
+
+        for page in self.fetch_pages(context):
+            yield from page
@@ -1,6 +1,7 @@
 from typing import Callable, Deque
 from collections import deque
 from functools import wraps
+from threading import Lock
 from time import sleep, time
 import tap_ordway.configs as TAP_CONFIG
 
@@ -8,6 +9,8 @@ import tap_ordway.configs as TAP_CONFIG
 def ratelimit(func) -> Callable:
     """Decorator for rate limiting requests based on the `rate_limit_rps` property in config"""
     times: Deque[float] = deque()
+    # Streams synced concurrently share the limit, so waiting is serialized
+    lock = Lock()
 
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -16,16 +19,17 @@ def ratelimit(func) -> Callable:
 
         # In effect, user disabled rate limiting
         if limit is not None:
-            if len(times) >= limit:
-                tim0 = times.pop()
-                tim = time()
+            with lock:
+                if len(times) >= limit:
+                    tim0 = times.pop()
+                    tim = time()
 
-                sleep_time = one_second - (tim - tim0)
+                    sleep_time = one_second - (tim - tim0)
 
-                if sleep_time > 0:
-                    sleep(sleep_time)
+                    if sleep_time > 0:
+                        sleep(sleep_time)
 
-            times.appendleft(time())
+                times.appendleft(time())
 
         return func(*args, **kwargs)
 
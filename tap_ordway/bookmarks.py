@@ -0,0 +1,156 @@
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set, Tuple, Union
+from collections import OrderedDict
+from singer import get_logger
+from singer.bookmarks import get_bookmark, write_bookmark
+from .datetimes import parse_datetime
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from .streams.base import Stream, Substream
+
+LOGGER = get_logger()
+
+# Records emitted between writing the bookmarks of a stream to the state
+DEFAULT_CHECKPOINT_RECORDS = 1000
+
+
+class BookmarkTracker:
+    """Tracks an INCREMENTAL stream's greatest replication value in memory,
+    only writing it to the state when checkpointed
+
+    Values are compared as parsed timestamps, so the bookmark never regresses
+    when records aren't sorted by their replication key.
+    """
+
+    def __init__(
+        self, tap_stream_id: str, replication_key: str, state: Dict[str, Any]
+    ):
+        self.tap_stream_id = tap_stream_id
+        self.replication_key = replication_key
+
+        self.value: Optional[str] = get_bookmark(
+            state, tap_stream_id, replication_key
+        )
+        self._latest: Optional["datetime"] = (
+            None if self.value is None else parse_datetime(self.value)
+        )
+        self._checkpointed = self.value
+
+    def update(self, value: str) -> bool:
+        """ Advances the bookmark to `value` if it's later, returning whether it did """
+
+        # Consecutive records often share a replication value
+        if value == self.value:
+            return False
+
+        parsed = parse_datetime(value)
+
+        if self._latest is not None and parsed <= self._latest:
+            return False
+
+        self.value = value
+        self._latest = parsed
+
+        return True
+
+    def checkpoint(self, state: Dict[str, Any]) -> bool:
+        """Writes the bookmark to `state` if it's advanced since the last
+        checkpoint, returning whether it did
+        """
+
+        if self.value is None or self.value == self._checkpointed:
+            return False
+
+        LOGGER.debug("Adding bookmark for %s at %s", self.tap_stream_id, self.value)
+
+        write_bookmark(state, self.tap_stream_id, self.replication_key, self.value)
+        self._checkpointed = self.value
+
+        return True
+
+
+class WatermarkTracker(BookmarkTracker):
+    """Tracks the bookmark of an INCREMENTAL stream whose ranges - such as
+    pages or windows - may finish out of order, only advancing it to the
+    greatest replication value of the contiguous ranges fully emitted
+
+    Ranges are opened in the order of their replication values, so once one
+    fails or is interrupted, the records of the ranges after it are synced
+    again next time rather than skipped.
+    """
+
+    def __init__(
+        self, tap_stream_id: str, replication_key: str, state: Dict[str, Any]
+    ):
+        super().__init__(tap_stream_id, replication_key, state)
+
+        # The greatest value of each range not yet below the watermark, in
+        # the order they were opened
+        self._ranges: Dict[int, Optional[Tuple[str, "datetime"]]] = OrderedDict()
+        self._completed: Set[int] = set()
+        self._opened = 0
+
+    def open_range(self) -> int:
+        """ Opens the range after those already opened, returning its index """
+
+        index = self._opened
+        self._ranges[index] = None
+        self._opened += 1
+
+        return index
+
+    def update_range(self, index: int, value: str) -> None:
+        """ Advances a range's greatest replication value, if `value` is later """
+
+        greatest = self._ranges[index]
+
+        if greatest is not None and value == greatest[0]:
+            return
+
+        parsed = parse_datetime(value)
+
+        if greatest is None or parsed > greatest[1]:
+            self._ranges[index] = (value, parsed)
+
+    def complete_range(self, index: int) -> bool:
+        """Marks a range as fully emitted, returning whether the watermark
+        advanced
+        """
+
+        self._completed.add(index)
+        advanced = False
+        # An OrderedDict, so the first range is the lowest on every Python
+        # Ranges are kept in the order they were opened
+        while self._ranges:
+            lowest = next(iter(self._ranges))
+
+            if lowest not in self._completed:
+                break
+
+            greatest = self._ranges.pop(lowest)
+            self._completed.discard(lowest)
+
+            if greatest is not None:
+                advanced = self.update(greatest[0]) or advanced
+
+        return advanced
+
+    @property
+    def pending_ranges(self) -> int:
+        """ The ranges opened but not yet below the watermark """
+
+        return len(self._ranges)
+
+
+def get_bookmark_tracker(
+    stream_def: Union["Stream", "Substream"], state: Dict[str, Any]
+) -> Optional[BookmarkTracker]:
+    """ A stream's bookmark tracker - None unless it's INCREMENTAL """
+
+    if not stream_def.is_valid_incremental:
+        return None
+
+    # mypy ignoring is_valid_incremental above
+    return BookmarkTracker(
+        stream_def.tap_stream_id, stream_def.replication_key, state  # type: ignore
+    )
@@ -0,0 +1,192 @@
+from typing import Any, Dict, Generator, List, Optional, Sequence
+import hashlib
+import json
+import os
+from singer import get_logger
+from singer.bookmarks import get_currently_syncing
+from singer.catalog import Catalog, CatalogEntry
+from singer.metadata import to_map as mdata_to_map
+from singer.schema import Schema
+from .utils import write_json
+
+LOGGER = get_logger()
+
+
+class LazySchema:
+    """Stands in for the singer Schema of a cached catalog entry - only built
+    from its dict once anything but the dict or its selection is needed
+
+    Its dict is shared rather than copied, so mustn't be modified.
+    """
+
+    def __init__(self, schema_dict: Dict[str, Any]):
+        self.schema_dict = schema_dict
+        self._schema: Optional[Schema] = None
+
+    @property
+    def selected(self) -> Optional[bool]:
+        return self.schema_dict.get("selected")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.schema_dict
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for the attributes of the built Schema
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        if self._schema is None:
+            self._schema = Schema.from_dict(self.schema_dict)
+
+        return getattr(self._schema, name)
+
+
+class IndexedCatalog(Catalog):
+    """A catalog indexing its entries by tap_stream_id, along with their
+    selection and metadata maps - shared by every stream instantiated from it
+
+    singer's Catalog scans its entries for each lookup and maps an entry's
+    metadata each time its selection is checked. Entries aren't expected to
+    change once indexed.
+    """
+
+    def __init__(self, streams: List[CatalogEntry]):
+        super().__init__(streams)
+
+        self._entries: Dict[str, CatalogEntry] = {}
+        self._metadata_maps: Dict[str, Dict[Any, Any]] = {}
+        self._selected: Dict[str, bool] = {}
+        self._schema_dicts: Dict[str, Dict[str, Any]] = {}
+
+        for entry in streams:
+            # Like singer's Catalog, the first entry of a stream wins
+            if entry.tap_stream_id in self._entries:
+                continue
+
+            mapped_metadata = mdata_to_map(entry.metadata or [])
+
+            self._entries[entry.tap_stream_id] = entry
+            self._metadata_maps[entry.tap_stream_id] = mapped_metadata
+            self._selected[entry.tap_stream_id] = bool(
+                (entry.schema is not None and entry.schema.selected)
+                or mapped_metadata.get((), {}).get("selected")
+            )
+
+    def get_stream(self, tap_stream_id: str) -> Optional[CatalogEntry]:
+        return self._entries.get(tap_stream_id)
+
+    def get_entry(self, tap_stream_id: str) -> CatalogEntry:
+        """ Like get_stream, raising a KeyError when the stream isn't in the catalog """
+
+        return self._entries[tap_stream_id]
+
+    def is_stream_selected(self, tap_stream_id: str) -> bool:
+        return self._selected.get(tap_stream_id, False)
+
+    def get_metadata_map(self, tap_stream_id: str) -> Dict[Any, Any]:
+        return self._metadata_maps[tap_stream_id]
+
+    def get_schema_dict(self, tap_stream_id: str) -> Dict[str, Any]:
+        """ A stream's schema as a dict, only converted once it's needed """
+
+        schema_dict = self._schema_dicts.get(tap_stream_id)
+
+        if schema_dict is None:
+            schema_dict = self._entries[tap_stream_id].schema.to_dict()
+            self._schema_dicts[tap_stream_id] = schema_dict
+
+        return schema_dict
+
+    def get_selected_streams(
+        self, state: Dict[str, Any]
+    ) -> Generator[CatalogEntry, None, None]:
+        """ Equivalent to singer's, without checking each entry's metadata """
+
+        streams = self.streams
+        currently_syncing = get_currently_syncing(state)
+
+        if isinstance(currently_syncing, str) and currently_syncing in self._entries:
+            index = streams.index(self._entries[currently_syncing])
+            streams = streams[index:] + streams[:index]
+
+        for stream in streams:
+            if not self._selected[stream.tap_stream_id]:
+                LOGGER.info("Skipping stream: %s", stream.tap_stream_id)
+                continue
+
+            yield stream
+
+
+def index_catalog(catalog: Catalog) -> IndexedCatalog:
+    """Indexes a plain catalog - built once by the sync and shared with every
+    stream instantiated from it
+    """
+
+    if isinstance(catalog, IndexedCatalog):
+        return catalog
+
+    return IndexedCatalog(catalog.streams)
+
+
+def get_discovery_key(version: str, paths: Sequence[str]) -> str:
+    """A hash of the tap's version and the files discovery depends on - its
+    schema files and the modules generating their metadata - identifying the
+    catalog they're discovered as. Directories are hashed file by file.
+    """
+
+    digest = hashlib.sha256(version.encode())
+
+    for path in paths:
+        file_paths = (
+            [os.path.join(path, filename) for filename in sorted(os.listdir(path))]
+            if os.path.isdir(path)
+            else [path]
+        )
+
+        for file_path in file_paths:
+            digest.update(os.path.basename(file_path).encode())
+
+            with open(file_path, "rb") as file:
+                digest.update(file.read())
+
+    return digest.hexdigest()
+
+
+def read_cached_catalog(path: str, key: str) -> Optional[Catalog]:
+    """Reads a discovered catalog cached at `path` - None unless it was
+    cached with `key`. Each entry's schema is only built once it's needed.
+    """
+
+    try:
+        with open(path) as file:
+            cached = json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as err:
+        LOGGER.warning("Ignoring unreadable cached catalog: %s", err)
+        return None
+
+    if not isinstance(cached, dict) or cached.get("key") != key:
+        LOGGER.info("Cached catalog at %s is out of date", path)
+        return None
+
+    return Catalog(
+        [
+            CatalogEntry(
+                tap_stream_id=stream.get("tap_stream_id"),
+                stream=stream.get("stream"),
+                key_properties=stream.get("key_properties"),
+                schema=LazySchema(stream["schema"]),
+                replication_key=stream.get("replication_key"),
+                replication_method=stream.get("replication_method"),
+                metadata=stream.get("metadata"),
+            )
+            for stream in cached["catalog"]["streams"]
+        ]
+    )
+
+
+def write_cached_catalog(path: str, key: str, catalog: Catalog) -> None:
+    """ Atomically caches a discovered catalog with `key` """
+
+    write_json(path, {"key": key, "catalog": catalog.to_dict()})
@@ -0,0 +1,140 @@
+from typing import Any, Dict, Generator, List, NamedTuple
+import os
+from contextlib import contextmanager
+from singer.messages import Message, StateMessage
+import tap_ordway.configs as TAP_CONFIG
+from .utils import get_company_id
+
+# Between a company's ID and the names of its streams
+STREAM_SEPARATOR = "__"
+
+_CREDENTIAL_KEYS = ["company", "api_key", "user_email", "user_token"]
+
+
+class CompanyNamespace(NamedTuple):
+    """Namespaces the Singer messages of one of several companies synced in
+    the same process
+    """
+
+    company_id: str
+    # The state of all companies, the company's own nested under `companies`
+    state: Dict[str, Any]
+
+    def apply(self, message: Message) -> Message:
+        if isinstance(message, StateMessage):
+            return StateMessage(self.state)
+
+        if hasattr(message, "stream"):
+            message.stream = (  # type: ignore
+                f"{self.company_id}{STREAM_SEPARATOR}{message.stream}"  # type: ignore
+            )
+
+        return message
+
+
+def get_api_credentials(config: Dict[str, Any]) -> Dict[str, str]:
+    api_credentials = {key: config[key] for key in _CREDENTIAL_KEYS}
+
+    company_token = config.get("company_token")
+    if company_token is not None:
+        api_credentials["company_token"] = company_token
+
+    return api_credentials
+
+
+def check_companies(config: Dict[str, Any]) -> None:
+    """Ensures each of `companies` has a full set of credentials, whether its
+    own or the top-level config's
+    """
+
+    for company in config["companies"]:
+        missing = [key for key in _CREDENTIAL_KEYS if key not in {**config, **company}]
+
+        if missing:
+            raise ValueError(
+                f"Company {company.get('company')!r} is missing the config keys: "
+                f"{', '.join(missing)}"
+            )
+
+
+def get_company_configs(
+    config: Dict[str, Any], state: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """The config of each company to sync - the top-level config overridden
+    by each of `companies`, if set - resuming from the company an interrupted
+    sync was syncing
+    """
+
+    companies = config.get("companies")
+
+    if not companies:
+        return [config]
+
+    defaults = {key: value for key, value in config.items() if key != "companies"}
+    company_configs = [{**defaults, **company} for company in companies]
+
+    currently_syncing = state.get("currently_syncing_company")
+
+    for index, company_config in enumerate(company_configs):
+        with use_api_credentials(get_api_credentials(company_config)):
+            if get_company_id() == currently_syncing:
+                return company_configs[index:] + company_configs[:index]
+
+    return company_configs
+
+
+def get_company_directory(directory: str) -> str:
+    """ Namespaces a tracker's directory by company when syncing several """
+
+    if TAP_CONFIG.company_namespace is None:
+        return directory
+
+    return os.path.join(directory, TAP_CONFIG.company_namespace.company_id)
+
+
+def get_company_path(path: str) -> str:
+    """ Namespaces a file by company when syncing several """
+
+    directory, file_name = os.path.split(path)
+
+    return os.path.join(get_company_directory(directory), file_name)
+
+
+@contextmanager
+def use_api_credentials(
+    api_credentials: Dict[str, str]
+) -> Generator[None, None, None]:
+    previous = TAP_CONFIG.api_credentials
+    TAP_CONFIG.api_credentials = api_credentials
+
+    try:
+        yield
+    finally:
+        TAP_CONFIG.api_credentials = previous
+
+
+@contextmanager
+def use_company(
+    config: Dict[str, Any], state: Dict[str, Any]
+) -> Generator[Dict[str, Any], None, None]:
+    """Makes requests with a company's credentials, yielding its state
+
+    When syncing multiple companies, the company's stream names are prefixed
+    with its ID and its state is nested under `companies` in `state`.
+    """
+
+    with use_api_credentials(get_api_credentials(config)):
+        if TAP_CONFIG.companies is None:
+            yield state
+            return
+
+        company_id = get_company_id()
+        state["currently_syncing_company"] = company_id
+
+        previous = TAP_CONFIG.company_namespace
+        TAP_CONFIG.company_namespace = CompanyNamespace(company_id, state)
+
+        try:
+            yield state.setdefault("companies", {}).setdefault(company_id, {})
+        finally:
+            TAP_CONFIG.company_namespace = previous
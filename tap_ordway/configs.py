@@ -1,7 +1,10 @@
-from typing import TYPE_CHECKING, Dict, Optional, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
 
 if TYPE_CHECKING:
     from singer.catalog import Catalog
+    from .companies import CompanyNamespace
+    from .sink import LocalSink
+    from .writer import MessageWriter
 
 api_credentials: Dict[str, str] = {}
 kafka_credentials: Dict[str, str] = {}
@@ -11,3 +14,35 @@ staging = False
 api_url: Optional[str] = None
 start_date: str
 rate_limit_rps: Union[int, float, None] = None
+message_writer: Union["MessageWriter", "LocalSink", None] = None
+writer_thread = False
+writer_max_queue_bytes: Optional[int] = None
+sink_dir: Optional[str] = None
+sink_compression: Optional[str] = None
+sink_shard_max_records: Optional[int] = None
+deduplicate_records = False
+deduplicate_max_memory_bytes: Optional[int] = None
+deduplicate_spill_dir: Optional[str] = None
+fingerprint_dir: Optional[str] = None
+fingerprint_streams: Optional[List[str]] = None
+deleted_keys_dir: Optional[str] = None
+deleted_keys_streams: Optional[List[str]] = None
+compile_schemas = True
+discovery_cache_path: Optional[str] = None
+transform_processes: Optional[int] = None
+transform_process_streams: Optional[List[str]] = None
+trusted_streams: Optional[List[str]] = None
+trusted_validation_interval = 100
+state_checkpoint_records: Optional[int] = None
+
+stream_concurrency: Optional[int] = None
+run_stats_path: Optional[str] = None
+
+companies: Optional[List[Dict[str, str]]] = None
+company_namespace: Optional["CompanyNamespace"] = None
+
+shard_dir: Optional[str] = None
+shard_workers: Optional[int] = None
+shard_windows: Optional[int] = None
+shard_window_streams: Optional[List[str]] = None
+sync_until: Optional[str] = None
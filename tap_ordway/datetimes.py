@@ -0,0 +1,131 @@
+from typing import Any, Dict, Optional
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import pytz
+from singer import get_logger
+from singer.metrics import Point
+from singer.metrics import log as log_metric
+from singer.utils import strftime, strptime_to_utc
+
+LOGGER = get_logger()
+
+DATETIME_CACHE_SIZE = 16384
+
+DATETIME_CACHE_HITS = "datetime_cache_hits"
+DATETIME_CACHE_MISSES = "datetime_cache_misses"
+
+# Ordway's dates ("2020-11-10") and timestamps ("2020-10-16T22:51:28.129Z")
+_ISO_DATETIME_RE = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})"
+    r"(?:[T ](\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?)?"
+    r"(Z|[+-]\d{2}:\d{2})?"
+)
+
+
+def _parse_iso_datetime(value: str) -> Optional[datetime]:
+    """Parses the ISO formats Ordway uses - returning None for anything
+    else, or anything dateutil may interpret differently
+    """
+
+    match = _ISO_DATETIME_RE.fullmatch(value)
+
+    if match is None:
+        return None
+
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+
+    try:
+        parsed = datetime(
+            int(year),
+            int(month),
+            int(day),
+            int(hour or 0),
+            int(minute or 0),
+            int(second or 0),
+            int(fraction.ljust(6, "0")) if fraction else 0,
+        )
+    except ValueError:
+        return None
+
+    if offset is None or offset == "Z":
+        return parsed.replace(tzinfo=pytz.UTC)
+
+    sign = -1 if offset[0] == "-" else 1
+    utc_offset = timedelta(hours=int(offset[1:3]), minutes=int(offset[4:6]))
+
+    return parsed.replace(tzinfo=timezone(sign * utc_offset)).astimezone(pytz.UTC)
+
+
+@lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def parse_datetime(value: str) -> datetime:
+    """A cached equivalent of singer's `strptime_to_utc`, which only falls
+    back to dateutil for non-ISO formats
+    """
+
+    parsed = _parse_iso_datetime(value)
+
+    if parsed is None:
+        return strptime_to_utc(value)
+
+    return parsed
+
+
+@lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def format_datetime(value: str) -> str:
+    """ A cached equivalent of `strftime(strptime_to_utc(value))` """
+
+    return strftime(parse_datetime(value))
+
+
+def string_to_datetime(value: Any) -> Optional[str]:
+    """Equivalent of singer's `string_to_datetime` - used to transform
+    date-time properties
+    """
+
+    try:
+        if isinstance(value, str):
+            return format_datetime(value)
+
+        return strftime(strptime_to_utc(value))
+    except Exception as ex:  # pylint: disable=broad-except
+        LOGGER.warning("%s, (%s)", ex, value)
+        return None
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """ Returns the hits, misses and hit rate of each datetime cache """
+
+    stats = {}
+
+    for name, cached in [("parse", parse_datetime), ("format", format_datetime)]:
+        info = cached.cache_info()
+        lookups = info.hits + info.misses
+
+        stats[name] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": info.hits / lookups if lookups else 0.0,
+            "size": info.currsize,
+        }
+
+    return stats
+
+
+def log_cache_metrics() -> None:
+    """ Emits the datetime caches' hits and misses as counter metrics """
+
+    for name, stats in get_cache_stats().items():
+        LOGGER.info(
+            "Datetime %s cache hit rate: %.1f%% (%d hits, %d misses)",
+            name,
+            stats["hit_rate"] * 100,
+            stats["hits"],
+            stats["misses"],
+        )
+
+        for metric, value in [
+            (DATETIME_CACHE_HITS, stats["hits"]),
+            (DATETIME_CACHE_MISSES, stats["misses"]),
+        ]:
+            log_metric(LOGGER, Point("counter", metric, value, {"cache": name}))
@@ -0,0 +1,284 @@
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Sequence, Set, Union
+import mmap
+import os
+from array import array
+from bisect import bisect_left
+from hashlib import blake2b
+from heapq import merge
+from tempfile import mkstemp
+import simplejson
+from singer import get_logger
+from singer.metrics import Point
+from singer.metrics import log as log_metric
+
+if TYPE_CHECKING:
+    from .streams.base import Stream, Substream
+
+LOGGER = get_logger()
+
+DEFAULT_MAX_MEMORY_BYTES = 64 * 1024 * 1024
+
+# Rough per-key footprint of a set of ints, including the set's slot overhead
+_ESTIMATED_BYTES_PER_KEY = 64
+_SPILL_CHUNK_SIZE = 65536
+
+DUPLICATE_RECORD_COUNT = "duplicate_record_count"
+
+# Marks changes to the records of FULL_TABLE streams which have it
+CHANGE_PROPERTY = "updated_date"
+
+
+def hash_key(values: Iterable[Any]) -> int:
+    """Hashes a record's key property values into an unsigned 64-bit integer
+
+    With 64 bits, the odds of two distinct keys colliding stay below one in a
+    million for streams of up to ~6 million records.
+    """
+
+    digest = blake2b(
+        "\x1f".join(repr(value) for value in values).encode("utf-8"), digest_size=8
+    ).digest()
+
+    return int.from_bytes(digest, "little")
+
+
+def hash_record(record: Dict[str, Any]) -> int:
+    """ Hashes a transformed record's contents into an unsigned 64-bit integer """
+
+    serialized = simplejson.dumps(record, sort_keys=True, use_decimal=True)
+    digest = blake2b(serialized.encode("utf-8"), digest_size=8).digest()
+
+    return int.from_bytes(digest, "little")
+
+
+class _SpilledKeys:
+    """ A sorted array of key hashes stored on disk and searched via mmap """
+
+    def __init__(self, directory: Optional[str] = None):
+        self._fd, self.path = mkstemp(prefix="tap-ordway-keys-", dir=directory)
+        self._mmap: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+
+    def __len__(self) -> int:
+        return 0 if self._view is None else len(self._view)
+
+    def __contains__(self, key_hash: int) -> bool:
+        if self._view is None:
+            return False
+
+        index = bisect_left(self._view, key_hash)  # type: ignore
+
+        return index < len(self._view) and self._view[index] == key_hash
+
+    def _unmap(self) -> None:
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def merge(self, key_hashes: Set[int]) -> None:
+        """ Merges `key_hashes` into the sorted on-disk array """
+
+        existing: Iterable[int] = () if self._view is None else iter(self._view)
+        tmp_fd, tmp_path = mkstemp(
+            prefix="tap-ordway-keys-", dir=os.path.dirname(self.path)
+        )
+
+        with os.fdopen(tmp_fd, "wb") as file:
+            chunk = array("Q")
+
+            for key_hash in merge(existing, sorted(key_hashes)):
+                chunk.append(key_hash)
+
+                if len(chunk) >= _SPILL_CHUNK_SIZE:
+                    chunk.tofile(file)
+                    chunk = array("Q")
+
+            chunk.tofile(file)
+
+        self._unmap()
+        os.close(self._fd)
+        os.replace(tmp_path, self.path)
+        self._fd = os.open(self.path, os.O_RDONLY)
+
+        if os.fstat(self._fd).st_size > 0:
+            self._mmap = mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap).cast("Q")
+
+    def close(self) -> None:
+        self._unmap()
+        os.close(self._fd)
+        os.remove(self.path)
+
+
+class KeyDeduplicator:
+    """Tracks the hashed key_properties of the records emitted for a stream,
+    along with a marker of their changes - their `change_property` value if
+    set, otherwise their fingerprint if `fingerprint` - so a copy of a record
+    updated since it was emitted isn't a duplicate, and its update is kept
+
+    Hashes are kept in memory until their estimated size exceeds
+    `max_memory_bytes`, at which point they're merged into a sorted array on
+    disk and looked up by binary search.
+    """
+
+    # pylint: disable=too-many-positional-arguments
+    def __init__(
+        self,
+        key_properties: Sequence[str],
+        max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+        spill_dir: Optional[str] = None,
+        change_property: Optional[str] = None,
+        fingerprint: bool = False,
+    ):
+        self.key_properties = tuple(key_properties)
+        # Without key_properties, no record is a duplicate
+        self.hashed_properties = (
+            self.key_properties
+            if change_property is None
+            or not self.key_properties
+            or change_property in self.key_properties
+            else self.key_properties + (change_property,)
+        )
+        self.fingerprint = change_property is None and fingerprint
+        self.max_keys_in_memory = max(1, max_memory_bytes // _ESTIMATED_BYTES_PER_KEY)
+        self.spill_dir = spill_dir
+
+        self._keys: Set[int] = set()
+        self._spilled: Optional[_SpilledKeys] = None
+
+    def __len__(self) -> int:
+        return len(self._keys) + (0 if self._spilled is None else len(self._spilled))
+
+    def is_duplicate(self, record: Dict[str, Any]) -> bool:
+        """Whether a record with the same key was seen before - records
+        `record`'s key if not
+        """
+
+        if not self.key_properties:
+            return False
+
+        values = [record.get(prop) for prop in self.hashed_properties]
+
+        if self.fingerprint:
+            values.append(hash_record(record))
+
+        key_hash = hash_key(values)
+
+        if key_hash in self._keys or (
+            self._spilled is not None and key_hash in self._spilled
+        ):
+            return True
+
+        self._keys.add(key_hash)
+
+        if len(self._keys) >= self.max_keys_in_memory:
+            self._spill()
+
+        return False
+
+    def _spill(self) -> None:
+        if self._spilled is None:
+            self._spilled = _SpilledKeys(self.spill_dir)
+
+        LOGGER.debug("Spilling %d record keys to %s", len(self._keys), self._spilled.path)
+
+        self._spilled.merge(self._keys)
+        self._keys = set()
+
+    def close(self) -> None:
+        if self._spilled is not None:
+            self._spilled.close()
+            self._spilled = None
+
+        self._keys = set()
+
+
+class RecordDeduplicator:
+    """Suppresses records whose key_properties were already emitted for
+    the same stream during a sync
+
+    Offset pagination re-emits records that move between pages when they're
+    updated mid-sync, so this sits between `Stream.sync` and `handle_record`.
+    Only identical copies are dropped - the later copy of a record updated
+    mid-sync has a newer replication value, so is still emitted. FULL_TABLE
+    streams are deduplicated by `updated_date` where their schema has it,
+    otherwise by each record's fingerprint.
+    The amount of dropped records is emitted as a counter metric per stream.
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+        spill_dir: Optional[str] = None,
+    ):
+        self.max_memory_bytes = max_memory_bytes
+        self.spill_dir = spill_dir
+
+        self.dropped: Dict[str, int] = {}
+
+        self._deduplicators: Dict[str, KeyDeduplicator] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def is_duplicate(
+        self,
+        tap_stream_id: str,
+        record: Dict[str, Any],
+        stream_def: Union["Stream", "Substream"],
+    ) -> bool:
+        if tap_stream_id not in self._deduplicators:
+            change_property = (
+                stream_def.replication_key
+                if stream_def.is_valid_incremental
+                else CHANGE_PROPERTY
+                if CHANGE_PROPERTY in stream_def.schema_dict.get("properties", {})
+                else None
+            )
+
+            self._deduplicators[tap_stream_id] = KeyDeduplicator(
+                stream_def.key_properties,
+                self.max_memory_bytes,
+                self.spill_dir,
+                change_property,
+                fingerprint=True,
+            )
+            self.dropped[tap_stream_id] = 0
+
+        if not self._deduplicators[tap_stream_id].is_duplicate(record):
+            return False
+
+        self.dropped[tap_stream_id] += 1
+
+        return True
+
+    def close(self) -> None:
+        for tap_stream_id, deduplicator in self._deduplicators.items():
+            dropped = self.dropped[tap_stream_id]
+
+            if dropped > 0:
+                LOGGER.info(
+                    'Dropped %d duplicate records for stream "%s"',
+                    dropped,
+                    tap_stream_id,
+                )
+
+            log_metric(
+                LOGGER,
+                Point(
+                    "counter",
+                    DUPLICATE_RECORD_COUNT,
+                    dropped,
+                    {"endpoint": tap_stream_id},
+                ),
+            )
+            deduplicator.close()
+
+        self._deduplicators = {}
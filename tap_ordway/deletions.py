@@ -0,0 +1,222 @@
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Union
+import os
+import sys
+from array import array
+from copy import deepcopy
+import simplejson
+from singer import get_logger
+from singer.utils import now, strftime
+from .dedupe import hash_key
+from .tracking import FullTableTracker, read_store, write_store
+from .utils import is_first_run, print_record
+
+if TYPE_CHECKING:
+    from .streams.base import Stream, Substream
+
+LOGGER = get_logger()
+
+DELETED_AT_PROPERTY = "_sdc_deleted_at"
+
+_MAGIC = b"TOKS"
+
+
+class CorruptKeySnapshot(Exception):
+    """ A key snapshot file couldn't be read """
+
+
+class KeySnapshot:
+    """The set of keys seen during a FULL_TABLE stream's sync
+
+    It's stored as a sorted array of key hashes, followed by each key's
+    values (as JSON lines, in the same order), so that the next sync can diff
+    against the hashes and only decode the values of deleted keys.
+    """
+
+    def __init__(self, key_hashes: "array[int]", key_values: bytes):
+        self.key_hashes = key_hashes
+        self._key_values = key_values
+
+    def __len__(self) -> int:
+        return len(self.key_hashes)
+
+    @classmethod
+    def from_keys(cls, keys: Dict[int, List[Any]]) -> "KeySnapshot":
+        key_hashes = array("Q", sorted(keys))
+        key_values = "".join(
+            simplejson.dumps(keys[key_hash], use_decimal=True) + "\n"
+            for key_hash in key_hashes
+        )
+
+        return cls(key_hashes, key_values.encode("utf-8"))
+
+    @classmethod
+    def read(cls, path: str) -> "KeySnapshot":
+        count, payload = read_store(path, _MAGIC, CorruptKeySnapshot)
+
+        if len(payload) < count * 8:
+            raise CorruptKeySnapshot(f"{path} failed its integrity check")
+
+        key_hashes = array("Q")
+        key_hashes.frombytes(payload[: count * 8])
+
+        if sys.byteorder == "big":
+            key_hashes.byteswap()
+
+        return cls(key_hashes, payload[count * 8 :])
+
+    def write(self, path: str) -> None:
+        key_hashes = array("Q", self.key_hashes)
+
+        if sys.byteorder == "big":
+            key_hashes.byteswap()
+
+        write_store(
+            path,
+            _MAGIC,
+            len(self.key_hashes),
+            key_hashes.tobytes() + self._key_values,
+        )
+
+    def missing_from(self, key_hashes: Dict[int, Any]) -> List[List[Any]]:
+        """ Returns the values of the snapshot's keys not in `key_hashes` """
+
+        missing_indexes = {
+            index
+            for index, key_hash in enumerate(self.key_hashes)
+            if key_hash not in key_hashes
+        }
+
+        if not missing_indexes:
+            return []
+
+        lines = self._key_values.decode("utf-8").splitlines()
+
+        return [
+            simplejson.loads(lines[index], use_decimal=True)
+            for index in sorted(missing_indexes)
+        ]
+
+
+class _StreamKeys:
+    def __init__(self, path: str, key_properties: Sequence[str]):
+        self.path = path
+        self.key_properties = tuple(key_properties)
+
+        self.previous: Optional[KeySnapshot] = None
+        self.seen: Dict[int, List[Any]] = {}
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            LOGGER.info("No key snapshot found at %s", self.path)
+            return False
+
+        try:
+            self.previous = KeySnapshot.read(self.path)
+        except (CorruptKeySnapshot, OSError) as err:
+            LOGGER.warning("Ignoring unreadable key snapshot: %s", err)
+            return False
+
+        return True
+
+    def track(self, record: Dict[str, Any]) -> None:
+        values = [record.get(prop) for prop in self.key_properties]
+        self.seen[hash_key(values)] = values
+
+    def deleted_keys(self) -> List[Dict[str, Any]]:
+        if self.previous is None:
+            return []
+
+        return [
+            dict(zip(self.key_properties, values))
+            for values in self.previous.missing_from(self.seen)
+        ]
+
+    def commit(self) -> None:
+        KeySnapshot.from_keys(self.seen).write(self.path)
+
+
+class DeletionDetection(FullTableTracker):
+    """Detects records deleted from FULL_TABLE streams since their previous
+    sync, emitting them with `_sdc_deleted_at` set
+
+    The keys seen during each sync are kept in a local snapshot per stream.
+    Streams with a valid snapshot are synced without a table version - and
+    thus without ACTIVATE_VERSION - so targets don't need to replace the
+    whole table to drop deleted records. When the snapshot is missing or
+    corrupt, or it's the stream's first run, the stream falls back to a full
+    emission under a new version, rebuilding its snapshot.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.streams: Dict[str, _StreamKeys] = {}
+
+    def extend_schema(
+        self, stream_def: Union["Stream", "Substream"], schema: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        if not self.is_enabled(stream_def):
+            return schema
+
+        schema = deepcopy(schema)
+        schema.setdefault("properties", {})[DELETED_AT_PROPERTY] = {
+            "type": ["null", "string"],
+            "format": "date-time",
+        }
+
+        return schema
+
+    def start(
+        self, stream_def: Union["Stream", "Substream"], state: Dict[str, Any]
+    ) -> bool:
+        stream_keys = _StreamKeys(
+            os.path.join(self.directory, f"{stream_def.tap_stream_id}.keys"),
+            stream_def.key_properties,
+        )
+        self.streams[stream_def.tap_stream_id] = stream_keys
+
+        return not is_first_run(stream_def.tap_stream_id, state) and stream_keys.load()
+
+    def fall_back(self, tap_stream_id: str) -> None:
+        # ACTIVATE_VERSION takes care of deleted records
+        self.streams[tap_stream_id].previous = None
+
+    def should_emit(self, tap_stream_id: str, record: Dict[str, Any]) -> bool:
+        stream_keys = self.streams.get(tap_stream_id)
+
+        if stream_keys is not None:
+            stream_keys.track(record)
+
+        return True
+
+    def emit(self, stream_versions: Dict[str, Optional[int]]) -> None:
+        """ Emits delete markers for all streams synced so far """
+
+        deleted_at = strftime(now())
+
+        for tap_stream_id, stream_keys in self.streams.items():
+            deleted_keys = stream_keys.deleted_keys()
+
+            if stream_keys.previous is not None:
+                LOGGER.info(
+                    'Detected %d deleted records for stream "%s"',
+                    len(deleted_keys),
+                    tap_stream_id,
+                )
+
+            for key in deleted_keys:
+                key[DELETED_AT_PROPERTY] = deleted_at
+                print_record(
+                    tap_stream_id, key, version=stream_versions.get(tap_stream_id)
+                )
+
+    def commit(self) -> None:
+        """Persists the key snapshots of all streams synced so far - once
+        their delete markers are emitted and followed by STATE, so a failed
+        run emits them again
+        """
+
+        for stream_keys in self.streams.values():
+            stream_keys.commit()
+
+        self.streams = {}
@@ -0,0 +1,169 @@
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence, Union
+import os
+import sys
+from array import array
+from singer import get_logger
+from .dedupe import hash_key, hash_record
+from .tracking import FullTableTracker, read_store, write_store
+from .utils import is_first_run
+
+if TYPE_CHECKING:
+    from .streams.base import Stream, Substream
+
+LOGGER = get_logger()
+
+_MAGIC = b"TOFP"
+
+
+class CorruptFingerprintStore(Exception):
+    """ A fingerprint store file couldn't be read """
+
+
+def read_fingerprints(path: str) -> Dict[int, int]:
+    """Reads a fingerprint store - a checksummed array of
+    (key hash, record hash) pairs
+    """
+
+    count, payload = read_store(path, _MAGIC, CorruptFingerprintStore)
+
+    if len(payload) != count * 16:
+        raise CorruptFingerprintStore(f"{path} failed its integrity check")
+
+    pairs = array("Q")
+    pairs.frombytes(payload)
+
+    if sys.byteorder == "big":
+        pairs.byteswap()
+
+    return dict(zip(pairs[::2], pairs[1::2]))
+
+
+def write_fingerprints(path: str, fingerprints: Dict[int, int]) -> None:
+    """ Atomically writes a fingerprint store """
+
+    pairs = array("Q")
+    for key_hash in sorted(fingerprints):
+        pairs.append(key_hash)
+        pairs.append(fingerprints[key_hash])
+
+    if sys.byteorder == "big":
+        pairs.byteswap()
+
+    write_store(path, _MAGIC, len(fingerprints), pairs.tobytes())
+
+
+class ChangeDetector:
+    """Detects which of a FULL_TABLE stream's records changed since its
+    previous sync
+
+    The previous sync's fingerprints - a hash of each transformed record,
+    keyed by a hash of its key_properties - are loaded from `path`. A new
+    store is built from every record seen and only replaces the previous one
+    on `commit`, so an interrupted sync is simply compared again next time.
+    """
+
+    def __init__(self, path: str, key_properties: Sequence[str]):
+        self.path = path
+        self.key_properties = tuple(key_properties)
+
+        self.previous: Optional[Dict[int, int]] = None
+        self.current: Dict[int, int] = {}
+        self.unchanged_count = 0
+
+    def load(self) -> bool:
+        """Loads the previous fingerprints, returning whether or not a valid
+        store was found
+        """
+
+        if not os.path.exists(self.path):
+            LOGGER.info("No fingerprint store found at %s", self.path)
+            return False
+
+        try:
+            self.previous = read_fingerprints(self.path)
+        except (CorruptFingerprintStore, OSError) as err:
+            LOGGER.warning("Ignoring unreadable fingerprint store: %s", err)
+            return False
+
+        return True
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.previous is not None
+
+    def is_unchanged(self, record: Dict[str, Any]) -> bool:
+        """Whether `record` is identical to its previous sync's version -
+        tracking its fingerprint for the next sync either way
+        """
+
+        key_hash = hash_key(record.get(prop) for prop in self.key_properties)
+        record_hash = hash_record(record)
+        self.current[key_hash] = record_hash
+
+        if self.previous is not None and self.previous.get(key_hash) == record_hash:
+            self.unchanged_count += 1
+            return True
+
+        return False
+
+    def commit(self) -> None:
+        write_fingerprints(self.path, self.current)
+
+
+class ChangeDetection(FullTableTracker):
+    """Emits only new or changed records for FULL_TABLE streams, while
+    still paging through their full tables
+
+    Streams with a valid fingerprint store from a previous sync are synced
+    without a table version, and thus without ACTIVATE_VERSION, so targets
+    upsert the changed records instead of replacing the table. When the store
+    is missing or corrupt - or it's the stream's first run - the stream falls
+    back to emitting every record under a new version, rebuilding its store.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.detectors: Dict[str, ChangeDetector] = {}
+
+    def start(
+        self, stream_def: Union["Stream", "Substream"], state: Dict[str, Any]
+    ) -> bool:
+        detector = ChangeDetector(
+            os.path.join(self.directory, f"{stream_def.tap_stream_id}.fingerprints"),
+            stream_def.key_properties,
+        )
+        self.detectors[stream_def.tap_stream_id] = detector
+
+        return not is_first_run(stream_def.tap_stream_id, state) and detector.load()
+
+    def fall_back(self, tap_stream_id: str) -> None:
+        LOGGER.info(
+            'Emitting all records for stream "%s" under a new table version',
+            tap_stream_id,
+        )
+
+        self.detectors[tap_stream_id].previous = None
+
+    def should_emit(self, tap_stream_id: str, record: Dict[str, Any]) -> bool:
+        detector = self.detectors.get(tap_stream_id)
+
+        if detector is None:
+            return True
+
+        return not detector.is_unchanged(record)
+
+    def commit(self) -> None:
+        """ Persists the fingerprints of all streams synced so far """
+
+        for tap_stream_id, detector in self.detectors.items():
+            if detector.is_loaded:
+                LOGGER.info(
+                    'Skipped %d unchanged records for stream "%s"',
+                    detector.unchanged_count,
+                    tap_stream_id,
+                )
+
+            detector.commit()
+
+        self.detectors = {}
@@ -2,12 +2,13 @@ from typing import TYPE_CHECKING, Any, Dict, Optional, Union
 import json
 from inflection import pluralize, underscore
 from kafka import KafkaConsumer
-from singer import get_logger, write_state
+from singer import get_logger
 import tap_ordway.configs as TAP_CONFIG
 from tap_ordway import filter_record, handle_record, prepare_stream
 from tap_ordway.base import DataContext
+from tap_ordway.bookmarks import BookmarkTracker, get_bookmark_tracker
 from tap_ordway.streams import EndpointSubstream, ResponseSubstream, Stream
-from tap_ordway.utils import get_filter_datetime
+from tap_ordway.utils import get_filter_datetime, write_state
 
 if TYPE_CHECKING:
     from datetime import datetime
@@ -35,6 +36,7 @@ def listen_topic(config, state):
     stream_defs: Dict[str, Union["Stream", "Substream"]] = {}
     stream_versions: Dict[str, Optional[int]] = {}
     stream_setup: Dict[str, bool] = {}
+    bookmarks: Dict[str, Optional[BookmarkTracker]] = {}
 
     for message in consumer:
         json_message = json.loads(message.value)
@@ -51,6 +53,10 @@ def listen_topic(config, state):
             )
 
             LOGGER.info("Syncing stream '%s' since %s", tap_stream_id, filter_datetime)
+
+            bookmarks[tap_stream_id] = get_bookmark_tracker(
+                stream_defs[tap_stream_id], state
+            )
         else:
             filter_datetime = get_filter_datetime(
                 stream_defs[tap_stream_id], TAP_CONFIG.start_date, state
@@ -62,15 +68,17 @@ def listen_topic(config, state):
             state,
             json_message,
             filter_datetime,
+            bookmarks[tap_stream_id],
         )
 
 
-def process_stream(
+def process_stream(  # pylint: disable=too-many-positional-arguments
     stream_def: Union[Stream, ResponseSubstream, EndpointSubstream],
     stream_version: Optional[int],
     state: Dict[str, Any],
     json_message: Dict[str, Any],
     filter_datetime: "datetime",
+    bookmark: Optional[BookmarkTracker] = None,
 ) -> None:
     LOGGER.info("Message: %s", json.dumps(json_message))
     stream_id = pluralize(underscore(json_message["object"]))
@@ -86,7 +94,7 @@ def process_stream(
     ):
         return None
 
-    state = handle_record(stream_id, record, stream_def, stream_version, state)
+    handle_record(stream_id, record, stream_version, bookmark)
 
     # Make sure stream is selected for record to print
     if stream_def.is_selected:
@@ -105,9 +113,8 @@ def process_stream(
                 for tap_substream_id, sub_record in stream_def.sync_sub_records(
                     substream, record, filter_datetime
                 ):
-                    state = handle_record(
-                        tap_substream_id, sub_record, stream_def, stream_version, state
-                    )
+                    # Substreams are necessarily FULL_TABLE, so aren't bookmarked
+                    handle_record(tap_substream_id, sub_record, stream_version)
 
             with stream_def.transformer_class() as transformer:
                 for record in transformer.transform(
@@ -120,9 +127,7 @@ def process_stream(
                     ),
                     metadata=stream_def.mapped_metadata,
                 ):
-                    state = handle_record(
-                        stream_id, record, stream_def, stream_version, state
-                    )
+                    handle_record(stream_id, record, stream_version, bookmark)
 
         elif isinstance(stream_def, EndpointSubstream):
             # This assumes the data being consumed is akin to
@@ -143,9 +148,10 @@ def process_stream(
                 )
 
                 for record in records:
-                    state = handle_record(
-                        stream_id, record, stream_def, stream_version, state
-                    )
+                    handle_record(stream_id, record, stream_version, bookmark)
+
+        if bookmark is not None:
+            bookmark.checkpoint(state)
 
         write_state(state)
 
@@ -0,0 +1,271 @@
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
+import sys
+from math import ceil
+from time import monotonic
+from singer import get_logger
+import tap_ordway.configs as TAP_CONFIG
+from .base import DataContext
+from .streams import AVAILABLE_STREAMS, is_substream
+from .streams.base import EndpointSubstream
+from .utils import get_filter_datetime
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from singer.catalog import Catalog
+    from .streams.base import Stream, Substream
+
+LOGGER = get_logger()
+
+# Doubling stops here, in case an endpoint ignores the page params
+_MAX_PROBED_PAGE = 2 ** 24
+
+
+class StreamEstimate(NamedTuple):
+    """ The records, pages and requests a stream is expected to sync """
+
+    tap_stream_id: str
+    records: Optional[int]
+    pages: int
+    requests: int
+    parent: Optional[str] = None
+
+
+class SyncPlan(NamedTuple):
+    estimates: List[StreamEstimate]
+    # Spent probing, and used to estimate each request's latency
+    probe_requests: int
+    probe_seconds: float
+
+    @property
+    def requests(self) -> int:
+        return sum(estimate.requests for estimate in self.estimates)
+
+    def estimate_seconds(
+        self, rate_limit_rps: Optional[float] = None, concurrency: int = 1
+    ) -> float:
+        """The expected duration of the sync's requests - bound by the rate
+        limit shared by all streams, or by the latency of the probes
+        """
+
+        latency = self.probe_seconds / max(self.probe_requests, 1)
+        seconds = self.requests * latency / concurrency
+
+        if rate_limit_rps is not None:
+            seconds = max(seconds, self.requests / rate_limit_rps)
+
+        return seconds
+
+
+class _Prober:
+    """ Counts records with single-record pages """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.seconds = 0.0
+
+    def fetch_record(
+        self, stream_def: Union["Stream", "Substream"], context: DataContext, index: int
+    ) -> Optional[Dict[str, Any]]:
+        started = monotonic()
+        page = stream_def.request_handler.fetch_page(  # type: ignore
+            context, index, size=1
+        )
+        self.seconds += monotonic() - started
+        self.requests += 1
+
+        return page[0] if page else None
+
+    def count_records(
+        self, stream_def: Union["Stream", "Substream"], context: DataContext
+    ) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Counts the records of an endpoint in logarithmically many requests -
+        doubling the page until it's past the last record, then bisecting -
+        also returning the first record
+        """
+
+        first_record = self.fetch_record(stream_def, context, 1)
+
+        if first_record is None:
+            return 0, None
+
+        # The `found` page has a record, but the `missing` one doesn't
+        found, missing = 1, 2
+
+        while missing <= _MAX_PROBED_PAGE and self.fetch_record(
+            stream_def, context, missing
+        ):
+            found, missing = missing, missing * 2
+
+        while missing - found > 1:
+            middle = (found + missing) // 2
+
+            if self.fetch_record(stream_def, context, middle):
+                found = middle
+            else:
+                missing = middle
+
+        return found, first_record
+
+
+def _count_requests(records: int, page_size: int) -> Tuple[int, int]:
+    # Pages are fetched until one comes back empty
+    pages = ceil(records / page_size)
+
+    return pages, pages + 1
+
+
+def plan_stream(
+    stream_def: "Stream", filter_datetime: "datetime", prober: _Prober
+) -> List[StreamEstimate]:
+    """Estimates a stream's records, pages and requests from its current
+    bookmark - along with those of its selected substreams, fanned out per
+    parent record for EndpointSubstreams
+    """
+
+    context = DataContext(
+        stream=stream_def,
+        filter_datetime=filter_datetime,
+        tap_stream_id=stream_def.tap_stream_id,
+    )
+    records, first_record = prober.count_records(stream_def, context)
+    pages, requests = _count_requests(
+        records, stream_def.request_handler.page_size
+    )
+    estimates = [StreamEstimate(stream_def.tap_stream_id, records, pages, requests)]
+
+    for substream_def in stream_def.substreams:
+        if not substream_def.is_selected:
+            continue
+
+        if not isinstance(substream_def, EndpointSubstream):
+            # Embedded in the parent's records, so requested along with them
+            estimates.append(
+                StreamEstimate(
+                    substream_def.tap_stream_id, None, 0, 0, stream_def.tap_stream_id
+                )
+            )
+
+            continue
+
+        sub_records = 0
+
+        if first_record is not None:
+            # The first parent record's sub-records stand in for every parent's
+            sub_records, _ = prober.count_records(
+                substream_def,
+                DataContext(
+                    stream=substream_def,
+                    filter_datetime=filter_datetime,
+                    tap_stream_id=substream_def.tap_stream_id,
+                    parent_record=first_record,
+                ),
+            )
+
+        sub_pages, sub_requests = _count_requests(
+            sub_records, substream_def.request_handler.page_size
+        )
+        estimates.append(
+            StreamEstimate(
+                substream_def.tap_stream_id,
+                sub_records * records,
+                sub_pages * records,
+                sub_requests * records,
+                stream_def.tap_stream_id,
+            )
+        )
+
+    return estimates
+
+
+def plan_sync(
+    config: Dict[str, Any], state: Dict[str, Any], catalog: "Catalog"
+) -> SyncPlan:
+    """Estimates the records, pages and requests of each selected stream by
+    probing its endpoint, without emitting any Singer messages
+    """
+
+    prober = _Prober()
+    estimates: List[StreamEstimate] = []
+
+    for stream in catalog.get_selected_streams(state):
+        if is_substream(AVAILABLE_STREAMS[stream.tap_stream_id]):
+            continue
+
+        LOGGER.info("Probing stream: %s", stream.tap_stream_id)
+
+        # mypy isn't properly considering is_substream
+        stream_def: "Stream" = AVAILABLE_STREAMS[stream.tap_stream_id](catalog, config)  # type: ignore
+
+        if stream_def.has_substreams:
+            stream_def.instantiate_substreams(catalog)
+
+        estimates.extend(
+            plan_stream(
+                stream_def,
+                get_filter_datetime(stream_def, config["start_date"], state),
+                prober,
+            )
+        )
+
+    return SyncPlan(estimates, prober.requests, prober.seconds)
+
+
+def write_report(
+    sync_plan: SyncPlan, file: TextIO = sys.stdout, title: Optional[str] = None
+) -> None:
+    """ Writes a table of the plan's estimates, followed by their totals """
+
+    if title is not None:
+        file.write(f"{title}\n\n")
+
+    rows = [("STREAM", "RECORDS", "PAGES", "REQUESTS")]
+
+    for estimate in sync_plan.estimates:
+        rows.append(
+            (
+                estimate.tap_stream_id
+                if estimate.parent is None
+                else f"  {estimate.tap_stream_id} (via {estimate.parent})",
+                "-" if estimate.records is None else str(estimate.records),
+                str(estimate.pages),
+                str(estimate.requests),
+            )
+        )
+
+    rows.append(
+        (
+            "TOTAL",
+            str(sum(estimate.records or 0 for estimate in sync_plan.estimates)),
+            str(sum(estimate.pages for estimate in sync_plan.estimates)),
+            str(sync_plan.requests),
+        )
+    )
+
+    widths = [max(len(row[column]) for row in rows) for column in range(4)]
+
+    for row in rows:
+        file.write(
+            "  ".join(
+                [row[0].ljust(widths[0])]
+                + [value.rjust(width) for value, width in zip(row[1:], widths[1:])]
+            )
+            + "\n"
+        )
+
+    seconds = sync_plan.estimate_seconds(
+        TAP_CONFIG.rate_limit_rps, TAP_CONFIG.stream_concurrency or 1
+    )
+    file.write(
+        f"\nExpected duration: about {round(seconds)} seconds "
+        f"({sync_plan.probe_requests} requests spent probing)\n"
+    )
@@ -0,0 +1,114 @@
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Sequence, Set
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from threading import RLock
+from singer import get_logger
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from singer.catalog import Catalog, CatalogEntry
+
+LOGGER = get_logger()
+
+
+def get_resumed_streams(
+    catalog: "Catalog", state: Dict[str, Any]
+) -> List["CatalogEntry"]:
+    """The selected streams, in the order they're synced - resuming from the
+    stream, or streams synced concurrently, an interrupted sync was syncing
+    """
+
+    streams = list(catalog.get_selected_streams(state))
+    currently_syncing = state.get("currently_syncing")
+
+    if isinstance(currently_syncing, list):
+        # Stable, so the catalog's order is otherwise kept
+        streams.sort(key=lambda stream: stream.tap_stream_id not in currently_syncing)
+
+    return streams
+
+
+class StreamScheduler:
+    """Syncs up to `concurrency` top-level streams at once - each in its own
+    thread, along with its substreams
+
+    Streams only hold `lock` while emitting messages or changing the shared
+    state, so their messages are written one at a time - in order for each
+    stream - while their requests and transformations overlap. The state's
+    `currently_syncing` holds the sorted list of streams being synced.
+    """
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.lock = RLock()
+
+        self._running: Set[str] = set()
+        self._failed = False
+
+    def _set_running(self, state: Dict[str, Any]) -> None:
+        state["currently_syncing"] = sorted(self._running) or None
+
+    def _sync(
+        self,
+        tap_stream_id: str,
+        sync_stream: Callable[[str], Any],
+        state: Dict[str, Any],
+    ) -> None:
+        with self.lock:
+            # Streams aren't started after another one fails
+            if self._failed:
+                return
+
+            self._running.add(tap_stream_id)
+            self._set_running(state)
+
+        try:
+            sync_stream(tap_stream_id)
+        except BaseException:
+            self._failed = True
+            raise
+
+        with self.lock:
+            self._running.discard(tap_stream_id)
+            self._set_running(state)
+
+    def run(
+        self,
+        tap_stream_ids: Sequence[str],
+        sync_stream: Callable[[str], Any],
+        state: Dict[str, Any],
+    ) -> None:
+        """Syncs each of `tap_stream_ids` with `sync_stream`, in order of
+        `tap_stream_ids` as threads free up - raising the first error, once
+        the streams already being synced are done
+        """
+
+        LOGGER.info(
+            "Syncing %d streams, up to %d at once",
+            len(tap_stream_ids),
+            self.concurrency,
+        )
+
+        executor = ThreadPoolExecutor(
+            self.concurrency, thread_name_prefix="tap-ordway-stream"
+        )
+
+        futures: List["Future[None]"] = []
+
+        try:
+            for tap_stream_id in tap_stream_ids:
+                futures.append(
+                    executor.submit(self._sync, tap_stream_id, sync_stream, state)
+                )
+
+            done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+
+            for future in futures:
+                if future in done and future.exception() is not None:
+                    raise future.exception()  # type: ignore
+        finally:
+            # Streams not yet started are skipped. Cancelled by hand, as
+            # shutdown's cancel_futures needs Python 3.9.
+            for future in futures:
+                future.cancel()
+
+            executor.shutdown()
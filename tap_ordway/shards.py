@@ -0,0 +1,560 @@
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+import json
+import os
+import shutil
+import socket
+import sys
+import traceback
+from collections import defaultdict
+from contextlib import contextmanager
+from copy import deepcopy
+from multiprocessing import get_context
+from threading import Event, Thread
+from time import monotonic, sleep
+from uuid import uuid4
+from singer import get_logger
+from singer.bookmarks import get_bookmark, write_bookmark
+from singer.messages import parse_message
+from singer.utils import now, strftime
+import tap_ordway.configs as TAP_CONFIG
+from .bookmarks import WatermarkTracker
+from .streams import AVAILABLE_STREAMS, is_substream
+from .utils import get_filter_datetime, write_json, write_message, write_state
+from .writer import MessageWriter, use_message_writer
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from multiprocessing.process import BaseProcess
+    from singer.catalog import Catalog, CatalogEntry
+    from .streams.base import Stream
+
+LOGGER = get_logger()
+
+SHARDS_FILENAME = "shards.json"
+
+_POLL_SECONDS = 1.0
+# Workers touch their claims this often while syncing a shard, and a claim
+# untouched for the lease is orphaned - its worker likely died on another host
+CLAIM_HEARTBEAT_SECONDS = 30.0
+CLAIM_LEASE_SECONDS = 300.0
+# Singer serializes each message's type first
+_STATE_PREFIX = '{"type": "STATE"'
+
+
+class ShardsFailed(Exception):
+    """ Some of a sharded sync's shards failed """
+
+
+class Shard(NamedTuple):
+    """A top-level stream, along with its selected substreams, or a time
+    window of an INCREMENTAL stream - synced by a worker process from `state`
+    """
+
+    shard_id: str
+    tap_stream_id: str
+    tap_stream_ids: List[str]
+    state: Dict[str, Any]
+    replication_key: Optional[str] = None
+    # Only set for windows, whose start is their state's bookmark
+    sync_until: Optional[str] = None
+
+
+def _get_path(run_dir: str, shard_id: str, suffix: str) -> str:
+    return os.path.join(run_dir, f"{shard_id}{suffix}")
+
+
+def get_run_dir(shard_dir: str, run_id: str) -> str:
+    """ The directory of a sharded sync's claims, messages and states """
+
+    return os.path.join(shard_dir, run_id)
+
+
+def new_run_id() -> str:
+    return f"run-{uuid4().hex}"
+
+
+def _get_windows(
+    filter_datetime: "datetime", windows: int, until: "datetime"
+) -> List["datetime"]:
+    step = (until - filter_datetime) / windows
+
+    return [filter_datetime + step * index for index in range(windows)] + [until]
+
+
+def plan_shards(  # pylint: disable=too-many-positional-arguments
+    config: Dict[str, Any],
+    state: Dict[str, Any],
+    streams: Sequence["CatalogEntry"],
+    catalog: "Catalog",
+    windows: int = 1,
+    window_streams: Sequence[str] = (),
+) -> List[Shard]:
+    """Splits the selected top-level `streams` into shards - a shard per
+    stream, or `windows` shards of equal time spans for each INCREMENTAL
+    stream of `window_streams` without selected substreams
+    """
+
+    until = now()
+    shards: List[Shard] = []
+
+    for stream in streams:
+        if is_substream(AVAILABLE_STREAMS[stream.tap_stream_id]):
+            continue
+
+        # mypy isn't properly considering is_substream
+        stream_def: "Stream" = AVAILABLE_STREAMS[stream.tap_stream_id](catalog, config)  # type: ignore
+        stream_def.instantiate_substreams(catalog)
+
+        tap_stream_ids = [stream_def.tap_stream_id] + [
+            substream_def.tap_stream_id
+            for substream_def in stream_def.substreams
+            if substream_def.is_selected
+        ]
+        filter_datetime = get_filter_datetime(stream_def, config["start_date"], state)
+
+        if (
+            windows < 2
+            or stream_def.tap_stream_id not in window_streams
+            or not stream_def.is_valid_incremental
+            or len(tap_stream_ids) > 1
+            or filter_datetime >= until
+        ):
+            if stream_def.tap_stream_id in window_streams and windows > 1:
+                LOGGER.warning(
+                    'Stream "%s" can\'t be split into windows - only INCREMENTAL '
+                    "streams without selected substreams can",
+                    stream_def.tap_stream_id,
+                )
+
+            shards.append(
+                Shard(
+                    f"shard-{len(shards):04d}",
+                    stream_def.tap_stream_id,
+                    tap_stream_ids,
+                    deepcopy(state),
+                )
+            )
+
+            continue
+
+        bounds = _get_windows(filter_datetime, windows, until)
+
+        for start, end in zip(bounds, bounds[1:]):
+            window_state = deepcopy(state)
+            write_bookmark(
+                window_state,
+                stream_def.tap_stream_id,
+                stream_def.replication_key,
+                strftime(start),
+            )
+
+            shards.append(
+                Shard(
+                    f"shard-{len(shards):04d}",
+                    stream_def.tap_stream_id,
+                    tap_stream_ids,
+                    window_state,
+                    stream_def.replication_key,
+                    strftime(end),
+                )
+            )
+
+    return shards
+
+
+def write_shards(shard_dir: str, shards: Sequence[Shard], run_id: str) -> None:
+    """Publishes the shards of a new sync to workers, removing those of any
+    previous sync
+
+    Each sync's files are kept in a directory of its own, so workers still
+    syncing a previous sync's shards can't be mistaken for this one's.
+    """
+
+    os.makedirs(shard_dir, exist_ok=True)
+
+    for filename in os.listdir(shard_dir):
+        path = os.path.join(shard_dir, filename)
+
+        if filename.startswith("run-"):
+            shutil.rmtree(path, ignore_errors=True)
+        elif filename == SHARDS_FILENAME:
+            os.remove(path)
+
+    os.makedirs(get_run_dir(shard_dir, run_id))
+    write_json(
+        os.path.join(shard_dir, SHARDS_FILENAME),
+        {"run_id": run_id, "shards": [shard._asdict() for shard in shards]},
+    )
+
+
+def read_shards(shard_dir: str) -> Tuple[Optional[str], List[Shard]]:
+    """ The ID and shards of the sync published to `shard_dir`, if any """
+
+    try:
+        with open(os.path.join(shard_dir, SHARDS_FILENAME)) as file:
+            published = json.load(file)
+    except FileNotFoundError:
+        return None, []
+
+    return published["run_id"], [Shard(**shard) for shard in published["shards"]]
+
+
+def finish_shards(shard_dir: str, run_id: str) -> None:
+    """Unpublishes a finished sync's shards, so workers started later wait
+    for the next sync's instead
+    """
+
+    if read_shards(shard_dir)[0] == run_id:
+        os.remove(os.path.join(shard_dir, SHARDS_FILENAME))
+
+
+def claim_shards(
+    shard_dir: str, run_id: str, shards: Sequence[Shard]
+) -> Iterator[Shard]:
+    """Claims the shards no other worker has - on this host or any other
+    sharing `shard_dir` - by exclusively creating their claim files, until
+    the sync is no longer the one published
+    """
+
+    run_dir = get_run_dir(shard_dir, run_id)
+
+    for shard in shards:
+        if read_shards(shard_dir)[0] != run_id:
+            LOGGER.info('Sync "%s" is no longer published', run_id)
+            return
+
+        try:
+            fd = os.open(
+                _get_path(run_dir, shard.shard_id, ".claim"),
+                os.O_CREAT | os.O_EXCL | os.O_WRONLY,
+            )
+        except (FileExistsError, FileNotFoundError):
+            # Claimed by another worker, or the sync's directory was removed
+            continue
+
+        with os.fdopen(fd, "w") as file:
+            json.dump({"host": socket.gethostname(), "pid": os.getpid()}, file)
+
+        yield shard
+
+
+@contextmanager
+def _heartbeat(claim_path: str) -> Iterator[None]:
+    """ Touches a claim every CLAIM_HEARTBEAT_SECONDS for the context """
+
+    stopped = Event()
+
+    def touch():
+        while not stopped.wait(CLAIM_HEARTBEAT_SECONDS):
+            try:
+                os.utime(claim_path)
+            except OSError as err:
+                LOGGER.warning("Failed to renew claim %s: %s", claim_path, err)
+
+    thread = Thread(target=touch, name="tap-ordway-claim-heartbeat", daemon=True)
+    thread.start()
+
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def run_worker(
+    shard_dir: str, sync_shard: Callable[[Shard], Dict[str, Any]]
+) -> None:
+    """Syncs shards with `sync_shard` until every shard is claimed - writing
+    each one's messages and final state, or its error, to `shard_dir`
+    """
+
+    for _ in range(60):
+        run_id, shards = read_shards(shard_dir)
+
+        if run_id is not None:
+            break
+
+        # The coordinator may not have published its shards yet
+        sleep(_POLL_SECONDS)
+    else:
+        LOGGER.info("No shards were published to %s", shard_dir)
+        return
+
+    run_dir = get_run_dir(shard_dir, run_id)
+
+    for shard in claim_shards(shard_dir, run_id, shards):
+        LOGGER.info(
+            'Syncing shard "%s" of stream "%s"', shard.shard_id, shard.tap_stream_id
+        )
+
+        TAP_CONFIG.sync_until = shard.sync_until
+
+        try:
+            with _heartbeat(_get_path(run_dir, shard.shard_id, ".claim")), open(
+                _get_path(run_dir, shard.shard_id, ".jsonl"), "w"
+            ) as file:
+                with use_message_writer(output=file):
+                    state = sync_shard(shard)
+
+            write_json(_get_path(run_dir, shard.shard_id, ".state.json"), state)
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.exception('Shard "%s" failed', shard.shard_id)
+
+            with open(_get_path(run_dir, shard.shard_id, ".error"), "w") as file:
+                file.write(traceback.format_exc())
+        finally:
+            TAP_CONFIG.sync_until = None
+
+
+def _read_claim(run_dir: str, shard_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_get_path(run_dir, shard_id, ".claim")) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        # Not claimed yet, or still being written
+        return None
+
+
+class _ClaimLeases:
+    """Tracks when each claim was last seen renewed - by the coordinator's
+    clock, so other hosts' clocks don't matter
+    """
+
+    def __init__(self, run_dir: str):
+        self.run_dir = run_dir
+        self._renewed: Dict[str, Tuple[float, float]] = {}
+
+    def is_expired(self, shard_id: str) -> bool:
+        try:
+            mtime = os.stat(_get_path(self.run_dir, shard_id, ".claim")).st_mtime
+        except OSError:
+            return False
+
+        renewed = self._renewed.get(shard_id)
+
+        if renewed is None or renewed[0] != mtime:
+            self._renewed[shard_id] = (mtime, monotonic())
+            return False
+
+        return monotonic() - renewed[1] > CLAIM_LEASE_SECONDS
+
+
+def _is_orphaned(
+    claim: Optional[Dict[str, Any]], workers_alive: bool, lease_expired: bool
+) -> bool:
+    """Whether a shard will never be finished - unclaimed once local workers
+    are done, claimed by a local process that's since died, or claimed by a
+    process on another host which stopped renewing its claim
+    """
+
+    if claim is None:
+        return not workers_alive
+
+    if claim["host"] != socket.gethostname():
+        return lease_expired
+
+    try:
+        os.kill(claim["pid"], 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+
+    return False
+
+
+def wait_for_shards(
+    run_dir: str, shards: Sequence[Shard], processes: Sequence["BaseProcess"]
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Waits for every shard of the sync in `run_dir` to finish, returning
+    the final state of each - None for those which failed or were orphaned
+    """
+
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    leases = _ClaimLeases(run_dir)
+
+    while len(results) < len(shards):
+        # Without local workers, shards are left to other nodes' workers
+        workers_alive = not processes or any(
+            process.is_alive() for process in processes
+        )
+
+        for shard in shards:
+            if shard.shard_id in results:
+                continue
+
+            state_path = _get_path(run_dir, shard.shard_id, ".state.json")
+
+            if os.path.exists(state_path):
+                with open(state_path) as file:
+                    results[shard.shard_id] = json.load(file)
+            elif os.path.exists(_get_path(run_dir, shard.shard_id, ".error")):
+                results[shard.shard_id] = None
+            # Checked again, as it may have been finished since
+            elif _is_orphaned(
+                _read_claim(run_dir, shard.shard_id),
+                workers_alive,
+                leases.is_expired(shard.shard_id),
+            ) and not os.path.exists(state_path):
+                LOGGER.error('Shard "%s" was never finished', shard.shard_id)
+                results[shard.shard_id] = None
+
+        if len(results) < len(shards):
+            sleep(_POLL_SECONDS)
+
+    for process in processes:
+        process.join()
+
+    return results
+
+
+def replay_messages(path: str) -> None:
+    """Writes a shard's messages to the tap's output - leaving out its STATE
+    messages, which are merged instead
+    """
+
+    writer = TAP_CONFIG.message_writer
+
+    with open(path) as file:
+        for line in file:
+            if line.startswith(_STATE_PREFIX):
+                continue
+
+            # Already serialized, unless they're written to a local sink
+            if writer is None:
+                sys.stdout.write(line)
+            elif isinstance(writer, MessageWriter):
+                writer.write_line(line.rstrip("\n"))
+            else:
+                write_message(parse_message(line))
+
+    if writer is None:
+        sys.stdout.flush()
+
+
+def merge_states(
+    state: Dict[str, Any],
+    shards: Sequence[Shard],
+    results: Dict[str, Optional[Dict[str, Any]]],
+) -> Dict[str, Any]:
+    """Merges the final states of the shards into `state`
+
+    A whole stream's shard takes over its streams' bookmarks. A windowed
+    stream's bookmark only advances through its windows finished in order -
+    once a window fails, any records of the windows after it are synced again
+    next time.
+    """
+
+    merged = deepcopy(state)
+    merged.setdefault("bookmarks", {})
+    windows: Dict[str, List[Shard]] = defaultdict(list)
+
+    for shard in shards:
+        if shard.sync_until is not None:
+            windows[shard.tap_stream_id].append(shard)
+            continue
+
+        shard_state = results.get(shard.shard_id)
+
+        if shard_state is None:
+            continue
+
+        for tap_stream_id in shard.tap_stream_ids:
+            bookmark = shard_state.get("bookmarks", {}).get(tap_stream_id)
+
+            if bookmark is not None:
+                merged["bookmarks"][tap_stream_id] = bookmark
+
+    for tap_stream_id, stream_windows in windows.items():
+        watermark = WatermarkTracker(
+            tap_stream_id, stream_windows[0].replication_key, merged  # type: ignore
+        )
+
+        for shard in stream_windows:
+            index = watermark.open_range()
+            shard_state = results.get(shard.shard_id)
+
+            if shard_state is None:
+                continue
+
+            bookmark = get_bookmark(shard_state, tap_stream_id, shard.replication_key)
+
+            if bookmark is not None:
+                watermark.update_range(index, bookmark)
+
+            watermark.complete_range(index)
+
+        watermark.checkpoint(merged)
+
+    merged["currently_syncing"] = None
+
+    return merged
+
+
+def coordinate(  # pylint: disable=too-many-positional-arguments
+    shard_dir: str,
+    shards: Sequence[Shard],
+    state: Dict[str, Any],
+    worker: Callable[..., None],
+    worker_args: Sequence[Any],
+    processes: int,
+) -> Dict[str, Any]:
+    """Syncs `shards` with `processes` local workers running `worker`, along
+    with any workers started on other nodes sharing `shard_dir`
+
+    Once every shard is done, their messages are written in order, followed
+    by their merged state - raising ShardsFailed afterwards if any failed.
+    """
+
+    run_id = new_run_id()
+    run_dir = get_run_dir(shard_dir, run_id)
+    write_shards(shard_dir, shards, run_id)
+
+    LOGGER.info(
+        "Syncing %d shards in %s with %d local workers",
+        len(shards),
+        run_dir,
+        processes,
+    )
+
+    # Spawned rather than forked, as the coordinator may be running threads
+    context = get_context("spawn")
+    workers = [
+        context.Process(target=worker, args=tuple(worker_args), daemon=True)
+        for _ in range(processes)
+    ]
+
+    for process in workers:
+        process.start()
+
+    try:
+        results = wait_for_shards(run_dir, shards, workers)
+    finally:
+        finish_shards(shard_dir, run_id)
+
+    for shard in shards:
+        if results[shard.shard_id] is not None:
+            replay_messages(_get_path(run_dir, shard.shard_id, ".jsonl"))
+
+    merged = merge_states(state, shards, results)
+    write_state(merged)
+
+    failed = [shard.shard_id for shard in shards if results[shard.shard_id] is None]
+
+    if failed:
+        raise ShardsFailed(
+            f"Shards failed: {', '.join(failed)} - see {run_dir} for their errors"
+        )
+
+    return merged
@@ -0,0 +1,420 @@
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+import gzip
+import os
+from contextlib import contextmanager
+from decimal import Decimal
+from time import monotonic
+import simplejson
+from singer import get_logger
+from singer.messages import (
+    ActivateVersionMessage,
+    RecordMessage,
+    SchemaMessage,
+    StateMessage,
+)
+import tap_ordway.configs as TAP_CONFIG
+from .utils import write_json
+
+if TYPE_CHECKING:
+    from singer.messages import Message
+
+LOGGER = get_logger()
+
+DEFAULT_SHARD_MAX_RECORDS = 100000
+SUPPORTED_COMPRESSIONS = (None, "gzip")
+MANIFEST_FILE_NAME = "manifest.json"
+STATE_FILE_NAME = "state.json"
+
+# STATE messages are persisted at most this often (in seconds), besides
+# on shard rotation and shutdown, since each one requires flushing shards
+STATE_CHECKPOINT_INTERVAL_SECS = 60
+
+
+def _key_sort_value(key: Sequence[Any]) -> Tuple[Tuple[int, Any], ...]:
+    """Makes key property values comparable across types - numbers sort
+    before strings, which sort before anything else
+    """
+
+    values: List[Tuple[int, Any]] = []
+
+    for value in key:
+        if isinstance(value, bool) or value is None:
+            values.append((2, str(value)))
+        elif isinstance(value, (int, float, Decimal)):
+            values.append((0, value))
+        elif isinstance(value, str):
+            values.append((1, value))
+        else:
+            values.append((2, str(value)))
+
+    return tuple(values)
+
+
+class _Shard:
+    """ A single JSONL file of a stream's records """
+
+    def __init__(self, path: str, compression: Optional[str], version: Optional[int]):
+        self.path = path
+        self.version = version
+        self.record_count = 0
+        self.min_key: Optional[List[Any]] = None
+        self.max_key: Optional[List[Any]] = None
+
+        self._file: IO[str]
+        # pylint: disable=consider-using-with
+        if compression == "gzip":
+            self._file = gzip.open(path, "wt")  # type: ignore
+        else:
+            self._file = open(path, "w")
+
+    def write(self, record: Dict[str, Any], key: Optional[List[Any]]) -> None:
+        self._file.write(simplejson.dumps(record, use_decimal=True))
+        self._file.write("\n")
+        self.record_count += 1
+
+        if key is None:
+            return
+
+        if self.min_key is None or _key_sort_value(key) < _key_sort_value(
+            self.min_key
+        ):
+            self.min_key = key
+        if self.max_key is None or _key_sort_value(key) > _key_sort_value(
+            self.max_key
+        ):
+            self.max_key = key
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def to_manifest(self, directory: str) -> Dict[str, Any]:
+        return {
+            "path": os.path.relpath(self.path, directory),
+            "version": self.version,
+            "record_count": self.record_count,
+            "min_key": self.min_key,
+            "max_key": self.max_key,
+        }
+
+
+class _StreamShards:  # pylint: disable=too-many-instance-attributes
+    """ Tracks the rotating shards of a single stream """
+
+    # pylint: disable=too-many-positional-arguments
+    def __init__(
+        self,
+        tap_stream_id: str,
+        directory: str,
+        key_properties: Sequence[str],
+        compression: Optional[str],
+        max_records: int,
+        previous_shards: Sequence[Dict[str, Any]] = (),
+    ):
+        self.tap_stream_id = tap_stream_id
+        self.directory = directory
+        self.key_properties = list(key_properties)
+        self.compression = compression
+        self.max_records = max_records
+        # The manifest entries of the shards written by previous runs
+        self.previous_shards = list(previous_shards)
+
+        # The manifest entries of shards replaced by an ACTIVATE_VERSION
+        self.superseded_shards: List[Dict[str, Any]] = []
+
+        self.closed_shards: List[_Shard] = []
+        self.current: Optional[_Shard] = None
+        self._next_index = len(self.previous_shards)
+
+    @property
+    def shards(self) -> List[_Shard]:
+        if self.current is None:
+            return self.closed_shards
+
+        return self.closed_shards + [self.current]
+
+    @property
+    def record_count(self) -> int:
+        return sum(shard.record_count for shard in self.shards)
+
+    @property
+    def total_record_count(self) -> int:
+        """ The records of this run's shards and those of previous runs """
+
+        return self.record_count + sum(
+            shard["record_count"] for shard in self.previous_shards
+        )
+
+    def _new_shard(self, version: Optional[int]) -> _Shard:
+        extension = ".jsonl.gz" if self.compression == "gzip" else ".jsonl"
+
+        # Numbering continues from previous runs, skipping the shards of any
+        # run interrupted before writing its manifest
+        while True:
+            path = os.path.join(
+                self.directory, f"part-{self._next_index:05d}{extension}"
+            )
+            self._next_index += 1
+
+            if not os.path.exists(path):
+                return _Shard(path, self.compression, version)
+
+    def write(self, record: Dict[str, Any], version: Optional[int]) -> bool:
+        """Writes `record` to the current shard - returning whether or
+        not the shard was rotated. Each shard holds a single table version.
+        """
+
+        rotated = False
+
+        if self.current is not None and (
+            self.current.record_count >= self.max_records
+            or self.current.version != version
+        ):
+            self.current.close()
+            self.closed_shards.append(self.current)
+            self.current = None
+            rotated = True
+
+        if self.current is None:
+            self.current = self._new_shard(version)
+
+        key = (
+            [record.get(key_property) for key_property in self.key_properties]
+            if self.key_properties
+            else None
+        )
+        self.current.write(record, key)
+
+        return rotated
+
+    def flush(self) -> None:
+        if self.current is not None:
+            self.current.flush()
+
+    def activate_version(self, version: int, root_directory: str) -> None:
+        """ Supersedes the shards of every other table version """
+
+        if self.current is not None and self.current.version != version:
+            self.close()
+
+        self.superseded_shards.extend(
+            shard for shard in self.previous_shards if shard.get("version") != version
+        )
+        self.superseded_shards.extend(
+            shard.to_manifest(root_directory)
+            for shard in self.closed_shards
+            if shard.version != version
+        )
+        self.previous_shards = [
+            shard for shard in self.previous_shards if shard.get("version") == version
+        ]
+        self.closed_shards = [
+            shard for shard in self.closed_shards if shard.version == version
+        ]
+
+    def close(self) -> None:
+        if self.current is not None:
+            self.current.close()
+            self.closed_shards.append(self.current)
+            self.current = None
+
+    def to_manifest(self, root_directory: str) -> Dict[str, Any]:
+        return {
+            "key_properties": self.key_properties,
+            "record_count": self.total_record_count,
+            "shards": self.previous_shards
+            + [shard.to_manifest(root_directory) for shard in self.shards],
+        }
+
+
+class LocalSink:
+    """Writes the tap's Singer messages directly to a local directory instead
+    of stdout
+
+    Each stream's RECORDs are written to rotating JSONL shards (optionally
+    gzip-compressed) under `<directory>/<tap_stream_id>/`, alongside its
+    schema. STATE is persisted to `<directory>/state.json` and a manifest
+    with every shard's record count and key range is written on close.
+
+    Resuming into a directory written to before continues its shard
+    numbering, with the manifest listing the shards of every run - except
+    for those an ACTIVATE_VERSION replaced with a new table version, which
+    are deleted once the manifest is written.
+
+    STATE is only persisted after every shard has been flushed, so the state
+    file never gets ahead of the records on disk.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        compression: Optional[str] = None,
+        max_records_per_shard: int = DEFAULT_SHARD_MAX_RECORDS,
+    ):
+        if compression not in SUPPORTED_COMPRESSIONS:
+            raise ValueError(
+                f'Unsupported sink compression "{compression}". Expected one of: {SUPPORTED_COMPRESSIONS}'
+            )
+
+        if max_records_per_shard <= 0:
+            raise ValueError("`max_records_per_shard` must be GREATER THAN 0")
+
+        self.directory = directory
+        self.compression = compression
+        self.max_records_per_shard = max_records_per_shard
+
+        self._streams: Dict[str, _StreamShards] = {}
+        self._state: Optional[Dict[str, Any]] = None
+        self._last_checkpoint = monotonic()
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._previous_streams: Dict[str, Any] = self._read_manifest().get(
+            "streams", {}
+        )
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST_FILE_NAME)
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.directory, STATE_FILE_NAME)
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest_path) as file:
+                return simplejson.load(file, use_decimal=True)
+        except FileNotFoundError:
+            return {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, message: "Message") -> None:
+        if isinstance(message, RecordMessage):
+            self._write_record(message)
+        elif isinstance(message, StateMessage):
+            self._state = message.value
+
+            if monotonic() - self._last_checkpoint >= STATE_CHECKPOINT_INTERVAL_SECS:
+                self.checkpoint()
+        elif isinstance(message, SchemaMessage):
+            self._write_schema(message)
+        elif isinstance(message, ActivateVersionMessage):
+            self._get_stream(message.stream).activate_version(
+                message.version, self.directory
+            )
+
+    def _stream_directory(self, tap_stream_id: str) -> str:
+        return os.path.join(self.directory, tap_stream_id)
+
+    def _get_stream(
+        self, tap_stream_id: str, key_properties: Sequence[str] = ()
+    ) -> _StreamShards:
+        if tap_stream_id not in self._streams:
+            stream_directory = self._stream_directory(tap_stream_id)
+            os.makedirs(stream_directory, exist_ok=True)
+
+            self._streams[tap_stream_id] = _StreamShards(
+                tap_stream_id,
+                stream_directory,
+                key_properties,
+                self.compression,
+                self.max_records_per_shard,
+                self._previous_streams.get(tap_stream_id, {}).get("shards", ()),
+            )
+
+        return self._streams[tap_stream_id]
+
+    def _write_schema(self, message: SchemaMessage) -> None:
+        stream = self._get_stream(message.stream, message.key_properties)
+        stream.key_properties = list(message.key_properties)
+
+        write_json(
+            os.path.join(self._stream_directory(message.stream), "schema.json"),
+            {"schema": message.schema, "key_properties": message.key_properties},
+        )
+
+    def _write_record(self, message: RecordMessage) -> None:
+        if self._get_stream(message.stream).write(message.record, message.version):
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """ Flushes all shards and persists the latest STATE """
+
+        for stream in self._streams.values():
+            stream.flush()
+
+        if self._state is not None:
+            write_json(self.state_path, self._state)
+
+        self._last_checkpoint = monotonic()
+
+    def close(self) -> None:
+        """ Closes all shards, persisting the latest STATE and the manifest """
+
+        for stream in self._streams.values():
+            stream.close()
+
+        self.checkpoint()
+
+        # Streams not synced this run keep the shards of previous runs
+        streams = dict(self._previous_streams)
+        streams.update(
+            {
+                tap_stream_id: stream.to_manifest(self.directory)
+                for tap_stream_id, stream in self._streams.items()
+            }
+        )
+
+        write_json(self.manifest_path, {"streams": streams})
+
+        # Only once the manifest no longer lists them
+        for stream in self._streams.values():
+            for shard in stream.superseded_shards:
+                try:
+                    os.remove(os.path.join(self.directory, shard["path"]))
+                except FileNotFoundError:
+                    pass
+
+        LOGGER.info(
+            "Wrote %d records across %d streams to %s",
+            sum(stream.record_count for stream in self._streams.values()),
+            len(self._streams),
+            self.directory,
+        )
+
+
+@contextmanager
+def use_local_sink(
+    directory: str,
+    compression: Optional[str] = None,
+    max_records_per_shard: int = DEFAULT_SHARD_MAX_RECORDS,
+) -> Generator[LocalSink, None, None]:
+    """Routes all of the tap's Singer messages to a LocalSink for the
+    duration of the context
+    """
+
+    with LocalSink(directory, compression, max_records_per_shard) as sink:
+        TAP_CONFIG.message_writer = sink
+
+        try:
+            yield sink
+        finally:
+            TAP_CONFIG.message_writer = None
@@ -0,0 +1,188 @@
+from typing import (
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+import json
+import os
+from time import monotonic
+from singer import get_logger
+from .utils import write_json
+
+LOGGER = get_logger()
+
+# How much a new run's statistics weigh against the previous runs' average
+_SMOOTHING = 0.5
+
+
+class StreamStats(NamedTuple):
+    """ How long a top-level stream, along with its substreams, takes to sync """
+
+    seconds: float
+    pages: int
+    records: int
+
+    def merge(self, latest: "StreamStats") -> "StreamStats":
+        """ Averages `latest` into the statistics of the previous runs """
+
+        return StreamStats(
+            self.seconds + (latest.seconds - self.seconds) * _SMOOTHING,
+            round(self.pages + (latest.pages - self.pages) * _SMOOTHING),
+            round(self.records + (latest.records - self.records) * _SMOOTHING),
+        )
+
+
+class RunStats:
+    """Statistics of previous syncs by stream, kept in a small JSON file at
+    `path` - each stream's being rewritten once it's synced
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.streams: Dict[str, StreamStats] = {}
+
+    def load(self) -> "RunStats":
+        if not os.path.exists(self.path):
+            LOGGER.info("No run statistics found at %s", self.path)
+            return self
+
+        try:
+            with open(self.path) as file:
+                self.streams = {
+                    tap_stream_id: StreamStats(**stream_stats)
+                    for tap_stream_id, stream_stats in json.load(file).items()
+                }
+        except (OSError, ValueError, TypeError, AttributeError) as err:
+            LOGGER.warning("Ignoring unreadable run statistics: %s", err)
+
+        return self
+
+    def write(self) -> None:
+        """ Atomically writes the statistics """
+
+        # Within a subdirectory per company, when syncing several
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        write_json(
+            self.path,
+            {
+                tap_stream_id: stream_stats._asdict()
+                for tap_stream_id, stream_stats in sorted(self.streams.items())
+            },
+        )
+
+    def expected_seconds(self, tap_stream_id: str) -> Optional[float]:
+        stream_stats = self.streams.get(tap_stream_id)
+
+        return None if stream_stats is None else stream_stats.seconds
+
+    def record(self, tap_stream_id: str, latest: StreamStats) -> None:
+        previous = self.streams.get(tap_stream_id)
+        self.streams[tap_stream_id] = (
+            latest if previous is None else previous.merge(latest)
+        )
+
+    def order_longest_first(
+        self, tap_stream_ids: Iterable[str], first: Collection[str] = ()
+    ) -> List[str]:
+        """Orders streams by how long they're expected to take, after those in
+        `first` - streams never synced before are assumed to be the longest,
+        keeping their order
+        """
+
+        def key(tap_stream_id: str) -> Tuple[bool, float]:
+            seconds = self.expected_seconds(tap_stream_id)
+
+            return (
+                tap_stream_id not in first,
+                float("-inf") if seconds is None else -seconds,
+            )
+
+        return sorted(tap_stream_ids, key=key)
+
+
+class SyncProgress:
+    """Records the statistics of each stream as it's synced, logging an
+    estimate of the time left in the sync based on the previous runs
+
+    Not thread-safe - streams synced concurrently start and finish while
+    holding the scheduler's lock.
+    """
+
+    def __init__(
+        self,
+        run_stats: Optional[RunStats],
+        tap_stream_ids: Sequence[str],
+        concurrency: int = 1,
+    ):
+        self.run_stats = run_stats
+        self.concurrency = concurrency
+
+        self.pending = list(tap_stream_ids)
+        self.started: Dict[str, float] = {}
+
+    def estimate_seconds(self) -> Optional[float]:
+        """Estimates the seconds left until every stream is synced - None when
+        a stream left has never been synced before
+        """
+
+        if self.run_stats is None:
+            return None
+
+        now = monotonic()
+        seconds_left: List[float] = []
+
+        for tap_stream_id in self.pending:
+            expected = self.run_stats.expected_seconds(tap_stream_id)
+
+            if expected is None:
+                return None
+
+            elapsed = now - self.started.get(tap_stream_id, now)
+            seconds_left.append(max(expected - elapsed, 0.0))
+
+        if not seconds_left:
+            return 0.0
+
+        # The longest stream left bounds the sync, however many run at once
+        return max(*seconds_left, sum(seconds_left) / self.concurrency)
+
+    def log_estimate(self) -> None:
+        seconds = self.estimate_seconds()
+
+        if seconds is not None:
+            LOGGER.info(
+                "%d streams left to sync, expected to take about %d seconds",
+                len(self.pending),
+                round(seconds),
+            )
+
+    def start(self, tap_stream_id: str) -> None:
+        self.started[tap_stream_id] = monotonic()
+
+    def finish(self, tap_stream_id: str, pages: int, records: int) -> None:
+        seconds = monotonic() - self.started.pop(tap_stream_id)
+        self.pending.remove(tap_stream_id)
+
+        LOGGER.info(
+            'Synced %d records in %d pages for stream "%s" in %.1f seconds',
+            records,
+            pages,
+            tap_stream_id,
+            seconds,
+        )
+
+        if self.run_stats is not None:
+            self.run_stats.record(tap_stream_id, StreamStats(seconds, pages, records))
+            self.run_stats.write()
+
+        self.log_estimate()
+
+
+def load_run_stats(path: Optional[str]) -> Optional[RunStats]:
+    return None if path is None else RunStats(path).load()
@@ -4,6 +4,8 @@ from typing import (
     Callable,
     Dict,
     Generator,
+    Iterable,
+    Iterator,
     List,
     Optional,
     Sequence,
@@ -11,9 +13,12 @@ from typing import (
     Type,
 )
 from abc import ABC, abstractmethod
+from contextlib import ExitStack, contextmanager
 from singer import get_logger
-from singer.metadata import to_map as mdata_to_map
 from ..base import DataContext
+from ..catalog import index_catalog
+from ..transformers.plan import TransformPlan
+from ..transformers.pool import TransformPool, get_transform_processes
 from ..utils import denest
 
 if TYPE_CHECKING:
@@ -29,7 +34,7 @@ _FILTER_HOOK = Callable[[Dict[str, str], DataContext], bool]
 
 
 def _attach_tap_stream_id(
-    tap_stream_id: str, record_generator: Generator[Dict[str, Any], None, None]
+    tap_stream_id: str, record_generator: Iterable[Dict[str, Any]]
 ) -> Generator[Tuple[str, Dict[str, Any]], None, None]:
     """ Appends the related tap_stream_id to a Record. """
 
@@ -52,20 +57,29 @@ class StreamABC(ABC):
         config: Dict[str, Any],
         filter_hook: Optional[_FILTER_HOOK] = None,
     ):
-        self.catalog_entry = catalog.get_stream(self.tap_stream_id)
+        # Streams are given the catalog the sync indexed once - also for each
+        # company synced in the same process - so they share its dicts, and
+        # thus its entries' cached compiled schemas. A plain catalog is
+        # indexed for this stream alone.
+        indexed_catalog = index_catalog(catalog)
+
+        self.catalog_entry = indexed_catalog.get_entry(self.tap_stream_id)
         self.config = config
         self.replication_key = self.catalog_entry.replication_key
         self.replication_method = self.catalog_entry.replication_method
 
-        self.mapped_metadata = mdata_to_map(self.catalog_entry.metadata)
-        self.schema_dict = self.catalog_entry.schema.to_dict()
+        self.schema_dict = indexed_catalog.get_schema_dict(self.tap_stream_id)
+        self.mapped_metadata = indexed_catalog.get_metadata_map(self.tap_stream_id)
         self.filter_hook: _FILTER_HOOK = (
             (lambda *_, **__: False) if filter_hook is None else filter_hook
         )
 
         self._check_replication_config()
 
-        self._is_selected: Optional[bool] = None
+        self._is_selected = indexed_catalog.is_stream_selected(self.tap_stream_id)
+        self.selected_properties = self._get_selected_properties()
+        self.transform_plan = TransformPlan.for_stream(self)
+        self.page_count = 0
 
     @property
     def is_valid_incremental(self) -> bool:
@@ -80,11 +94,30 @@ class StreamABC(ABC):
     def is_selected(self) -> bool:
         """ Whether the stream is selected """
 
-        if self._is_selected is None:
-            self._is_selected = self.catalog_entry.is_selected()
-
         return self._is_selected
 
+    def _get_selected_properties(self) -> Optional[List[str]]:
+        """The top-level properties that aren't deselected in the catalog -
+        None when all of them are selected
+        """
+
+        selected = []
+
+        for property_name in self.schema_dict.get("properties", {}):
+            entry = self.mapped_metadata.get(("properties", property_name), {})
+
+            if entry.get("inclusion") != "automatic" and (
+                entry.get("selected") is False or entry.get("inclusion") == "unsupported"
+            ):
+                continue
+
+            selected.append(property_name)
+
+        if len(selected) == len(self.schema_dict.get("properties", {})):
+            return None
+
+        return selected
+
     @property
     @abstractmethod
     def transformer_class(self) -> Type["RecordTransformer"]:
@@ -115,6 +148,40 @@ class StreamABC(ABC):
 class Substream(StreamABC):
     """ Base class for all substreams """
 
+    def __init__(
+        self,
+        catalog: "Catalog",
+        config: Dict[str, Any],
+        filter_hook: Optional[_FILTER_HOOK] = None,
+    ):
+        super().__init__(catalog, config, filter_hook)
+
+        self._shared_transformer: Optional["RecordTransformer"] = None
+
+    @contextmanager
+    def sharing_transformer(self) -> Iterator[None]:
+        """Transforms the sub-records of every parent synced within the
+        context with one transformer - so its warnings and metrics are
+        emitted once, rather than once per parent record
+        """
+
+        with self.transformer_class() as transformer:
+            self._shared_transformer = transformer
+
+            try:
+                yield
+            finally:
+                self._shared_transformer = None
+
+    @contextmanager
+    def transformer(self) -> Iterator["RecordTransformer"]:
+        """ The shared transformer, if any, otherwise a new one """
+
+        with ExitStack() as stack:
+            yield self._shared_transformer or stack.enter_context(
+                self.transformer_class()
+            )
+
 
 class ResponseSubstream(Substream):
     """A substream derived from a parent stream's response
@@ -151,7 +218,7 @@ class EndpointSubstream(Substream):
     def sync(
         self, parent_record: Dict[str, Any], filter_datetime: "datetime"
     ) -> Generator[Tuple[str, Dict[str, Any]], None, None]:
-        with self.transformer_class() as transformer:
+        with self.transformer() as transformer:
             context = DataContext(
                 stream=self,
                 filter_datetime=filter_datetime,
@@ -159,17 +226,18 @@ class EndpointSubstream(Substream):
                 tap_stream_id=self.tap_stream_id,
             )
 
-            for record in self.request_handler.fetch(context=context):
-                if self.filter_hook(record, context):
-                    continue
+            for page in self.request_handler.fetch_pages(context=context):
+                self.page_count += 1
 
                 yield from _attach_tap_stream_id(
                     self.tap_stream_id,
-                    transformer.transform(
-                        record,
-                        self.schema_dict,
-                        context=context,
-                        metadata=self.mapped_metadata,
+                    transformer.transform_batch(
+                        [
+                            record
+                            for record in page
+                            if not self.filter_hook(record, context)
+                        ],
+                        context,
                     ),
                 )
 
@@ -211,31 +279,54 @@ class Stream(StreamABC):
     def sync(
         self, filter_datetime: "datetime"
     ) -> Generator[Tuple[str, Dict[str, Any]], None, None]:
-        with self.transformer_class() as transformer:
+        with ExitStack() as stack:
+            transformer = stack.enter_context(self.transformer_class())
+
+            for substream in self.substreams:
+                if isinstance(substream, Substream) and substream.is_selected:
+                    stack.enter_context(substream.sharing_transformer())
+
             context = DataContext(
                 stream=self,
                 filter_datetime=filter_datetime,
                 tap_stream_id=self.tap_stream_id,
             )
 
-            for record in self.request_handler.fetch(context=context):
-                yield from self.sync_substreams(record, filter_datetime)
+            processes = get_transform_processes(self.tap_stream_id)
+            pool = (
+                None
+                if processes is None
+                else stack.enter_context(TransformPool(self, transformer, processes))
+            )
 
-                # Skip primary stream if record is filtered,
-                # but give substreams a chance to perform
-                # their own filtering.
-                if self.filter_hook(record, context):
-                    continue
+            for page in self.request_handler.fetch_pages(context=context):
+                self.page_count += 1
+                records = []
 
-                yield from _attach_tap_stream_id(
-                    self.tap_stream_id,
-                    transformer.transform(
-                        record,
-                        self.schema_dict,
-                        context=context,
-                        metadata=self.mapped_metadata,
-                    ),
-                )
+                for record in page:
+                    yield from self.sync_substreams(record, filter_datetime)
+
+                    # Skip primary stream if record is filtered,
+                    # but give substreams a chance to perform
+                    # their own filtering.
+                    if not self.filter_hook(record, context):
+                        records.append(record)
+
+                if pool is None:
+                    yield from _attach_tap_stream_id(
+                        self.tap_stream_id, transformer.transform_batch(records, context)
+                    )
+                else:
+                    # Substream records may be emitted ahead of their
+                    # parents' pages, which are still being transformed
+                    pool.submit(records)
+
+                    for transformed in pool.results():
+                        yield from _attach_tap_stream_id(self.tap_stream_id, transformed)
+
+            if pool is not None:
+                for transformed in pool.results(wait=True):
+                    yield from _attach_tap_stream_id(self.tap_stream_id, transformed)
 
     def sync_sub_records(
         self,
@@ -254,20 +345,18 @@ class Stream(StreamABC):
 
         denested_value = denest(parent_record, substream.path)
 
-        with substream.transformer_class() as transformer:
-            for sub_record in denested_value:
-                if self.filter_hook(sub_record, context):
-                    continue
-
-                yield from _attach_tap_stream_id(
-                    substream.tap_stream_id,
-                    transformer.transform(
-                        sub_record,
-                        substream.schema_dict,
-                        context=context,
-                        metadata=substream.mapped_metadata,
-                    ),
-                )
+        with substream.transformer() as transformer:
+            yield from _attach_tap_stream_id(
+                substream.tap_stream_id,
+                transformer.transform_batch(
+                    [
+                        sub_record
+                        for sub_record in denested_value
+                        if not self.filter_hook(sub_record, context)
+                    ],
+                    context,
+                ),
+            )
 
     def sync_substreams(
         self, parent_record: Dict[str, Any], filter_datetime: "datetime"
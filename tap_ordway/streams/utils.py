@@ -1,4 +1,5 @@
 from typing import TYPE_CHECKING, Any
+from ..catalog import index_catalog
 from .base import Substream
 from .definitions import AVAILABLE_STREAMS
 from .exceptions import DependencyConflict
@@ -10,19 +11,21 @@ if TYPE_CHECKING:
 def check_dependency_conflicts(catalog: "Catalog") -> None:
     """ Raises a DependencyConflict exception when a substream is selected when its parent stream isn't """
 
+    indexed_catalog = index_catalog(catalog)
+
     for tap_stream_id, stream in AVAILABLE_STREAMS.items():
         if is_substream(stream) or (
             hasattr(stream, "has_substreams") and not stream.has_substreams  # type: ignore
         ):
             continue
 
-        if catalog.get_stream(tap_stream_id).is_selected():
+        if indexed_catalog.is_stream_selected(tap_stream_id):
             continue
 
         # It doesn't seem to properly consider is_substream, but
         # perhaps I'm missing something.
         for substream in stream.substream_definitions:  # type: ignore
-            if catalog.get_stream(substream.tap_stream_id).is_selected():
+            if indexed_catalog.is_stream_selected(substream.tap_stream_id):  # type: ignore
                 raise DependencyConflict(
                     f'Stream "{stream.tap_stream_id}" cannot be deselected when its child stream "{substream.tap_stream_id}" is selected'
                 )
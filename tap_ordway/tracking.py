@@ -0,0 +1,119 @@
+from typing import TYPE_CHECKING, Any, Collection, Dict, Optional, Tuple, Type, Union
+import os
+import struct
+from abc import ABC, abstractmethod
+from hashlib import blake2b
+
+if TYPE_CHECKING:
+    from .streams.base import Stream, Substream
+
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sBQ")
+_CHECKSUM_SIZE = 16
+
+
+def _checksum(payload: bytes) -> bytes:
+    return blake2b(payload, digest_size=_CHECKSUM_SIZE).digest()
+
+
+def read_store(path: str, magic: bytes, error: Type[Exception]) -> Tuple[int, bytes]:
+    """Reads a tracker's store file, returning its item count and payload -
+    raising `error` when it's truncated, of another kind or corrupt
+    """
+
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if len(data) < _HEADER.size + _CHECKSUM_SIZE:
+        raise error(f"{path} is truncated")
+
+    store_magic, version, count = _HEADER.unpack_from(data)
+
+    if store_magic != magic or version != _FORMAT_VERSION:
+        raise error(f"{path} is of an unknown format")
+
+    payload = data[_HEADER.size : -_CHECKSUM_SIZE]
+
+    if _checksum(payload) != data[-_CHECKSUM_SIZE:]:
+        raise error(f"{path} failed its integrity check")
+
+    return count, payload
+
+
+def write_store(path: str, magic: bytes, count: int, payload: bytes) -> None:
+    """ Atomically writes a tracker's store file """
+
+    tmp_path = f"{path}.tmp"
+
+    with open(tmp_path, "wb") as file:
+        file.write(_HEADER.pack(magic, _FORMAT_VERSION, count))
+        file.write(payload)
+        file.write(_checksum(payload))
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(tmp_path, path)
+
+
+class FullTableTracker(ABC):
+    """Base class for tracking FULL_TABLE streams' records across syncs
+    in a local directory, so they can be emitted without replacing the
+    target's table
+
+    A stream is only emitted without a table version when every tracker
+    enabled for it can `start` from a valid previous sync. Otherwise, all of
+    them `fall_back` to a full emission under a new table version.
+    """
+
+    def __init__(
+        self, directory: str, tap_stream_ids: Optional[Collection[str]] = None
+    ):
+        self.directory = directory
+        self.tap_stream_ids = None if tap_stream_ids is None else set(tap_stream_ids)
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def is_enabled(self, stream_def: Union["Stream", "Substream"]) -> bool:
+        if stream_def.is_valid_incremental:
+            return False
+
+        return (
+            self.tap_stream_ids is None
+            or stream_def.tap_stream_id in self.tap_stream_ids
+        )
+
+    def extend_schema(  # pylint: disable=unused-argument
+        self, stream_def: Union["Stream", "Substream"], schema: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """ Adds any properties the tracker emits to a stream's schema """
+
+        return schema
+
+    @abstractmethod
+    def start(
+        self, stream_def: Union["Stream", "Substream"], state: Dict[str, Any]
+    ) -> bool:
+        """Prepares tracking for `stream_def` - returning whether its records
+        can be emitted without a table version
+        """
+
+    @abstractmethod
+    def fall_back(self, tap_stream_id: str) -> None:
+        """ Emits all of a stream's records under a new table version """
+
+    @abstractmethod
+    def should_emit(self, tap_stream_id: str, record: Dict[str, Any]) -> bool:
+        """ Tracks `record`, returning whether or not it should be emitted """
+
+    def emit(  # pylint: disable=unused-argument
+        self, stream_versions: Dict[str, Optional[int]]
+    ) -> None:
+        """Emits any records owed for the streams synced so far, under their
+        `stream_versions` - before the STATE finishing them is written
+        """
+
+    @abstractmethod
+    def commit(self) -> None:
+        """Finishes tracking for all streams synced so far - only once the
+        STATE finishing them is written
+        """
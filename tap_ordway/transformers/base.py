@@ -1,13 +1,41 @@
-from typing import TYPE_CHECKING, Any, Callable, Dict, Generator, Optional, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from collections import Counter
+from contextlib import contextmanager
 from decimal import Decimal
-from inspect import isgeneratorfunction
-from inflection import singularize
-from singer.transform import NO_INTEGER_DATETIME_PARSING, Transformer
+from time import perf_counter
+from singer import get_logger
+from singer.transform import NO_INTEGER_DATETIME_PARSING, SchemaMismatch, Transformer
+import tap_ordway.configs as TAP_CONFIG
 from ..base import DataContext
-from ..utils import get_company_id
+from .compiled import CompiledSchema, Converter, Hook, get_compiled_schema
+from .decimals import to_decimal
+from .metrics import (
+    CountingSet,
+    get_field_name,
+    log_transform_metrics,
+    restore_counter,
+)
+from .trusted import Projection, SampledValidation, compile_projection
 
 if TYPE_CHECKING:
     from datetime import datetime
+    from .plan import TransformPlan
+
+LOGGER = get_logger()
 
 
 def _transform_string(data: Any) -> Optional[str]:
@@ -21,15 +49,24 @@ def _transform_boolean(data: Any) -> Optional[bool]:
     return data if data != "-" else False
 
 
+def _get_types(schema: Dict[str, Any]) -> List[str]:
+    types = schema.get("type", [])
+
+    return types if isinstance(types, list) else [types]
+
+
+def _transform_null(data: Any) -> Any:
+    # Treat '-' as equivalent to None
+    return None if data == "-" else data
+
+
 def transformer_prehook(data: Any, property_type: str, _) -> Any:
     if property_type == "boolean":
         return _transform_boolean(data)
     if property_type == "string":
         return _transform_string(data)
     if property_type == "null":
-        # Treat '-' as equivalent to None
-        if data == "-":
-            return None
+        return _transform_null(data)
 
     return data
 
@@ -39,6 +76,15 @@ class PrecisionSafeTransformer(Transformer):
     properties to Decimal instances instead of floats
     """
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Counted by path, to be emitted as metrics
+        self.removed = CountingSet()
+        self.filtered = CountingSet()
+        # Values of number properties which couldn't be converted, by field
+        self.number_failures: Counter = Counter()
+
     # Why is this necessary? Singer converts all
     # number properties to floats during transformation
     # causing potential precision loss. Instead,
@@ -46,22 +92,304 @@ class PrecisionSafeTransformer(Transformer):
     # (the package singer uses for serialization) handles.
     def _transform(self, data, typ, schema, path):
         if typ == "number":
-            if self.pre_hook:
-                data = self.pre_hook(data, typ, schema)
+            value = to_decimal(self.pre_hook(data, typ, schema) if self.pre_hook else data)
 
-            if isinstance(data, str):
-                data = data.replace(",", "")
-
-            try:
-                return True, Decimal(data)
-            except:  # pylint: disable=bare-except
+            if value is None:
                 return False, None
 
+            return True, value
+
         # pylint: disable=protected-access
         return super()._transform(data, typ, schema, path)
 
+    def transform_recur(self, data, schema, path):
+        success, value = super().transform_recur(data, schema, path)
+
+        # Only once no type of the schema accepted the value - and empty
+        # values are left for the null type
+        if (
+            not success
+            and "number" in _get_types(schema)
+            and not super()._transform(data, "null", schema, path)[0]
+        ):
+            self.count_number_failure(path)
+
+        return success, value
+
+    def _transform_anyof(self, data, schema, path):
+        number_failures = self.number_failures.copy()
+        success, value = super()._transform_anyof(data, schema, path)
+
+        if success:
+            # Subschemas failing before one accepted the value didn't fail
+            # the value itself
+            restore_counter(self.number_failures, number_failures)
+
+        return success, value
+
+    def count_number_failure(self, path: List[Any]) -> None:
+        """ Counts a value at `path` which couldn't be converted to a number """
+
+        self.number_failures[get_field_name(path)] += 1
+
+    def log_warning(self):
+        super().log_warning()
+
+        for field_name, count in sorted(self.number_failures.items()):
+            LOGGER.warning(
+                'Failed to convert %d value(s) of "%s" to a number', count, field_name
+            )
+
+    def transform_batch(
+        self,
+        records: Iterable[Dict[str, Any]],
+        schema: Dict[str, Any],
+        metadata=None,
+    ) -> List[Dict[str, Any]]:
+        """ Transforms a page of records sharing `schema` and `metadata` """
+
+        return [self.transform(record, schema, metadata) for record in records]
+
+
+class CompiledSchemaTransformer(PrecisionSafeTransformer):
+    """A PrecisionSafeTransformer which compiles each schema and its metadata
+    into per-field converters the first time they're used, instead of
+    interpreting the schema for every record
+
+    Results, errors, removed and filtered paths are identical to those of
+    PrecisionSafeTransformer.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Decimals memoized for the page being transformed by transform_batch,
+        # as its records tend to repeat amounts. Dates are cached globally.
+        self.page_decimals: Optional[Dict[str, Decimal]] = None
+
+    def _get_hook(self, typ: str, schema: Dict[str, Any]) -> Hook:
+        pre_hook = self.pre_hook
+
+        if not pre_hook:
+            return None
+
+        if pre_hook is transformer_prehook:
+            # Only these types are altered by transformer_prehook
+            return {
+                "boolean": _transform_boolean,
+                "string": _transform_string,
+                "null": _transform_null,
+            }.get(typ)
+
+        return lambda data: pre_hook(data, typ, schema)
+
+    def get_projection(
+        self, schema, metadata, selected_properties: Optional[List[str]]
+    ) -> Optional[Projection]:
+        """ The projection of records onto `schema`, if they can be projected """
+
+        return compile_projection(
+            schema,
+            metadata,
+            selected_properties,
+            self._get_hook,
+            self.integer_datetime_fmt,
+            # transformer_prehook only empties strings, and turns "-" to False
+            self.pre_hook in (None, transformer_prehook),
+        )
+
+    def get_compiled_schema(self, schema, metadata) -> CompiledSchema:
+        """ `schema` and `metadata` compiled for this transformer's settings """
+
+        return get_compiled_schema(
+            schema, metadata, self.pre_hook, self._get_hook, self.integer_datetime_fmt
+        )
 
-class RecordTransformer:
+    def _transform_compiled(self, data, compiled: CompiledSchema):
+        if compiled.filter_data is not None:
+            data = compiled.filter_data(data, self)
+
+        success, transformed_data = compiled.convert(data, None, self)
+
+        if not success:
+            raise SchemaMismatch(self.errors)
+
+        return transformed_data
+
+    def transform(self, data, schema, metadata=None):
+        return self._transform_compiled(
+            data, self.get_compiled_schema(schema, metadata)
+        )
+
+    @contextmanager
+    def memoize_page(self) -> Iterator[None]:
+        """Memoizes decimals for the page transformed within the context -
+        sharing the memo of an enclosing page, if any
+        """
+
+        if self.page_decimals is not None:
+            yield
+            return
+
+        self.page_decimals = {}
+
+        try:
+            yield
+        finally:
+            self.page_decimals = None
+
+    def transform_batch(
+        self,
+        records: Iterable[Dict[str, Any]],
+        schema: Dict[str, Any],
+        metadata=None,
+    ) -> List[Dict[str, Any]]:
+        return self.transform_compiled(
+            records, self.get_compiled_schema(schema, metadata)
+        )
+
+    def transform_compiled(
+        self, records: Iterable[Dict[str, Any]], compiled: CompiledSchema
+    ) -> List[Dict[str, Any]]:
+        """ Transforms a page of records with an already compiled schema """
+
+        with self.memoize_page():
+            return [self._transform_compiled(record, compiled) for record in records]
+
+    def _prune_property(
+        self, compiled: CompiledSchema, key: str, value: Any
+    ) -> Tuple[Optional[Converter], Any]:
+        """Filters a top-level property by metadata - returning its converter
+        and filtered value, or no converter if it's deselected or unknown
+        """
+
+        if compiled.filter_data is not None:
+            kept, value = compiled.filter_data.filter_property(key, value, self)
+
+            if not kept:
+                return None, None
+
+        convert = compiled.properties.get(key)  # type: ignore
+
+        if convert is None:
+            # Not in the schema - likely new data
+            self.removed.add(key)
+
+        return convert, value
+
+    def _restore_counts(
+        self,
+        error_count: int,
+        removed: Counter,
+        filtered: Counter,
+        number_failures: Counter,
+    ) -> None:
+        """ Restores the errors and counts recorded before an attempt """
+
+        del self.errors[error_count:]
+        self.removed.restore(removed)
+        self.filtered.restore(filtered)
+        restore_counter(self.number_failures, number_failures)
+
+    def transform_lines(
+        self,
+        header: Dict[str, Any],
+        lines: Sequence[Tuple[Dict[str, Any], Dict[str, Any]]],
+        compiled: CompiledSchema,
+        excluded: Sequence[str] = (),
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Transforms the records made by updating each line with `header` and
+        its line's values, then deleting `excluded` - converting the header
+        once instead of once per line. Records share the header's values.
+
+        Deselected properties are pruned from the header once, before any
+        conversion. Returns None, with nothing recorded, when any value fails
+        to transform or the schema needs to be interpreted as a whole -
+        leaving the records for `transform`.
+        """
+
+        if not lines:
+            return []
+
+        properties = compiled.properties
+
+        if (
+            properties is None
+            or self._get_hook("object", compiled.schema) is not None
+        ):
+            return None
+
+        # Restored when falling back, as the records are transformed again
+        error_count = len(self.errors)
+        counts = (
+            self.removed.counts.copy(),
+            self.filtered.counts.copy(),
+            self.number_failures.copy(),
+        )
+        template: Dict[str, Any] = {}
+
+        for key, value in header.items():
+            if key in excluded:
+                continue
+
+            convert, value = self._prune_property(compiled, key, value)
+
+            if convert is None:
+                continue
+
+            if key in lines[0][1]:
+                # Derived from each line
+                template[key] = None
+                continue
+
+            success, template[key] = convert(value, (None, key), self)
+
+            if not success:
+                self._restore_counts(error_count, *counts)
+                return None
+
+        results = []
+
+        for line, line_values in lines:
+            record: Dict[str, Any] = {}
+
+            for key, value in line.items():
+                if key in excluded:
+                    continue
+                if key in header:
+                    if key in template:
+                        # Keeps the line's key order
+                        record[key] = None
+                    continue
+
+                convert, value = self._prune_property(compiled, key, value)
+
+                if convert is None:
+                    continue
+
+                success, record[key] = convert(value, (None, key), self)
+
+                if not success:
+                    self._restore_counts(error_count, *counts)
+                    return None
+
+            record.update(template)
+
+            for key, value in line_values.items():
+                if key in template:
+                    _, value = self._prune_property(compiled, key, value)
+                    success, record[key] = properties[key](value, (None, key), self)
+
+                    if not success:
+                        self._restore_counts(error_count, *counts)
+                        return None
+
+            results.append(record)
+
+        return results
+
+
+class RecordTransformer:  # pylint: disable=too-many-instance-attributes
     """A wrapper around Singer's Transformer that allows transforming record data
     as a whole.
 
@@ -75,12 +403,26 @@ class RecordTransformer:
         integer_datetime_fmt=NO_INTEGER_DATETIME_PARSING,
         pre_hook=transformer_prehook,
     ):
-        self._schema_transformer = PrecisionSafeTransformer(
+        schema_transformer_class = (
+            CompiledSchemaTransformer
+            if TAP_CONFIG.compile_schemas
+            else PrecisionSafeTransformer
+        )
+        self._schema_transformer = schema_transformer_class(
             integer_datetime_fmt, pre_hook
         )
         self.removed = self._schema_transformer.removed
         self.filtered = self._schema_transformer.filtered
         self.errors = self._schema_transformer.errors
+        self.number_failures = self._schema_transformer.number_failures
+
+        # Time spent in transform and transform_batch, and records transformed
+        self.tap_stream_id: Optional[str] = None
+        self.transform_seconds = 0.0
+        self.transformed_records = 0
+
+        # Keyed by tap_stream_id - None for trusted streams that can't be
+        self._sampled_validations: Dict[str, Optional[SampledValidation]] = {}
 
     @property
     def pre_hook(self) -> Callable:
@@ -104,6 +446,16 @@ class RecordTransformer:
     def __exit__(self, *args):
         self._schema_transformer.log_warning()
 
+        if self.transformed_records or self.errors:
+            log_transform_metrics(self, self.tap_stream_id)
+
+    def record_timing(self, tap_stream_id: str, seconds: float, records: int) -> None:
+        """ Adds time spent transforming `records` of a stream """
+
+        self.tap_stream_id = tap_stream_id
+        self.transform_seconds += seconds
+        self.transformed_records += records
+
     def pre_transform(
         self,
         data: Dict[str, Any],
@@ -111,12 +463,12 @@ class RecordTransformer:
     ) -> Union[Dict[str, Any], Generator[Dict[str, Any], None, None]]:
         """Transforms `data` as a whole - as opposed to a pre_hook"""
 
-        data["company_id"] = get_company_id()
+        plan = context.stream.transform_plan
 
-        singular_tap_stream_id = f"{singularize(context.tap_stream_id)}_id"
+        data["company_id"] = plan.company_id
 
-        if singular_tap_stream_id not in data:
-            data[singular_tap_stream_id] = data.get("id")
+        if plan.id_property not in data:
+            data[plan.id_property] = data.get("id")
 
         if "id" in data:
             del data["id"]
@@ -130,7 +482,22 @@ class RecordTransformer:
         context: DataContext,
         metadata=None,
     ) -> Generator[Dict[str, Any], None, None]:
-        if isgeneratorfunction(self.pre_transform):
+        start = perf_counter()
+        transformed = list(self._transform(data, schema, context, metadata))
+        self.record_timing(
+            context.tap_stream_id, perf_counter() - start, len(transformed)
+        )
+
+        yield from transformed
+
+    def _transform(
+        self,
+        data: Dict[str, Any],
+        schema,
+        context: DataContext,
+        metadata=None,
+    ) -> Generator[Dict[str, Any], None, None]:
+        if context.stream.transform_plan.pre_transform_yields:
             for pretransformed_data in self.pre_transform(data, context):
                 yield self._schema_transformer.transform(
                     pretransformed_data, schema, metadata
@@ -139,3 +506,221 @@ class RecordTransformer:
             yield self._schema_transformer.transform(
                 self.pre_transform(data, context), schema, metadata
             )
+
+    def _get_sampled_validation(
+        self, plan: "TransformPlan"
+    ) -> Optional[SampledValidation]:
+        if plan.validation_interval is None:
+            return None
+
+        if plan.tap_stream_id not in self._sampled_validations:
+            projection = self._schema_transformer.get_projection(  # type: ignore
+                plan.schema, plan.metadata, plan.selected_properties
+            )
+
+            if projection is None:
+                LOGGER.warning(
+                    'Stream "%s" can\'t be trusted, as its schema or metadata '
+                    "nest - fully transforming its records",
+                    plan.tap_stream_id,
+                )
+                self._sampled_validations[plan.tap_stream_id] = None
+            else:
+                self._sampled_validations[plan.tap_stream_id] = SampledValidation(
+                    plan.tap_stream_id, projection, plan.validation_interval
+                )
+
+        return self._sampled_validations[plan.tap_stream_id]
+
+    def transform_batch(
+        self, records: Iterable[Dict[str, Any]], context: DataContext
+    ) -> List[Dict[str, Any]]:
+        """Transforms a page of `records` belonging to `context`'s stream -
+        through the stream's TransformPlan
+        """
+
+        start = perf_counter()
+        transformed = self._transform_batch(records, context)
+        self.record_timing(
+            context.tap_stream_id, perf_counter() - start, len(transformed)
+        )
+
+        return transformed
+
+    def _transform_batch(
+        self, records: Iterable[Dict[str, Any]], context: DataContext
+    ) -> List[Dict[str, Any]]:
+        plan = context.stream.transform_plan
+        pretransformed_records: List[Dict[str, Any]]
+
+        if plan.pre_transform_yields:
+            pretransformed_records = [
+                pretransformed_data  # type: ignore
+                for data in records
+                for pretransformed_data in self.pre_transform(data, context)
+            ]
+        else:
+            pretransformed_records = [
+                self.pre_transform(data, context) for data in records  # type: ignore
+            ]
+
+        schema_transformer = self._schema_transformer
+
+        if isinstance(schema_transformer, CompiledSchemaTransformer):
+            compiled = plan.get_compiled_schema(schema_transformer)
+            sampled_validation = self._get_sampled_validation(plan)
+
+            if sampled_validation is not None:
+                return sampled_validation.transform_batch(
+                    pretransformed_records, schema_transformer, compiled
+                )
+
+            return schema_transformer.transform_compiled(
+                pretransformed_records, compiled
+            )
+
+        return schema_transformer.transform_batch(
+            pretransformed_records, plan.schema, plan.metadata
+        )
+
+
+class HeaderField(NamedTuple):
+    """ A parent property copied to each line, converted by `convert` """
+
+    name: str
+    convert: Callable[[Any], Any]
+
+
+class LineField(NamedTuple):
+    """ A line property copied from the line's `source` property """
+
+    name: str
+    source: str
+
+
+class LineItemTransformer(RecordTransformer):
+    """A RecordTransformer which explodes a parent record into one record
+    per line in its `lines_property`, each updated with `fields` - the
+    parent's properties, HeaderFields and LineFields - then stripped of
+    `excluded_line_fields`
+
+    When schemas are compiled, the parent's properties are transformed once
+    per parent rather than once per line.
+    """
+
+    lines_property: str
+    fields: Tuple[Union[str, HeaderField, LineField], ...] = ()
+    excluded_line_fields: Tuple[str, ...] = ()
+
+    def get_header(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """The values copied from `data` to each of its lines - with None
+        in place of LineFields
+        """
+
+        header = {}
+
+        for field in self.fields:
+            if isinstance(field, str):
+                header[field] = data.get(field)
+            elif isinstance(field, HeaderField):
+                header[field.name] = field.convert(data.get(field.name))
+            else:
+                header[field.name] = None
+
+        return header
+
+    def get_line_values(self, line: Dict[str, Any]) -> Dict[str, Any]:
+        """ The LineField values of `line` """
+
+        return {
+            field.name: line.get(field.source)
+            for field in self.fields
+            if isinstance(field, LineField)
+        }
+
+    def _get_lines(
+        self, data: Dict[str, Any], context: DataContext
+    ) -> Tuple[Dict[str, Any], List[Tuple[Dict[str, Any], Dict[str, Any]]]]:
+        super().pre_transform(data, context)
+
+        lines = [
+            (line, self.get_line_values(line))
+            for line in data.get(self.lines_property, [])
+        ]
+
+        for line, _ in lines:
+            for key in self.excluded_line_fields:
+                if key not in line:
+                    raise KeyError(key)
+
+        return self.get_header(data), lines
+
+    def _merge_lines(self, header, lines) -> Generator[Dict[str, Any], None, None]:
+        for line, line_values in lines:
+            line.update({**header, **line_values})
+
+            for key in self.excluded_line_fields:
+                del line[key]
+
+            yield line
+
+    def pre_transform(self, data: Dict[str, Any], context: DataContext):
+        yield from self._merge_lines(*self._get_lines(data, context))
+
+    def _transform_lines(
+        self,
+        data: Dict[str, Any],
+        context: DataContext,
+        compiled: CompiledSchema,
+    ) -> List[Dict[str, Any]]:
+        header, lines = self._get_lines(data, context)
+
+        records = self._schema_transformer.transform_lines(  # type: ignore
+            header, lines, compiled, self.excluded_line_fields
+        )
+
+        if records is None:
+            records = [
+                self._schema_transformer.transform(
+                    line, compiled.schema, compiled.metadata
+                )
+                for line in self._merge_lines(header, lines)
+            ]
+
+        return records
+
+    def _transform(
+        self,
+        data: Dict[str, Any],
+        schema,
+        context: DataContext,
+        metadata=None,
+    ) -> Generator[Dict[str, Any], None, None]:
+        schema_transformer = self._schema_transformer
+
+        if not isinstance(schema_transformer, CompiledSchemaTransformer):
+            yield from super()._transform(data, schema, context, metadata)
+            return
+
+        yield from self._transform_lines(
+            data, context, schema_transformer.get_compiled_schema(schema, metadata)
+        )
+
+    def _transform_batch(
+        self, records: Iterable[Dict[str, Any]], context: DataContext
+    ) -> List[Dict[str, Any]]:
+        schema_transformer = self._schema_transformer
+
+        if not isinstance(schema_transformer, CompiledSchemaTransformer):
+            return super()._transform_batch(records, context)
+
+        compiled = context.stream.transform_plan.get_compiled_schema(
+            schema_transformer
+        )
+
+        with schema_transformer.memoize_page():
+            return [
+                record
+                for data in records
+                for record in self._transform_lines(data, context, compiled)
+            ]
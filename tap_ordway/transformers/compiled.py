@@ -0,0 +1,636 @@
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import re
+from decimal import Decimal
+from singer.transform import (
+    LOGGER,
+    NO_INTEGER_DATETIME_PARSING,
+    UNIX_SECONDS_INTEGER_DATETIME_PARSING,
+    VALID_DATETIME_FORMATS,
+    Error,
+    Transformer,
+    breadcrumb_path,
+    unix_milliseconds_to_datetime,
+    unix_seconds_to_datetime,
+)
+from ..datetimes import string_to_datetime
+from .decimals import to_decimal
+from .metrics import restore_counter
+
+# A converter takes a value, its path and the CompiledSchemaTransformer
+# collecting errors and removed paths, and holding the current page's memoized
+# Decimals - returning a (success, transformed value) tuple like
+# Transformer.transform_recur. Paths are linked (parent, key) tuples which are
+# only expanded into lists when an error or removed path is recorded.
+Path = Optional[Tuple[Any, Any]]
+Converter = Callable[[Any, Path, Transformer], Tuple[bool, Any]]
+Hook = Optional[Callable[[Any], Any]]
+HookFactory = Callable[[str, Dict[str, Any]], Hook]
+
+_MAX_CACHED_SCHEMAS = 256
+
+# Converters share a signature, even when they only need the data
+# pylint: disable=unused-argument
+
+
+def _path_list(path: Path) -> List[Any]:
+    keys = []
+
+    while path is not None:
+        path, key = path
+        keys.append(key)
+
+    keys.reverse()
+
+    return keys
+
+
+def _mismatch(data: Any, path: Path, schema: Dict[str, Any], transformer) -> None:
+    transformer.errors.append(
+        Error(_path_list(path), data, schema, logging_level=LOGGER.level)
+    )
+
+
+def _identity(data: Any, path: Path, transformer: Transformer) -> Tuple[bool, Any]:
+    return True, data
+
+
+def _convert_null(data, path, transformer):
+    if data is None or data == "":
+        return True, None
+
+    return False, None
+
+
+def _convert_string(data, path, transformer):
+    if data is None:
+        return False, None
+
+    try:
+        return True, str(data)
+    except Exception:  # pylint: disable=broad-except
+        return False, None
+
+
+def _convert_decimal_string(data, path, transformer):
+    if isinstance(data, (str, float, int)):
+        try:
+            return True, str(Decimal(str(data)))
+        except Exception:  # pylint: disable=broad-except
+            return False, None
+    elif isinstance(data, Decimal):
+        try:
+            return True, "NaN" if data.is_snan() else str(data)
+        except Exception:  # pylint: disable=broad-except
+            return False, None
+
+    return False, None
+
+
+def _convert_integer(data, path, transformer):
+    if isinstance(data, str):
+        data = data.replace(",", "")
+
+    try:
+        return True, int(data)
+    except Exception:  # pylint: disable=broad-except
+        return False, None
+
+
+def _convert_number(data, path, transformer):
+    # Numbers are converted to Decimal instances, as in PrecisionSafeTransformer
+    decimals = transformer.page_decimals
+
+    if decimals is not None and isinstance(data, str):
+        value = decimals.get(data)
+
+        if value is None:
+            value = to_decimal(data)
+
+            if value is None:
+                return False, None
+
+            decimals[data] = value
+
+        return True, value
+
+    value = to_decimal(data)
+
+    if value is None:
+        return False, None
+
+    return True, value
+
+
+def _convert_boolean(data, path, transformer):
+    if isinstance(data, str) and data.lower() == "false":
+        return True, False
+
+    try:
+        return True, bool(data)
+    except Exception:  # pylint: disable=broad-except
+        return False, None
+
+
+def _convert_unknown(data, path, transformer):
+    return False, None
+
+
+_SCALAR_CONVERTERS: Dict[str, Converter] = {
+    "null": _convert_null,
+    "string": _convert_string,
+    "integer": _convert_integer,
+    "boolean": _convert_boolean,
+}
+
+
+def _with_hook(convert: Converter, hook: Hook) -> Converter:
+    if hook is None:
+        return convert
+
+    def convert_hooked(data, path, transformer):
+        return convert(hook(data), path, transformer)
+
+    return convert_hooked
+
+
+def compile_datetime(integer_datetime_fmt: str) -> Callable[[Any], Optional[str]]:
+    """Returns the equivalent of Transformer._transform_datetime - parsing
+    strings through the datetime cache
+    """
+
+    if integer_datetime_fmt not in VALID_DATETIME_FORMATS:
+
+        def transform_invalid(value):
+            if value is None or value == "":
+                return None
+
+            # pylint: disable=broad-exception-raised
+            raise Exception("Invalid integer datetime parsing option")
+
+        return transform_invalid
+
+    if integer_datetime_fmt == NO_INTEGER_DATETIME_PARSING:
+
+        def transform_string(value):
+            if value is None or value == "":
+                return None
+
+            return string_to_datetime(value)
+
+        return transform_string
+
+    if integer_datetime_fmt == UNIX_SECONDS_INTEGER_DATETIME_PARSING:
+        to_datetime = unix_seconds_to_datetime
+    else:
+        to_datetime = unix_milliseconds_to_datetime
+
+    def transform_integer(value):
+        if value is None or value == "":
+            return None
+
+        try:
+            return to_datetime(value)
+        except Exception:  # pylint: disable=broad-except
+            return string_to_datetime(value)
+
+    return transform_integer
+
+
+class SchemaCompiler:
+    """Compiles JSON schemas into converters equivalent to
+    Transformer.transform_recur
+
+    The schema is only interpreted once: type lists are ordered, pre_hooks are
+    resolved per type and properties are looked up in a dict of their
+    converters, leaving only the conversions themselves to run per record.
+    """
+
+    def __init__(self, hook_factory: HookFactory, integer_datetime_fmt: str):
+        self.hook_factory = hook_factory
+        self.transform_datetime = compile_datetime(integer_datetime_fmt)
+
+        # Keyed by id, holding on to each schema so ids can't be reused
+        self._compiled: Dict[int, Tuple[Dict[str, Any], Converter]] = {}
+
+    def compile(self, schema: Dict[str, Any]) -> Converter:
+        compiled = self._compiled.get(id(schema))
+
+        if compiled is None or compiled[0] is not schema:
+            compiled = (schema, self._compile(schema))
+            self._compiled[id(schema)] = compiled
+
+        return compiled[1]
+
+    def compile_properties(
+        self, schema: Dict[str, Any]
+    ) -> Optional[Dict[str, Converter]]:
+        """Returns the converters of an object schema's properties - None
+        unless the schema is a (nullable) object with properties only
+        """
+
+        types = schema.get("type")
+        types = types if isinstance(types, list) else [types]
+
+        if (
+            "anyOf" in schema
+            or [typ for typ in types if typ != "null"] != ["object"]
+            or schema.get("patternProperties")
+            or not schema.get("properties")
+        ):
+            return None
+
+        return {
+            key: self.compile(value) for key, value in schema["properties"].items()
+        }
+
+    def _compile(self, schema: Dict[str, Any]) -> Converter:
+        if "anyOf" in schema:
+            return self._compile_any_of(schema)
+
+        if "type" not in schema:
+            # No typing information, so the value is left untouched
+            return _identity
+
+        types = schema["type"]
+        if not isinstance(types, list):
+            types = [types]
+
+        # Reordered in place like Transformer does, as the schema is part of
+        # mismatch errors
+        if "null" in types:
+            types.remove("null")
+            types.append("null")
+
+        converters = [self._compile_type(typ, schema) for typ in types]
+        mismatch = (
+            self._compile_number_mismatch(schema) if "number" in types else _mismatch
+        )
+
+        if len(converters) == 1:
+            convert_type = converters[0]
+
+            def convert_single(data, path, transformer):
+                success, value = convert_type(data, path, transformer)
+
+                if success:
+                    return success, value
+
+                mismatch(data, path, schema, transformer)
+
+                return False, None
+
+            return convert_single
+
+        def convert_types(data, path, transformer):
+            for convert_type in converters:
+                success, value = convert_type(data, path, transformer)
+
+                if success:
+                    return success, value
+
+            mismatch(data, path, schema, transformer)
+
+            return False, None
+
+        return convert_types
+
+    def _compile_number_mismatch(
+        self, schema: Dict[str, Any]
+    ) -> Callable[[Any, Path, Any, Any], None]:
+        """Records a mismatch of a schema including the number type - also
+        counting a number failure, unless the value is empty
+        """
+
+        convert_null = _with_hook(_convert_null, self.hook_factory("null", schema))
+
+        def number_mismatch(data, path, schema, transformer):
+            _mismatch(data, path, schema, transformer)
+
+            # Empty values are left for the null type
+            if not convert_null(data, path, transformer)[0]:
+                transformer.count_number_failure(_path_list(path))
+
+        return number_mismatch
+
+    def _compile_any_of(self, schema: Dict[str, Any]) -> Converter:
+        converters = [self.compile(subschema) for subschema in schema["anyOf"]]
+
+        def convert_any_of(data, path, transformer):
+            number_failures = transformer.number_failures.copy()
+
+            for convert in converters:
+                success, value = convert(data, path, transformer)
+
+                if success:
+                    # Subschemas failing before one accepted the value
+                    # didn't fail the value itself
+                    restore_counter(transformer.number_failures, number_failures)
+
+                    return success, value
+
+                transformer.errors.pop()
+
+            _mismatch(data, path, schema, transformer)
+
+            return False, None
+
+        return convert_any_of
+
+    def compile_scalar(self, typ: str, schema: Dict[str, Any]) -> Optional[Converter]:
+        """Compiles the conversion of a scalar `typ` alone - which records
+        neither mismatches nor number failures. None for objects and arrays
+        """
+
+        if typ in ("object", "array"):
+            return None
+
+        return _with_hook(
+            self._get_scalar_converter(typ, schema), self.hook_factory(typ, schema)
+        )
+
+    def _compile_type(self, typ: str, schema: Dict[str, Any]) -> Converter:
+        hook = self.hook_factory(typ, schema)
+
+        if typ == "object":
+            convert = self._compile_object(
+                schema.get("properties", {}), schema.get("patternProperties")
+            )
+        elif typ == "array":
+            convert = self._compile_array(schema)
+        else:
+            convert = self._get_scalar_converter(typ, schema)
+
+        return _with_hook(convert, hook)
+
+    def _get_scalar_converter(self, typ: str, schema: Dict[str, Any]) -> Converter:
+        if typ == "string" and schema.get("format") == "date-time":
+            return self._compile_datetime()
+        if typ == "string" and schema.get("format") == "singer.decimal":
+            return _convert_decimal_string
+        if typ == "number":
+            return _convert_number
+
+        return _SCALAR_CONVERTERS.get(typ, _convert_unknown)
+
+    def _compile_datetime(self) -> Converter:
+        transform_datetime = self.transform_datetime
+
+        # pylint: disable=assignment-from-none
+        def convert_datetime(data, path, transformer):
+            data = transform_datetime(data)
+
+            if data is None:
+                return False, None
+
+            return True, data
+
+        return convert_datetime
+
+    def _compile_object(
+        self,
+        properties: Dict[str, Any],
+        pattern_properties: Optional[Dict[str, Any]],
+    ) -> Converter:
+        if properties == {} and not pattern_properties:
+
+            def convert_any_object(data, path, transformer):
+                return isinstance(data, dict), data
+
+            return convert_any_object
+
+        converters = {key: self.compile(value) for key, value in properties.items()}
+        get_converter: Callable[[str], Optional[Converter]] = converters.get
+
+        if pattern_properties:
+            get_converter = self._compile_pattern_properties(
+                converters, pattern_properties
+            )
+
+        def convert_object(data, path, transformer):
+            if not isinstance(data, dict):
+                return False, data
+
+            result = {}
+            success = True
+
+            for key, value in data.items():
+                convert = get_converter(key)
+
+                if convert is None:
+                    # Not in the schema - likely new data
+                    transformer.removed.add(
+                        ".".join(map(str, _path_list(path) + [key]))
+                    )
+                    continue
+
+                value_success, result[key] = convert(value, (path, key), transformer)
+
+                if not value_success:
+                    success = False
+
+            return success, result
+
+        return convert_object
+
+    def _compile_pattern_properties(
+        self, converters: Dict[str, Converter], pattern_properties: Dict[str, Any]
+    ) -> Callable[[str], Optional[Converter]]:
+        patterns = [
+            (re.compile(pattern), schema) for pattern, schema in pattern_properties.items()
+        ]
+        # Keyed by the indexes of the patterns a property matches
+        any_of_converters: Dict[Tuple[int, ...], Converter] = {}
+
+        def get_converter(key):
+            convert = converters.get(key)
+
+            if convert is not None:
+                return convert
+
+            matches = tuple(
+                index for index, (pattern, _) in enumerate(patterns) if pattern.match(key)
+            )
+
+            if not matches:
+                return None
+
+            if matches not in any_of_converters:
+                any_of_converters[matches] = self.compile(
+                    {"anyOf": [patterns[index][1] for index in matches]}
+                )
+
+            return any_of_converters[matches]
+
+        return get_converter
+
+    def _compile_array(self, schema: Dict[str, Any]) -> Converter:
+        if "items" not in schema:
+
+            def convert_invalid_array(data, path, transformer):
+                # Raises the same KeyError as Transformer would
+                return schema["items"]
+
+            return convert_invalid_array
+
+        convert_item = self.compile(schema["items"])
+
+        def convert_array(data, path, transformer):
+            if not isinstance(data, list):
+                return False, data
+
+            result = []
+            success = True
+
+            for index, item in enumerate(data):
+                item_success, value = convert_item(item, (path, index), transformer)
+                result.append(value)
+
+                if not item_success:
+                    success = False
+
+            return success, result
+
+        return convert_array
+
+
+class MetadataFilter:
+    """The equivalent of Transformer.filter_data_by_metadata, with the
+    properties to drop looked up once
+    """
+
+    def __init__(
+        self,
+        drops: Dict[Tuple[str, ...], List[str]],
+        automatic: Set[Tuple[str, ...]],
+    ):
+        self.drops = drops
+        self.automatic = automatic
+        # Breadcrumbs which lead to nested properties that may be dropped
+        self.ancestors = {
+            parent[:index] for parent in drops for index in range(1, len(parent) + 1)
+        }
+
+    def filter_property(
+        self, key: str, value: Any, transformer, parent: Tuple[str, ...] = ()
+    ) -> Tuple[bool, Any]:
+        """Filters the `key` property of a dict at `parent` - returning
+        whether it's kept, and its filtered value
+        """
+
+        breadcrumb = parent + ("properties", key)
+
+        if key in self.drops.get(parent, ()):
+            transformer.filtered.add(breadcrumb_path(breadcrumb))
+            return False, None
+
+        if breadcrumb in self.ancestors and breadcrumb not in self.automatic:
+            value = self(value, transformer, breadcrumb)
+
+        return True, value
+
+    def __call__(self, data, transformer, parent=()):
+        if isinstance(data, dict):
+            for field_name in self.drops.get(parent, ()):
+                if field_name in data:
+                    del data[field_name]
+                    transformer.filtered.add(
+                        breadcrumb_path(parent + ("properties", field_name))
+                    )
+
+            if self.ancestors:
+                for field_name, value in data.items():
+                    breadcrumb = parent + ("properties", field_name)
+
+                    if (
+                        breadcrumb in self.ancestors
+                        and breadcrumb not in self.automatic
+                    ):
+                        data[field_name] = self(value, transformer, breadcrumb)
+        elif isinstance(data, list) and parent + ("items",) in self.ancestors:
+            breadcrumb = parent + ("items",)
+            data = [self(item, transformer, breadcrumb) for item in data]
+
+        return data
+
+
+def compile_metadata_filter(
+    metadata: Optional[Dict[Tuple[str, ...], Dict[str, Any]]]
+) -> Optional[MetadataFilter]:
+    """Compiles the equivalent of Transformer.filter_data_by_metadata -
+    returning None when it wouldn't filter anything
+    """
+
+    if not metadata:
+        return None
+
+    drops: Dict[Tuple[str, ...], List[str]] = {}
+    automatic = set()
+
+    for breadcrumb, entry in metadata.items():
+        if len(breadcrumb) < 2 or breadcrumb[-2] != "properties":
+            continue
+
+        inclusion = entry.get("inclusion")
+
+        if inclusion == "automatic":
+            automatic.add(breadcrumb)
+        elif entry.get("selected") is False or inclusion == "unsupported":
+            drops.setdefault(breadcrumb[:-2], []).append(breadcrumb[-1])
+
+    if not drops:
+        return None
+
+    return MetadataFilter(drops, automatic)
+
+
+class CompiledSchema:
+    """ A schema and its metadata compiled for a given pre_hook """
+
+    def __init__(
+        self,
+        schema: Dict[str, Any],
+        metadata: Optional[Dict[Tuple[str, ...], Dict[str, Any]]],
+        hook_factory: HookFactory,
+        integer_datetime_fmt: str,
+    ):
+        self.schema = schema
+        self.metadata = metadata
+        self.filter_data = compile_metadata_filter(metadata)
+
+        compiler = SchemaCompiler(hook_factory, integer_datetime_fmt)
+        self.convert = compiler.compile(schema)
+        self.properties = compiler.compile_properties(schema)
+
+
+_compiled_schemas: Dict[Tuple[int, int, Any, str], CompiledSchema] = {}
+
+
+def get_compiled_schema(
+    schema: Dict[str, Any],
+    metadata: Optional[Dict[Tuple[str, ...], Dict[str, Any]]],
+    pre_hook: Any,
+    hook_factory: HookFactory,
+    integer_datetime_fmt: str,
+) -> CompiledSchema:
+    """Returns `schema` compiled along with `metadata` - only compiling it
+    the first time a given schema dict is transformed with
+    """
+
+    # Cached by identity, as streams reuse their schema_dict and
+    # mapped_metadata for every record. The cached entry keeps both alive, so
+    # their ids can't be reused.
+    key = (id(schema), id(metadata), pre_hook, integer_datetime_fmt)
+    compiled = _compiled_schemas.get(key)
+
+    if (
+        compiled is None
+        or compiled.schema is not schema
+        or compiled.metadata is not metadata
+    ):
+        if len(_compiled_schemas) >= _MAX_CACHED_SCHEMAS:
+            _compiled_schemas.clear()
+
+        compiled = CompiledSchema(schema, metadata, hook_factory, integer_datetime_fmt)
+        _compiled_schemas[key] = compiled
+
+    return compiled
@@ -0,0 +1,38 @@
+from typing import Any, Optional
+from decimal import Decimal
+
+# Placeholders Ordway returns in place of missing amounts
+_EMPTY_AMOUNTS = frozenset(["", "-"])
+
+
+def _parse_decimal(value: Any) -> Optional[Decimal]:
+    try:
+        return Decimal(value)
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
+def to_decimal(data: Any) -> Optional[Decimal]:
+    """Converts `data` to a Decimal like `Decimal(data)`, with commas
+    stripped from strings - returning None if it can't be converted
+
+    Missing amounts are rejected up front, as raising and catching
+    Decimal's exception for them costs more than converting an amount.
+    """
+
+    if data is None:
+        return None
+
+    if isinstance(data, str):
+        if data in _EMPTY_AMOUNTS:
+            return None
+        if "," in data:
+            data = data.replace(",", "")
+
+        return _parse_decimal(data)
+
+    # Can't fail to convert
+    if isinstance(data, (int, float, Decimal)):
+        return Decimal(data)
+
+    return _parse_decimal(data)
@@ -0,0 +1,107 @@
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Union
+from collections import Counter
+from singer import get_logger
+from singer.metrics import Point
+from singer.metrics import log as log_metric
+
+if TYPE_CHECKING:
+    from .base import RecordTransformer
+
+LOGGER = get_logger()
+
+TRANSFORM_DURATION = "transform_duration"
+TRANSFORM_RECORD_COUNT = "transform_record_count"
+TRANSFORM_REMOVED_COUNT = "transform_removed_count"
+TRANSFORM_FILTERED_COUNT = "transform_filtered_count"
+TRANSFORM_ERROR_COUNT = "transform_error_count"
+TRANSFORM_NUMBER_FAILURE_COUNT = "transform_number_failure_count"
+
+
+class CountingSet(set):
+    """A set of paths which also counts how many times each path is added -
+    a dict increment per removed or filtered value, rather than a log line
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.counts: Counter = Counter(self)
+
+    def add(self, element):
+        self.counts[element] += 1
+        super().add(element)
+
+    def update(self, *others):
+        for other in others:
+            # Merged from another CountingSet's counts, or a plain iterable
+            self.counts.update(other)
+            super().update(other)
+
+    def clear(self):
+        self.counts.clear()
+        super().clear()
+
+    def restore(self, counts: Counter) -> None:
+        """ Restores the set to an earlier copy of its counts """
+
+        if self.counts != counts:
+            self.clear()
+            self.update(counts)
+
+
+def restore_counter(counter: Counter, snapshot: Counter) -> None:
+    """ Restores a counter - shared by reference - to an earlier copy """
+
+    if counter != snapshot:
+        counter.clear()
+        counter.update(snapshot)
+
+
+def get_field_name(path: Union[str, Sequence[Any]]) -> str:
+    """The field at `path` - a list of keys, or a dotted string of them -
+    without array indexes, so a line's fields are counted together
+    """
+
+    if isinstance(path, str):
+        return ".".join(key for key in path.split(".") if not key.isdigit())
+
+    return ".".join(str(key) for key in path if not isinstance(key, int))
+
+
+def _count_fields(path_counts: Counter) -> Counter:
+    counts: Counter = Counter()
+
+    for path, count in path_counts.items():
+        counts[get_field_name(path)] += count
+
+    return counts
+
+
+def log_transform_metrics(
+    transformer: "RecordTransformer", tap_stream_id: Optional[str]
+) -> None:
+    """Emits the time spent transforming, and counts of the values removed,
+    filtered, mismatching or failing to convert to a number by field
+    """
+
+    tags = {"endpoint": tap_stream_id}
+    points: List[Point] = [
+        Point("timer", TRANSFORM_DURATION, transformer.transform_seconds, tags),
+        Point("counter", TRANSFORM_RECORD_COUNT, transformer.transformed_records, tags),
+    ]
+
+    for metric, counts in [
+        (TRANSFORM_REMOVED_COUNT, _count_fields(transformer.removed.counts)),
+        (TRANSFORM_FILTERED_COUNT, _count_fields(transformer.filtered.counts)),
+        (
+            TRANSFORM_ERROR_COUNT,
+            Counter(get_field_name(error.path) for error in transformer.errors),
+        ),
+        (TRANSFORM_NUMBER_FAILURE_COUNT, transformer.number_failures),
+    ]:
+        for field_name, count in sorted(counts.items()):
+            points.append(
+                Point("counter", metric, count, {**tags, "field": field_name})
+            )
+
+    for point in points:
+        log_metric(LOGGER, point)
@@ -0,0 +1,72 @@
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type
+from inspect import isgeneratorfunction
+from inflection import singularize
+from ..utils import get_company_id
+from .compiled import CompiledSchema
+from .trusted import get_validation_interval
+
+if TYPE_CHECKING:
+    from ..streams.base import StreamABC
+    from .base import CompiledSchemaTransformer, RecordTransformer
+
+
+class TransformPlan:  # pylint: disable=too-many-instance-attributes
+    """Everything transforming a stream's records needs that doesn't depend on
+    the records themselves - resolved once per sync, when the stream is
+    instantiated, rather than for every record
+    """
+
+    # pylint: disable=too-many-positional-arguments
+    def __init__(
+        self,
+        tap_stream_id: str,
+        transformer_class: Type["RecordTransformer"],
+        schema: Dict[str, Any],
+        metadata: Dict[Tuple[str, ...], Dict[str, Any]],
+        company_id: str,
+        selected_properties: Optional[List[str]] = None,
+        validation_interval: Optional[int] = None,
+    ):
+        self.tap_stream_id = tap_stream_id
+        self.schema = schema
+        self.metadata = metadata
+        self.company_id = company_id
+        self.id_property = f"{singularize(tap_stream_id)}_id"
+        self.pre_transform_yields = isgeneratorfunction(transformer_class.pre_transform)
+        self.selected_properties = selected_properties
+        # Only set for trusted streams
+        self.validation_interval = validation_interval
+
+        # Keyed by the pre_hook and integer_datetime_fmt they're compiled for
+        self._compiled_schemas: Dict[Tuple[Any, str], CompiledSchema] = {}
+
+    @classmethod
+    def for_stream(cls, stream: "StreamABC") -> "TransformPlan":
+        return cls(
+            stream.tap_stream_id,
+            stream.transformer_class,
+            stream.schema_dict,
+            stream.mapped_metadata,
+            get_company_id(),
+            stream.selected_properties,
+            get_validation_interval(stream.tap_stream_id),
+        )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Compiled schemas are made of closures, so they're compiled again
+        # wherever the plan is unpickled
+        return {**self.__dict__, "_compiled_schemas": {}}
+
+    def get_compiled_schema(
+        self, transformer: "CompiledSchemaTransformer"
+    ) -> CompiledSchema:
+        """ The stream's schema and metadata compiled for `transformer` """
+
+        key = (transformer.pre_hook, transformer.integer_datetime_fmt)
+        compiled = self._compiled_schemas.get(key)
+
+        if compiled is None:
+            compiled = transformer.get_compiled_schema(self.schema, self.metadata)
+            self._compiled_schemas[key] = compiled
+
+        return compiled
@@ -0,0 +1,203 @@
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Deque,
+    Dict,
+    Generator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+)
+from collections import Counter, deque
+from time import perf_counter
+from singer import get_logger
+from singer.transform import Error, SchemaMismatch
+import tap_ordway.configs as TAP_CONFIG
+from ..base import DataContext
+from .plan import TransformPlan
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from ..streams.base import Stream
+    from .base import RecordTransformer
+
+LOGGER = get_logger()
+
+# Pages queued per process - bounding the records held in memory
+PAGES_PER_PROCESS = 2
+
+
+class _PageResult(NamedTuple):
+    """ A page transformed in a worker process, or the errors it raised """
+
+    transformed: Optional[List[Dict[str, Any]]]
+    errors: Optional[List[Error]]
+    # Counts by path and field, as kept by the worker's transformer
+    removed: "Counter[str]"
+    filtered: "Counter[str]"
+    number_failures: "Counter[str]"
+    seconds: float
+
+
+class _PlannedStream(NamedTuple):
+    """ The part of a stream transformers use, without its unpicklable ones """
+
+    transform_plan: TransformPlan
+
+
+# The transformer and context of the stream a worker process transforms
+_worker: Optional[Tuple["RecordTransformer", DataContext]] = None
+
+
+def _init_worker(
+    transformer_class: Type["RecordTransformer"],
+    tap_stream_id: str,
+    planned_stream: _PlannedStream,
+    compile_schemas: bool,
+) -> None:
+    global _worker  # pylint: disable=global-statement
+
+    TAP_CONFIG.compile_schemas = compile_schemas
+
+    context = DataContext(
+        tap_stream_id=tap_stream_id,
+        stream=planned_stream,  # type: ignore
+        filter_datetime=None,  # type: ignore
+    )
+
+    _worker = (transformer_class(), context)
+
+
+def _transform_page(records: List[Dict[str, Any]]) -> _PageResult:
+    """Transforms a page in a worker process - returning the transformed
+    records or errors, the paths removed or filtered, number failures and the
+    time spent
+    """
+
+    transformer, context = _worker  # type: ignore
+    start = perf_counter()
+
+    try:
+        transformed: Optional[List[Dict[str, Any]]] = transformer.transform_batch(
+            records, context
+        )
+        errors = None
+    except SchemaMismatch:
+        # SchemaMismatch can't be unpickled, so its errors are sent instead
+        transformed, errors = None, list(transformer.errors)
+
+    result = _PageResult(
+        transformed,
+        errors,
+        Counter(transformer.removed.counts),
+        Counter(transformer.filtered.counts),
+        Counter(transformer.number_failures),
+        perf_counter() - start,
+    )
+
+    transformer.errors.clear()
+    transformer.removed.clear()
+    transformer.filtered.clear()
+    transformer.number_failures.clear()
+
+    return result
+
+
+class TransformPool:
+    """Transforms a stream's pages - pre_transform included - in worker
+    processes, returning them in order
+
+    Paths removed or filtered, number failures and the time spent in the
+    workers are added to `transformer`, so they're logged as usual when it
+    exits.
+    """
+
+    def __init__(
+        self, stream: "Stream", transformer: "RecordTransformer", processes: int
+    ):
+        # Deferred, as they import multiprocessing - only needed by syncs
+        # transforming in processes
+        # pylint: disable=import-outside-toplevel
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import get_context
+
+        self.tap_stream_id = stream.tap_stream_id
+        self.transformer = transformer
+        self.max_pending = processes * PAGES_PER_PROCESS
+
+        self._pending: Deque["Future[_PageResult]"] = deque()
+        # The stream's TransformPlan is pickled once per worker. Spawned
+        # rather than forked, as the message writer and stream scheduler may
+        # be running threads holding locks.
+        self._executor = ProcessPoolExecutor(
+            processes,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                stream.transformer_class,
+                stream.tap_stream_id,
+                _PlannedStream(stream.transform_plan),
+                TAP_CONFIG.compile_schemas,
+            ),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        # Pages not yet started aren't needed once the stream stops early.
+        # Cancelled by hand, as shutdown's cancel_futures needs Python 3.9.
+        for future in self._pending:
+            future.cancel()
+
+        self._executor.shutdown()
+
+    def submit(self, records: List[Dict[str, Any]]) -> None:
+        """ Queues a page of records to be transformed """
+
+        if records:
+            self._pending.append(self._executor.submit(_transform_page, records))
+
+    def results(
+        self, wait: bool = False
+    ) -> Generator[List[Dict[str, Any]], None, None]:
+        """Yields transformed pages in the order they were submitted - those
+        that are done, and those needed to bound the pages queued, unless
+        `wait`ing for all of them
+        """
+
+        while self._pending and (
+            wait
+            or self._pending[0].done()
+            or len(self._pending) > self.max_pending
+        ):
+            result = self._pending.popleft().result()
+
+            self.transformer.removed.update(result.removed)
+            self.transformer.filtered.update(result.filtered)
+            self.transformer.number_failures.update(result.number_failures)
+
+            if result.transformed is None:
+                raise SchemaMismatch(result.errors)
+
+            self.transformer.record_timing(
+                self.tap_stream_id, result.seconds, len(result.transformed)
+            )
+
+            yield result.transformed
+
+
+def get_transform_processes(tap_stream_id: str) -> Optional[int]:
+    """ The number of processes to transform a stream's pages in, if any """
+
+    processes = TAP_CONFIG.transform_processes
+    streams = TAP_CONFIG.transform_process_streams
+
+    if not processes or processes < 2:
+        return None
+    if streams is not None and tap_stream_id not in streams:
+        return None
+
+    return processes
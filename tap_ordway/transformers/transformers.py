@@ -1,6 +1,6 @@
 from typing import Any, Dict
 from ..base import DataContext
-from .base import RecordTransformer
+from .base import HeaderField, LineField, LineItemTransformer, RecordTransformer
 
 
 class BillingScheduleTransformer(RecordTransformer):
@@ -32,171 +32,136 @@ class CustomerTransformer(RecordTransformer):
         return data
 
 
-class InvoiceTransformer(RecordTransformer):
-    def pre_transform(self, data: Dict[str, Any], context: DataContext):
-        super().pre_transform(data, context)
-
-        invoice_lines = data.get("line_items", [])
-
-        for invoice_line in invoice_lines:
-            invoice_line.update(
-                {
-                    "invoice_id": data.get("invoice_id"),
-                    "company_id": data.get("company_id"),
-                    "invoice_line_no": invoice_line.get("line_no"),
-                    "customer_id": data.get("customer_id"),
-                    "billing_contact": data.get("billing_contact"),
-                    "shipping_contact": data.get("shipping_contact"),
-                    "customer_name": data.get("customer_name"),
-                    "invoice_date": data.get("invoice_date"),
-                    "due_date": data.get("due_date"),
-                    "billing_run_id": data.get("billing_run_id"),
-                    "subtotal": data.get("subtotal"),
-                    "invoice_tax": data.get("invoice_tax"),
-                    "invoice_amount": data.get("invoice_amount"),
-                    "paid_amount": data.get("paid_amount"),
-                    "balance": data.get("balance"),
-                    "status": data.get("status"),
-                    "notes": data.get("notes"),
-                    "currency": data.get("currency"),
-                    "payment_terms": data.get("payment_terms"),
-                    "start_date": data.get("start_date"),
-                    "end_date": data.get("end_date"),
-                    "applied_tiers": invoice_line.get("applied_tiers"),
-                    "custom_fields": data.get("custom_fields"),
-                    "line_custom_fields": invoice_line.get("custom_fields"),
-                    "updated_date": data.get("updated_date"),
-                    "created_date": data.get("created_date"),
-                    "created_by": data.get("created_by"),
-                    "updated_by": data.get("updated_by"),
-                    "invoice_pdf_url":data.get("invoice_pdf_url"),
-                    "exchange_rate":data.get("exchange_rate"),
-                    "emailed":data.get("emailed"),
-                    "reversal_email":data.get("reversal_email"),
-                    "payment_term_id":data.get("payment_term_id")
-                }
-            )
-
-            yield invoice_line
-
-
-class OrderTransformer(RecordTransformer):
-    def pre_transform(self, data: Dict[str, Any], context: DataContext):
-        super().pre_transform(data, context)
-
-        order_lines = data.get("line_items", [])
-        for order_line in order_lines:
-            order_line.update(
-                {
-                    "order_id": data.get("order_id"),
-                    "company_id": data.get("company_id"),
-                    "order_line_no": order_line.get("line_no"),
-                    "customer_id": data.get("customer_id"),
-                    "invoice_id": data.get("invoice_id"),
-                    "order_date": data.get("order_date"),
-                    "status": data.get("status"),
-                    "order_amount": data.get("order_amount"),
-                    "separate_invoice": data.get("separate_invoice"),
-                    "currency": data.get("currency"),
-                    "notes": data.get("notes"),
-                    "created_by": data.get("created_by"),
-                    "updated_by": data.get("updated_by"),
-                    "created_date": data.get("created_date"),
-                    "updated_date": data.get("updated_date"),
-                    "custom_fields": data.get("custom_fields"),
-                    "estimated_tax": data.get("estimated_tax"),
-                    "exchange_rate": data.get("exchange_rate"),
-                }
-            )
-
-            del order_line["line_no"]
-
-            yield order_line
+class InvoiceTransformer(LineItemTransformer):
+    lines_property = "line_items"
+    fields = (
+        "invoice_id",
+        "company_id",
+        LineField("invoice_line_no", "line_no"),
+        "customer_id",
+        "billing_contact",
+        "shipping_contact",
+        "customer_name",
+        "invoice_date",
+        "due_date",
+        "billing_run_id",
+        "subtotal",
+        "invoice_tax",
+        "invoice_amount",
+        "paid_amount",
+        "balance",
+        "status",
+        "notes",
+        "currency",
+        "payment_terms",
+        "start_date",
+        "end_date",
+        LineField("applied_tiers", "applied_tiers"),
+        "custom_fields",
+        LineField("line_custom_fields", "custom_fields"),
+        "updated_date",
+        "created_date",
+        "created_by",
+        "updated_by",
+        "invoice_pdf_url",
+        "exchange_rate",
+        "emailed",
+        "reversal_email",
+        "payment_term_id",
+    )
+
+
+class OrderTransformer(LineItemTransformer):
+    lines_property = "line_items"
+    fields = (
+        "order_id",
+        "company_id",
+        LineField("order_line_no", "line_no"),
+        "customer_id",
+        "invoice_id",
+        "order_date",
+        "status",
+        "order_amount",
+        "separate_invoice",
+        "currency",
+        "notes",
+        "created_by",
+        "updated_by",
+        "created_date",
+        "updated_date",
+        "custom_fields",
+        "estimated_tax",
+        "exchange_rate",
+    )
+    excluded_line_fields = ("line_no",)
 
 
 # May want to eventually change to
 # simply keep subscriptions since we
 # already have a plan stream
-class SubscriptionTransformer(RecordTransformer):
-    def pre_transform(self, data: Dict[str, Any], context: DataContext):
-        super().pre_transform(data, context)
-
-        subscription_plans = data.get("plans", [])
-
-        for subscription_plan in subscription_plans:
-            subscription_plan.update(
-                {
-                    "subscription_id": data.get("subscription_id"),
-                    "company_id": data.get("company_id"),
-                    "customer_id": data.get("customer_id"),
-                    "bill_contact_id": data.get("bill_contact_id"),
-                    "shipping_contact_id": data.get("shipping_contact_id"),
-                    "status": data.get("status"),
-                    "billing_start_date": data.get("billing_start_date"),
-                    "service_start_date": data.get("service_start_date"),
-                    "order_placed_at": data.get("order_placed_at"),
-                    "contract_effective_date": data.get("contract_effective_date"),
-                    "cancellation_date": data.get("cancellation_date"),
-                    "auto_renew": data.get("auto_renew"),
-                    "currency": data.get("currency"),
-                    "payment_terms": data.get("payment_terms"),
-                    "cmrr": data.get("cmrr"),
-                    "discounted_cmrr": data.get("discounted_cmrr"),
-                    "separate_invoice": data.get("separate_invoice"),
-                    "notes": data.get("notes"),
-                    "version": data.get("version"),
-                    "version_type": data.get("version_type"),
-                    "contract_term": data.get("contract_term"),
-                    "renewal_term": data.get("renewal_term"),
-                    "tcv": data.get("tcv"),
-                    "created_by": data.get("created_by"),
-                    "updated_by": data.get("updated_by"),
-                    "created_date": data.get("created_date"),
-                    "updated_date": data.get("updated_date"),
-                    "custom_fields": data.get("custom_fields"),
-                    "charge_custom_fields": subscription_plan.get("custom_fields"),
-                    "transaction_posting_entries": subscription_plan.get("transaction_posting_entries"),
-                    "bill_contact_sf_id": data.get("bill_contact_sf_id"),
-                    "shipping_contact_sf_id": data.get("shipping_contact_sf_id"),
-                    "pause_effective_date": data.get("pause_effective_date"),
-                    "resume_effective_date": data.get("resume_effective_date"),
-                    "pause_by_type": data.get("pause_by_type"),
-                    "resume_by_type": data.get("resume_by_type"),
-                    "exchange_rate": data.get("exchange_rate")
-                }
-            )
-
-            yield subscription_plan
-
-class DebitMemoTransformer(RecordTransformer):
-    def pre_transform(self, data: Dict[str, Any], context: DataContext):
-        super().pre_transform(data, context)
-
-        debit_lines = data.get("debit_lines", [])
-
-        for debit_memo_line in debit_lines:
-            debit_memo_line.update(
-                {
-                    "debit_memo_id": str(data.get("debit_memo_id")),
-                    "company_id": str(data.get("company_id")),
-                    "customer_id": str(data.get("customer_id")),
-                    "billing_contact": data.get("billing_contact"),
-                    "shipping_contact": data.get("shipping_contact"),
-                    "debit_date": str(data.get("debit_date")),
-                    "subtotal": (data.get("subtotal")),
-                    "debit_amount": (data.get("debit_amount")),
-                    "debit_tax": (data.get("debit_tax")),
-                    "paid_amount": (data.get("paid_amount")),
-                    "balance": (data.get("balance")),
-                    "status": str(data.get("status")),
-                    "notes": str(data.get("notes")),
-                    "currency": str(data.get("currency")),
-                    "custom_fields": data.get("custom_fields"),
-                    "updated_date": str(data.get("updated_date")),
-                    "created_date": str(data.get("created_date")),
-                    "created_by": str(data.get("created_by")),
-                    "updated_by": str(data.get("updated_by")),
-                }
-            )
-
-            yield debit_memo_line
+class SubscriptionTransformer(LineItemTransformer):
+    lines_property = "plans"
+    fields = (
+        "subscription_id",
+        "company_id",
+        "customer_id",
+        "bill_contact_id",
+        "shipping_contact_id",
+        "status",
+        "billing_start_date",
+        "service_start_date",
+        "order_placed_at",
+        "contract_effective_date",
+        "cancellation_date",
+        "auto_renew",
+        "currency",
+        "payment_terms",
+        "cmrr",
+        "discounted_cmrr",
+        "separate_invoice",
+        "notes",
+        "version",
+        "version_type",
+        "contract_term",
+        "renewal_term",
+        "tcv",
+        "created_by",
+        "updated_by",
+        "created_date",
+        "updated_date",
+        "custom_fields",
+        LineField("charge_custom_fields", "custom_fields"),
+        LineField("transaction_posting_entries", "transaction_posting_entries"),
+        "bill_contact_sf_id",
+        "shipping_contact_sf_id",
+        "pause_effective_date",
+        "resume_effective_date",
+        "pause_by_type",
+        "resume_by_type",
+        "exchange_rate",
+    )
+
+
+class DebitMemoTransformer(LineItemTransformer):
+    lines_property = "debit_lines"
+    fields = (
+        HeaderField("debit_memo_id", str),
+        HeaderField("company_id", str),
+        HeaderField("customer_id", str),
+        "billing_contact",
+        "shipping_contact",
+        HeaderField("debit_date", str),
+        "subtotal",
+        "debit_amount",
+        "debit_tax",
+        "paid_amount",
+        "balance",
+        HeaderField("status", str),
+        HeaderField("notes", str),
+        HeaderField("currency", str),
+        "custom_fields",
+        HeaderField("updated_date", str),
+        HeaderField("created_date", str),
+        HeaderField("created_by", str),
+        HeaderField("updated_by", str),
+    )
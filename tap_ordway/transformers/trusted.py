@@ -0,0 +1,266 @@
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from singer import get_logger
+import tap_ordway.configs as TAP_CONFIG
+from .compiled import (
+    CompiledSchema,
+    Converter,
+    HookFactory,
+    SchemaCompiler,
+    compile_metadata_filter,
+)
+
+if TYPE_CHECKING:
+    from .base import CompiledSchemaTransformer
+
+LOGGER = get_logger()
+
+# Python types kept as they are by the conversion of a lone JSON schema type,
+# with no pre_hook or transformer_prehook - empty strings aside
+_VERBATIM_TYPES = {"string": str, "boolean": bool, "integer": int}
+
+# Converters share a signature, even when they only need the data
+# pylint: disable=unused-argument
+
+
+def _pass_through(data, path, transformer):
+    return True, data
+
+
+def _pass_object(data, path, transformer):
+    return isinstance(data, dict), data
+
+
+def _pass_array(data, path, transformer):
+    return isinstance(data, list), data
+
+
+def _compile_coercer(compiler: SchemaCompiler, schema: Dict[str, Any]) -> Converter:
+    """Compiles a property's coercion - converting scalars like its compiled
+    converter would, and leaving the contents of objects and arrays as they are
+    """
+
+    if "anyOf" in schema or "type" not in schema:
+        return _pass_through
+
+    types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+    # Null is tried last, as it is by the compiled converters
+    types = [typ for typ in types if typ != "null"] + [
+        typ for typ in types if typ == "null"
+    ]
+
+    coercers = [
+        compiler.compile_scalar(typ, schema)
+        or (_pass_object if typ == "object" else _pass_array)
+        for typ in types
+    ]
+
+    if len(coercers) == 1:
+        return coercers[0]
+
+    def coerce(data, path, transformer):
+        for coerce_type in coercers:
+            success, value = coerce_type(data, path, transformer)
+
+            if success:
+                return success, value
+
+        return False, None
+
+    return coerce
+
+
+def _get_verbatim_type(schema: Dict[str, Any]) -> Optional[type]:
+    if "anyOf" in schema or "type" not in schema:
+        return None
+
+    types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+    types = [typ for typ in types if typ != "null"]
+
+    if len(types) != 1 or schema.get("format") in ("date-time", "singer.decimal"):
+        return None
+
+    return _VERBATIM_TYPES.get(types[0])
+
+
+class Projection:
+    """Projects a record onto a stream's selected properties, coercing their
+    values to the schema's types without validating nested values or
+    recording removed paths
+
+    Values of the Python type their property converts to in `verbatim` are
+    kept as they are, without being coerced.
+    """
+
+    def __init__(self, coercers: Dict[str, Converter], verbatim: Dict[str, type]):
+        self.coercers = coercers
+        self.verbatim = verbatim
+
+    def __call__(self, data: Dict[str, Any], transformer) -> Optional[Dict[str, Any]]:
+        """ The projected record - None if a value can't be coerced """
+
+        coercers = self.coercers
+        verbatim = self.verbatim
+        result = {}
+
+        for key, value in data.items():
+            # Exact types, as bools are ints too
+            if value.__class__ is verbatim.get(key) and value != "":
+                result[key] = value
+                continue
+
+            coerce = coercers.get(key)
+
+            if coerce is None:
+                continue
+
+            success, result[key] = coerce(value, None, transformer)
+
+            if not success:
+                return None
+
+        return result
+
+
+def compile_projection(  # pylint: disable=too-many-positional-arguments
+    schema: Dict[str, Any],
+    metadata: Optional[Dict[Tuple[str, ...], Dict[str, Any]]],
+    selected_properties: Optional[List[str]],
+    hook_factory: HookFactory,
+    integer_datetime_fmt: str,
+    keep_verbatim: bool,
+) -> Optional[Projection]:
+    """Compiles the projection of records onto `schema` - None if they can't
+    be projected, as the schema isn't an object's or metadata deselects
+    nested properties
+
+    Values are only `keep_verbatim`-ed without a pre_hook which alters them.
+    """
+
+    metadata_filter = compile_metadata_filter(metadata)
+
+    if metadata_filter is not None and any(parent for parent in metadata_filter.drops):
+        return None
+
+    compiler = SchemaCompiler(hook_factory, integer_datetime_fmt)
+
+    if compiler.compile_properties(schema) is None:
+        return None
+
+    properties = {
+        key: subschema
+        for key, subschema in schema["properties"].items()
+        if selected_properties is None or key in selected_properties
+    }
+    verbatim = {}
+
+    if keep_verbatim:
+        for key, subschema in properties.items():
+            verbatim_type = _get_verbatim_type(subschema)
+
+            if verbatim_type is not None:
+                verbatim[key] = verbatim_type
+
+    return Projection(
+        {
+            key: _compile_coercer(compiler, subschema)
+            for key, subschema in properties.items()
+        },
+        verbatim,
+    )
+
+
+class SampledValidation:
+    """Transforms a trusted stream's records - fully transforming and
+    validating one in every `interval`, and projecting the others
+
+    Sampled records are also projected, and a projection which differs from
+    the transformed record, a record which can't be projected or properties
+    missing from the schema switch the stream back to full transformation for
+    the rest of the sync.
+    """
+
+    def __init__(self, tap_stream_id: str, projection: Projection, interval: int):
+        self.tap_stream_id = tap_stream_id
+        self.projection = projection
+        self.interval = interval
+        self.trusted = True
+
+        # The first record is always sampled
+        self._until_sample = 0
+
+    def distrust(self, reason: str) -> None:
+        """ Switches the stream back to fully transforming its records """
+
+        LOGGER.warning(
+            'Stream "%s" is no longer trusted (%s) - fully transforming its '
+            "records from now on",
+            self.tap_stream_id,
+            reason,
+        )
+        self.trusted = False
+
+    def _transform_sample(
+        self,
+        record: Dict[str, Any],
+        transformer: "CompiledSchemaTransformer",
+        compiled: CompiledSchema,
+    ) -> Dict[str, Any]:
+        # Projected first, as transforming filters the record in place
+        projected = self.projection(record, transformer)
+        removed = len(transformer.removed)
+
+        transformed = transformer.transform_compiled([record], compiled)[0]
+
+        if len(transformer.removed) > removed:
+            self.distrust("properties missing from the schema")
+        elif projected != transformed:
+            self.distrust("projection mismatch")
+
+        return transformed
+
+    def transform_batch(
+        self,
+        records: List[Dict[str, Any]],
+        transformer: "CompiledSchemaTransformer",
+        compiled: CompiledSchema,
+    ) -> List[Dict[str, Any]]:
+        """ Transforms a page of records - sampled or projected, while trusted """
+
+        transformed = []
+
+        with transformer.memoize_page():
+            for index, record in enumerate(records):
+                if not self.trusted:
+                    transformed.extend(
+                        transformer.transform_compiled(records[index:], compiled)
+                    )
+                    break
+
+                if self._until_sample == 0:
+                    self._until_sample = self.interval
+                    transformed.append(
+                        self._transform_sample(record, transformer, compiled)
+                    )
+                else:
+                    projected = self.projection(record, transformer)
+
+                    if projected is None:
+                        self.distrust("value mismatch")
+                        projected = transformer.transform_compiled(
+                            [record], compiled
+                        )[0]
+
+                    transformed.append(projected)
+
+                self._until_sample -= 1
+
+        return transformed
+
+
+def get_validation_interval(tap_stream_id: str) -> Optional[int]:
+    """ The interval a trusted stream's records are validated at, if trusted """
+
+    if tap_stream_id not in (TAP_CONFIG.trusted_streams or ()):
+        return None
+
+    return max(TAP_CONFIG.trusted_validation_interval, 1)
@@ -1,21 +1,68 @@
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+import os
+from functools import lru_cache
 from time import time
+import simplejson
 from inflection import underscore
 from singer.bookmarks import get_bookmark
-from singer.messages import ActivateVersionMessage, RecordMessage, write_message
-from singer.utils import now, strptime_to_utc
+from singer.messages import (
+    ActivateVersionMessage,
+    Message,
+    RecordMessage,
+    SchemaMessage,
+    StateMessage,
+)
+from singer.messages import write_message as singer_write_message
+from singer.utils import now
 import tap_ordway.configs
+from .datetimes import parse_datetime
 
 if TYPE_CHECKING:
     from datetime import datetime
     from .streams.base import StreamABC
 
 
+@lru_cache(maxsize=32)
+def _underscore_company(company: str) -> str:
+    return underscore(company)
+
+
 def get_company_id():
     """ Gets the configured company ID """
 
     api_credentials = tap_ordway.configs.api_credentials
-    return underscore(api_credentials["company"])
+    return _underscore_company(api_credentials["company"])
+
+
+def write_message(message: Message) -> None:
+    """Writes a Singer message to stdout - through the configured
+    message writer, if any, and namespaced by company when syncing several
+    """
+
+    namespace = tap_ordway.configs.company_namespace
+    if namespace is not None:
+        message = namespace.apply(message)
+
+    writer = tap_ordway.configs.message_writer
+
+    if writer is None:
+        singer_write_message(message)
+    else:
+        writer.write(message)
+
+
+def write_schema(
+    stream_name: str, schema: Dict[str, Any], key_properties: Sequence[str]
+) -> None:
+    """ Writes a SCHEMA message to stdout """
+
+    write_message(SchemaMessage(stream_name, schema, list(key_properties)))
+
+
+def write_state(state: Dict[str, Any]) -> None:
+    """ Writes a STATE message to stdout """
+
+    write_message(StateMessage(state))
 
 
 def print_record(
@@ -28,6 +75,19 @@ def print_record(
     )  # pragma: no cover
 
 
+def write_json(path: str, obj: Any) -> None:
+    """ Atomically writes `obj` as JSON """
+
+    tmp_path = f"{path}.tmp"
+
+    with open(tmp_path, "w") as file:
+        simplejson.dump(obj, file, use_decimal=True, indent=2)
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(tmp_path, path)
+
+
 def get_full_table_version() -> int:
     """ Generates a version for FULL_TABLE streams """
 
@@ -59,7 +119,7 @@ def get_filter_datetime(
             state, stream.tap_stream_id, stream.replication_key, filter_datetime_str
         )
 
-    filter_datetime = strptime_to_utc(filter_datetime_str)
+    filter_datetime = parse_datetime(filter_datetime_str)
 
     return filter_datetime
 
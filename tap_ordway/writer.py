@@ -0,0 +1,172 @@
+from typing import IO, TYPE_CHECKING, Deque, Generator, List, Optional
+import sys
+from collections import deque
+from contextlib import contextmanager
+from threading import Condition, Thread
+from singer import get_logger
+from singer.messages import format_message
+import tap_ordway.configs as TAP_CONFIG
+
+if TYPE_CHECKING:
+    from singer.messages import Message
+
+LOGGER = get_logger()
+
+DEFAULT_MAX_QUEUE_BYTES = 16 * 1024 * 1024
+
+
+class WriterError(Exception):
+    """ The writer thread failed while writing messages """
+
+
+# pylint: disable=too-many-instance-attributes
+class MessageWriter:
+    """Writes serialized Singer messages to `output` from a dedicated thread
+
+    Messages are serialized by the calling thread and handed to the writer
+    thread through a FIFO queue, so RECORD, STATE and ACTIVATE_VERSION
+    messages are written in exactly the order they were submitted. The queue
+    is bounded by the total size of its pending lines (Singer serializes
+    messages as ASCII, so characters equal bytes): once `max_queue_bytes` is
+    reached, `write` blocks until the writer thread catches up. A single
+    message larger than the limit is still accepted when the queue is empty.
+
+    Should the writer thread fail, the error is re-raised as a WriterError on
+    the next `write` or on `close`.
+    """
+
+    def __init__(
+        self,
+        output: Optional[IO[str]] = None,
+        max_queue_bytes: int = DEFAULT_MAX_QUEUE_BYTES,
+    ):
+        if max_queue_bytes <= 0:
+            raise ValueError("`max_queue_bytes` must be GREATER THAN 0")
+
+        self.output = sys.stdout if output is None else output
+        self.max_queue_bytes = max_queue_bytes
+
+        self._queue: Deque[str] = deque()
+        self._queued_bytes = 0
+        self._condition = Condition()
+        self._closing = False
+        self._error: Optional[BaseException] = None
+        self._thread = Thread(target=self._run, name="tap-ordway-writer", daemon=True)
+
+    @property
+    def queued_bytes(self) -> int:
+        return self._queued_bytes
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, *args):
+        try:
+            self.close()
+        except WriterError:
+            # Don't mask the exception that's already propagating
+            if exc_type is None:
+                raise
+
+            LOGGER.exception("Message writer failed during shutdown")
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def write(self, message: "Message") -> None:
+        """ Serializes `message` and queues it for writing """
+
+        self.write_line(format_message(message))
+
+    def write_line(self, line: str) -> None:
+        """ Queues an already serialized message for writing """
+
+        line = f"{line}\n"
+        size = len(line)
+
+        with self._condition:
+            while (
+                self._error is None
+                and not self._closing
+                and self._queued_bytes > 0
+                and self._queued_bytes + size > self.max_queue_bytes
+            ):
+                self._condition.wait()
+
+            self._raise_for_error()
+
+            if self._closing:
+                raise WriterError("Cannot write to a closed message writer")
+
+            self._queue.append(line)
+            self._queued_bytes += size
+            self._condition.notify_all()
+
+    def close(self) -> None:
+        """ Waits for all queued messages to be written and stops the writer thread """
+
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+
+        if self._thread.is_alive():
+            self._thread.join()
+
+        self._raise_for_error()
+
+    def _raise_for_error(self) -> None:
+        if self._error is not None:
+            raise WriterError("Message writer thread failed") from self._error
+
+    def _take_batch(self) -> List[str]:
+        with self._condition:
+            while not self._queue and not self._closing:
+                self._condition.wait()
+
+            batch = list(self._queue)
+            self._queue.clear()
+
+            return batch
+
+    def _release(self, batch: List[str]) -> None:
+        with self._condition:
+            self._queued_bytes -= sum(len(line) for line in batch)
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        try:
+            while True:
+                batch = self._take_batch()
+
+                if not batch:
+                    # Only reached once closing and fully drained
+                    break
+
+                self.output.write("".join(batch))
+                self.output.flush()
+                self._release(batch)
+        except BaseException as err:  # pylint: disable=broad-except
+            with self._condition:
+                self._error = err
+                self._queue.clear()
+                self._queued_bytes = 0
+                self._condition.notify_all()
+
+
+@contextmanager
+def use_message_writer(
+    max_queue_bytes: int = DEFAULT_MAX_QUEUE_BYTES,
+    output: Optional[IO[str]] = None,
+) -> Generator[MessageWriter, None, None]:
+    """Routes all of the tap's Singer messages through a MessageWriter
+    for the duration of the context
+    """
+
+    with MessageWriter(output, max_queue_bytes) as writer:
+        TAP_CONFIG.message_writer = writer
+
+        try:
+            yield writer
+        finally:
+            TAP_CONFIG.message_writer = None
@@ -170,3 +170,23 @@ class RequestHandlerTestCase(TestCase):
             self.mocked_get.assert_called_once_with(
                 self.request_handler, "/charges", {"sort": None, "size": 45, "page": 1}
             )
+
+    def test_fetch_pages_until_empty(self):
+        self.mocked_get.side_effect = [[{"id": 1}, {"id": 2}], {"id": 3}, []]
+
+        with patch.object(self.request_handler, "resolve_params", return_value={}):
+            pages = list(self.request_handler.fetch_pages(self.mocked_data_context))
+
+        self.assertListEqual(pages, [[{"id": 1}, {"id": 2}], [{"id": 3}]])
+        self.assertEqual(self.mocked_get.call_count, 3)
+
+    def test_fetch_page(self):
+        self.mocked_get.return_value = {"id": 3}
+
+        with patch.object(self.request_handler, "resolve_params", return_value={}):
+            page = self.request_handler.fetch_page(self.mocked_data_context, 3, size=1)
+
+        self.assertListEqual(page, [{"id": 3}])
+        self.mocked_get.assert_called_once_with(
+            self.request_handler, "/charges", {"sort": None, "size": 1, "page": 3}
+        )
@@ -6,6 +6,12 @@ from tap_ordway.streams.base import ResponseSubstream, Stream, Substream
 
 class StreamTestCase(TestCase):
     def setUp(self):
+        # Streams resolve the company ID on instantiation
+        self.api_credentials_patcher = patch.dict(
+            "tap_ordway.configs.api_credentials", {"company": "Acme"}
+        )
+        self.api_credentials_patcher.start()
+
         class TestSubstream(ResponseSubstream):
             tap_stream_id = "test_response_substream"
             key_properties = []
@@ -31,6 +37,9 @@ class StreamTestCase(TestCase):
         )
         self.test_stream = self.TestStream(self.test_catalog, {})
 
+    def tearDown(self):
+        self.api_credentials_patcher.stop()
+
     def test_instantiate_substreams(self):
         self.test_stream.instantiate_substreams(self.test_catalog)
 
@@ -62,6 +71,27 @@ class StreamTestCase(TestCase):
 
         mocked_check_replication_config.assert_called_once()
 
+    def test_get_selected_properties(self):
+        self.test_stream.schema_dict = {
+            "properties": {"id": {}, "name": {}, "custom_fields": {}, "tiers": {}}
+        }
+        self.test_stream.mapped_metadata = {
+            ("properties", "id"): {"inclusion": "automatic", "selected": False},
+            ("properties", "custom_fields"): {"selected": False},
+            ("properties", "tiers"): {"inclusion": "unsupported"},
+        }
+
+        self.assertListEqual(
+            self.test_stream._get_selected_properties(),  # pylint: disable=protected-access
+            ["id", "name"],
+        )
+
+        self.test_stream.mapped_metadata = {}
+
+        self.assertIsNone(
+            self.test_stream._get_selected_properties()  # pylint: disable=protected-access
+        )
+
     def test_check_replication_config(self):
         self.test_stream.replication_key = None
         self.assertIsNone(
@@ -113,3 +143,106 @@ class StreamTestCase(TestCase):
 
         self.assertEqual(test_stream.replication_key, "modified_at")
         self.assertEqual(test_stream.replication_method, "FULL_TABLE")
+
+    def test_sync_transforms_pages(self):
+        """Substreams should be synced for each of a page's records before the
+        page is transformed as a batch, and filtered records left out
+        """
+
+        self.test_stream.request_handler.fetch_pages.return_value = [
+            [{"id": 1}, {"id": 2}],
+            [{"id": 3}],
+        ]
+        self.test_stream.filter_hook = lambda record, _: record["id"] == 2
+
+        transformer = self.TestStream.transformer_class.return_value.__enter__.return_value
+        transformer.transform_batch.side_effect = lambda records, _: records
+
+        with patch.object(
+            self.test_stream,
+            "sync_substreams",
+            side_effect=lambda record, _: [("sub", record)],
+        ):
+            results = list(self.test_stream.sync(MagicMock()))
+
+        self.assertListEqual(
+            results,
+            [
+                ("sub", {"id": 1}),
+                ("sub", {"id": 2}),
+                ("test_stream", {"id": 1}),
+                ("sub", {"id": 3}),
+                ("test_stream", {"id": 3}),
+            ],
+        )
+
+    def test_sync_shares_substream_transformer(self):
+        """Sub-records of every parent should be transformed by one
+        transformer, exited once the stream is synced
+        """
+
+        self.test_stream.instantiate_substreams(self.test_catalog)
+        self.test_stream.request_handler.fetch_pages.return_value = [
+            [{"id": 1, "": [{"id": "a"}]}, {"id": 2, "": []}],
+            [{"id": 3, "": [{"id": "b"}]}],
+        ]
+
+        transformer = self.TestStream.transformer_class.return_value.__enter__.return_value
+        transformer.transform_batch.side_effect = lambda records, _: []
+
+        substream_transformer_class = self.TestSubstream.transformer_class
+        substream_transformer_class.reset_mock()
+        sub_transformer = substream_transformer_class.return_value.__enter__.return_value
+        sub_transformer.transform_batch.side_effect = lambda records, _: records
+
+        results = list(self.test_stream.sync(MagicMock()))
+
+        self.assertListEqual(
+            results,
+            [
+                ("test_response_substream", {"id": "a"}),
+                ("test_response_substream", {"id": "b"}),
+            ],
+        )
+        substream_transformer_class.assert_called_once_with()
+        substream_transformer_class.return_value.__exit__.assert_called_once()
+        self.assertEqual(sub_transformer.transform_batch.call_count, 3)
+        self.assertIsNone(
+            self.test_stream.substreams[0]._shared_transformer  # pylint: disable=protected-access
+        )
+
+    @patch("tap_ordway.streams.base.get_transform_processes", return_value=2)
+    @patch("tap_ordway.streams.base.TransformPool")
+    def test_sync_transforms_pages_in_processes(self, mocked_pool_class, _):
+        """Pages should be submitted to the pool, with its results emitted as
+        they're ready and the rest once all pages are fetched
+        """
+
+        self.test_stream.request_handler.fetch_pages.return_value = [
+            [{"id": 1}],
+            [{"id": 2}],
+        ]
+
+        pool = mocked_pool_class.return_value.__enter__.return_value
+        submitted = []
+        pool.submit.side_effect = submitted.append
+        pool.results.side_effect = lambda wait=False: (
+            [submitted.pop(0) for _ in list(submitted)] if wait else []
+        )
+
+        with patch.object(
+            self.test_stream,
+            "sync_substreams",
+            side_effect=lambda record, _: [("sub", record)],
+        ):
+            results = list(self.test_stream.sync(MagicMock()))
+
+        self.assertListEqual(
+            results,
+            [
+                ("sub", {"id": 1}),
+                ("sub", {"id": 2}),
+                ("test_stream", {"id": 1}),
+                ("test_stream", {"id": 2}),
+            ],
+        )
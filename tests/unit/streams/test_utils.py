@@ -80,6 +80,8 @@ class CheckDependencyConflictsTestCase(TestCase):
             )
 
 
+# Streams resolve the company ID on instantiation
+@patch.dict("tap_ordway.configs.api_credentials", {"company": "Acme"})
 class IsSubstreamTestCase(TestCase):
     def test_with_substream_instances(self):
         test_catalog = generate_catalog(
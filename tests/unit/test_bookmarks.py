@@ -0,0 +1,96 @@
+from unittest import TestCase
+from unittest.mock import MagicMock
+from tap_ordway.bookmarks import BookmarkTracker, WatermarkTracker, get_bookmark_tracker
+
+
+class BookmarkTrackerTestCase(TestCase):
+    def test_never_regresses(self):
+        bookmark = BookmarkTracker("invoices", "updated_date", {})
+
+        self.assertTrue(bookmark.update("2021-01-02T00:00:00Z"))
+        self.assertFalse(bookmark.update("2021-01-02T00:00:00Z"))
+        # Earlier, though greater as a string
+        self.assertFalse(bookmark.update("2021-01-02T01:00:00+02:00"))
+        self.assertFalse(bookmark.update("2021-01-01"))
+        self.assertTrue(bookmark.update("2021-01-02T00:00:00.5Z"))
+
+        self.assertEqual(bookmark.value, "2021-01-02T00:00:00.5Z")
+
+    def test_resumes_from_state(self):
+        state = {"bookmarks": {"invoices": {"updated_date": "2021-01-02"}}}
+        bookmark = BookmarkTracker("invoices", "updated_date", state)
+
+        self.assertFalse(bookmark.update("2021-01-01"))
+        self.assertFalse(bookmark.checkpoint(state))
+
+    def test_checkpoint(self):
+        state = {"currently_syncing": "invoices"}
+        bookmark = BookmarkTracker("invoices", "updated_date", state)
+
+        self.assertFalse(bookmark.checkpoint(state))
+
+        bookmark.update("2021-01-01")
+        bookmark.update("2021-01-03")
+        self.assertDictEqual(state, {"currently_syncing": "invoices"})
+
+        self.assertTrue(bookmark.checkpoint(state))
+        self.assertFalse(bookmark.checkpoint(state))
+        self.assertDictEqual(
+            state,
+            {
+                "currently_syncing": "invoices",
+                "bookmarks": {"invoices": {"updated_date": "2021-01-03"}},
+            },
+        )
+
+
+class WatermarkTrackerTestCase(TestCase):
+    def test_advances_through_contiguous_ranges(self):
+        state = {"bookmarks": {"invoices": {"updated_date": "2021-01-01"}}}
+        watermark = WatermarkTracker("invoices", "updated_date", state)
+        first, second, third = [watermark.open_range() for _ in range(3)]
+
+        watermark.update_range(third, "2021-01-06")
+        watermark.update_range(second, "2021-01-04")
+        watermark.update_range(second, "2021-01-03")
+
+        # Finished out of order
+        self.assertFalse(watermark.complete_range(third))
+        self.assertFalse(watermark.complete_range(second))
+        self.assertFalse(watermark.checkpoint(state))
+
+        watermark.update_range(first, "2021-01-02")
+        self.assertTrue(watermark.complete_range(first))
+        self.assertEqual(watermark.pending_ranges, 0)
+
+        self.assertTrue(watermark.checkpoint(state))
+        self.assertDictEqual(
+            state, {"bookmarks": {"invoices": {"updated_date": "2021-01-06"}}}
+        )
+
+    def test_holds_at_incomplete_range(self):
+        state = {}
+        watermark = WatermarkTracker("invoices", "updated_date", state)
+        first, second, third = [watermark.open_range() for _ in range(3)]
+
+        watermark.update_range(first, "2021-01-02")
+        watermark.update_range(second, "2021-01-04")
+        watermark.update_range(third, "2021-01-06")
+        watermark.complete_range(first)
+        watermark.complete_range(third)
+
+        self.assertTrue(watermark.checkpoint(state))
+        self.assertEqual(state["bookmarks"]["invoices"]["updated_date"], "2021-01-02")
+        self.assertEqual(watermark.pending_ranges, 2)
+
+
+def test_get_bookmark_tracker():
+    incremental = MagicMock(
+        is_valid_incremental=True,
+        tap_stream_id="invoices",
+        replication_key="updated_date",
+    )
+    full_table = MagicMock(is_valid_incremental=False)
+
+    assert get_bookmark_tracker(incremental, {}).replication_key == "updated_date"
+    assert get_bookmark_tracker(full_table, {}) is None
@@ -0,0 +1,122 @@
+from unittest import TestCase
+import json
+import os
+from tempfile import TemporaryDirectory
+from tests.utils import generate_catalog
+from tap_ordway import discover
+from tap_ordway.catalog import (
+    IndexedCatalog,
+    LazySchema,
+    get_discovery_key,
+    index_catalog,
+    read_cached_catalog,
+    write_cached_catalog,
+)
+
+
+class IndexedCatalogTestCase(TestCase):
+    def setUp(self):
+        self.catalog = generate_catalog(
+            [
+                {"tap_stream_id": "customers", "selected": True},
+                {"tap_stream_id": "plans", "selected": False},
+                {"tap_stream_id": "invoices", "selected": True},
+            ]
+        )
+
+    def test_lookups(self):
+        indexed_catalog = index_catalog(self.catalog)
+
+        self.assertIs(
+            indexed_catalog.get_stream("plans"), self.catalog.get_stream("plans")
+        )
+        self.assertIsNone(indexed_catalog.get_stream("webhooks"))
+        self.assertTrue(indexed_catalog.is_stream_selected("customers"))
+        self.assertFalse(indexed_catalog.is_stream_selected("plans"))
+        self.assertFalse(indexed_catalog.is_stream_selected("webhooks"))
+        self.assertDictEqual(
+            indexed_catalog.get_metadata_map("plans"), {(): {"selected": False}}
+        )
+
+    def test_get_selected_streams(self):
+        indexed_catalog = index_catalog(self.catalog)
+
+        for state in [{}, {"currently_syncing": "invoices"}]:
+            self.assertListEqual(
+                [
+                    stream.tap_stream_id
+                    for stream in indexed_catalog.get_selected_streams(state)
+                ],
+                [
+                    stream.tap_stream_id
+                    for stream in self.catalog.get_selected_streams(state)
+                ],
+            )
+
+    def test_index_catalog(self):
+        indexed_catalog = index_catalog(self.catalog)
+
+        self.assertIsInstance(indexed_catalog, IndexedCatalog)
+        self.assertIs(index_catalog(indexed_catalog), indexed_catalog)
+
+
+class CachedCatalogTestCase(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "catalog.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        catalog = discover()
+        write_cached_catalog(self.path, "key", catalog)
+
+        cached_catalog = read_cached_catalog(self.path, "key")
+
+        self.assertEqual(
+            json.dumps(cached_catalog.to_dict()), json.dumps(catalog.to_dict())
+        )
+        self.assertIsNone(read_cached_catalog(self.path, "other-key"))
+        self.assertIsNone(read_cached_catalog(f"{self.path}.missing", "key"))
+
+    def test_discovery_key(self):
+        schemas_dir = os.path.join(self.directory.name, "schemas")
+        module_path = os.path.join(self.directory.name, "property.py")
+        os.mkdir(schemas_dir)
+
+        for path, content in [
+            (os.path.join(schemas_dir, "plans.json"), "{}"),
+            (module_path, "KEY = 'id'"),
+        ]:
+            with open(path, "w") as file:
+                file.write(content)
+
+        paths = [schemas_dir, module_path]
+        key = get_discovery_key("1.0.0", paths)
+
+        self.assertEqual(get_discovery_key("1.0.0", paths), key)
+        self.assertNotEqual(get_discovery_key("1.0.1", paths), key)
+
+        with open(os.path.join(schemas_dir, "plans.json"), "w") as file:
+            file.write('{"type": "object"}')
+
+        self.assertNotEqual(get_discovery_key("1.0.0", paths), key)
+        key = get_discovery_key("1.0.0", paths)
+
+        with open(module_path, "w") as file:
+            file.write("KEY = 'plan_id'")
+
+        self.assertNotEqual(get_discovery_key("1.0.0", paths), key)
+
+
+def test_lazy_schema():
+    lazy_schema = LazySchema(
+        {"type": "object", "properties": {"id": {"type": "string"}}}
+    )
+
+    assert lazy_schema.selected is None
+    assert lazy_schema.to_dict()["properties"] == {"id": {"type": "string"}}
+    assert lazy_schema._schema is None  # pylint: disable=protected-access
+
+    assert lazy_schema.properties["id"].type == "string"
@@ -0,0 +1,126 @@
+from unittest import TestCase
+from unittest.mock import patch
+import os
+from tap_ordway.companies import (
+    check_companies,
+    get_company_configs,
+    get_company_directory,
+    get_company_path,
+    use_company,
+)
+from tap_ordway.utils import print_record, write_schema, write_state
+
+CONFIG = {
+    "api_key": "key",
+    "user_email": "me@example.com",
+    "user_token": "token",
+    "start_date": "2020-01-01",
+    "companies": [
+        {"company": "Acme"},
+        {"company": "Globex", "company_token": "globex", "start_date": "2021-01-01"},
+        {"company": "Initech"},
+    ],
+}
+
+
+class GetCompanyConfigsTestCase(TestCase):
+    def test_overrides_top_level_config(self):
+        company_configs = get_company_configs(CONFIG, {})
+
+        self.assertListEqual(
+            [company_config["company"] for company_config in company_configs],
+            ["Acme", "Globex", "Initech"],
+        )
+        self.assertDictEqual(
+            company_configs[1],
+            {
+                "company": "Globex",
+                "company_token": "globex",
+                "api_key": "key",
+                "user_email": "me@example.com",
+                "user_token": "token",
+                "start_date": "2021-01-01",
+            },
+        )
+
+    def test_resumes_from_currently_syncing_company(self):
+        company_configs = get_company_configs(
+            CONFIG, {"currently_syncing_company": "globex"}
+        )
+
+        self.assertListEqual(
+            [company_config["company"] for company_config in company_configs],
+            ["Globex", "Initech", "Acme"],
+        )
+
+    def test_single_company(self):
+        config = {"company": "Acme", "start_date": "2020-01-01"}
+
+        self.assertListEqual(get_company_configs(config, {}), [config])
+
+    def test_check_companies(self):
+        check_companies(CONFIG)
+
+        with self.assertRaisesRegex(ValueError, "'Acme' is missing .*api_key"):
+            check_companies(
+                {key: value for key, value in CONFIG.items() if key != "api_key"}
+            )
+
+
+@patch("tap_ordway.configs.companies", CONFIG["companies"])
+@patch("tap_ordway.utils.singer_write_message")
+class UseCompanyTestCase(TestCase):
+    def test_namespaces_messages_and_state(self, mocked_write_message):
+        state = {"companies": {"acme": {"bookmarks": {}}}}
+        company_configs = get_company_configs(CONFIG, state)
+
+        with use_company(company_configs[0], state) as company_state:
+            company_state["bookmarks"]["invoices"] = {"updated_date": "2020-01-02"}
+
+            write_schema("invoices", {}, ["id"])
+            print_record("invoices", {"id": "INV-1"})
+            write_state(company_state)
+
+            self.assertEqual(
+                get_company_directory("keys"), os.path.join("keys", "acme")
+            )
+            self.assertEqual(
+                get_company_path(os.path.join("stats", "run_stats.json")),
+                os.path.join("stats", "acme", "run_stats.json"),
+            )
+
+        with use_company(company_configs[1], state) as company_state:
+            self.assertDictEqual(company_state, {})
+
+        schema, record, state_message = [
+            call.args[0] for call in mocked_write_message.call_args_list
+        ]
+
+        self.assertEqual(schema.stream, "acme__invoices")
+        self.assertEqual(record.stream, "acme__invoices")
+        self.assertDictEqual(
+            state_message.value,
+            {
+                "currently_syncing_company": "globex",
+                "companies": {
+                    "acme": {"bookmarks": {"invoices": {"updated_date": "2020-01-02"}}},
+                    "globex": {},
+                },
+            },
+        )
+        self.assertEqual(get_company_directory("keys"), "keys")
+        self.assertEqual(get_company_path("run_stats.json"), "run_stats.json")
+
+
+@patch("tap_ordway.configs.companies", None)
+@patch("tap_ordway.utils.singer_write_message")
+class UseSingleCompanyTestCase(TestCase):
+    def test_isnt_namespaced(self, mocked_write_message):
+        state = {}
+
+        with use_company({**CONFIG, "company": "Acme"}, state) as company_state:
+            self.assertIs(company_state, state)
+
+            write_schema("invoices", {}, ["id"])
+
+        self.assertEqual(mocked_write_message.call_args.args[0].stream, "invoices")
@@ -0,0 +1,63 @@
+from unittest import TestCase
+from unittest.mock import patch
+from singer.utils import strftime, strptime_to_utc
+from tap_ordway.datetimes import (
+    _parse_iso_datetime,
+    format_datetime,
+    get_cache_stats,
+    parse_datetime,
+    string_to_datetime,
+)
+
+DATETIME_STRINGS = [
+    "2020-11-10",
+    "2020-10-16T22:51:28.129Z",
+    "2020-10-16T22:51:28Z",
+    "2020-10-16T22:51:28.123456",
+    "2020-10-16 22:51:28",
+    "2020-10-16T22:51:28.1+05:30",
+    "2020-10-16T02:51:28-07:00",
+    "2020-10-16T22:51:28.841000Z",
+    "0999-01-01",
+]
+
+
+class ParseDatetimeTestCase(TestCase):
+    def setUp(self):
+        parse_datetime.cache_clear()
+        format_datetime.cache_clear()
+
+    def test_matches_strptime_to_utc(self):
+        for value in DATETIME_STRINGS:
+            self.assertIsNotNone(_parse_iso_datetime(value), msg=value)
+            self.assertEqual(parse_datetime(value), strptime_to_utc(value), msg=value)
+            self.assertIs(parse_datetime(value).tzinfo, strptime_to_utc(value).tzinfo)
+            self.assertEqual(format_datetime(value), strftime(strptime_to_utc(value)))
+
+    def test_other_formats_fall_back_to_dateutil(self):
+        for value in ["Nov 10 2020", "2020-02-30", "2020-10-16T22:51", "20201110"]:
+            self.assertIsNone(_parse_iso_datetime(value), msg=value)
+
+        self.assertEqual(parse_datetime("Nov 10 2020"), strptime_to_utc("2020-11-10"))
+
+        with self.assertRaises(ValueError):
+            parse_datetime("2020-02-30")
+
+    def test_string_to_datetime_logs_failures(self):
+        with patch("tap_ordway.datetimes.LOGGER") as mocked_logger:
+            self.assertIsNone(string_to_datetime("nope"))
+            self.assertIsNone(string_to_datetime(["2020-11-10"]))
+            self.assertEqual(mocked_logger.warning.call_count, 2)
+
+        self.assertEqual(string_to_datetime("2020-11-10"), "2020-11-10T00:00:00.000000Z")
+
+    def test_cache_stats(self):
+        for _ in range(3):
+            format_datetime("2020-11-10")
+
+        stats = get_cache_stats()
+
+        self.assertEqual(stats["format"]["hits"], 2)
+        self.assertEqual(stats["format"]["misses"], 1)
+        self.assertAlmostEqual(stats["format"]["hit_rate"], 2 / 3)
+        self.assertEqual(stats["parse"]["misses"], 1)
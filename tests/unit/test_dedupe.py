@@ -0,0 +1,106 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+import os
+from tempfile import TemporaryDirectory
+from tap_ordway.dedupe import KeyDeduplicator, RecordDeduplicator, hash_key
+
+
+def test_hash_key():
+    assert hash_key(["INV-1", "acme"]) == hash_key(("INV-1", "acme"))
+    assert hash_key(["INV-1", "acme"]) != hash_key(["INV-1", "acme", 1])
+    assert 0 <= hash_key([None]) < 2 ** 64
+
+
+class KeyDeduplicatorTestCase(TestCase):
+    def test_detects_duplicates(self):
+        deduplicator = KeyDeduplicator(["invoice_id", "invoice_line_no"])
+
+        self.assertFalse(deduplicator.is_duplicate({"invoice_id": "INV-1", "invoice_line_no": 1}))
+        self.assertFalse(deduplicator.is_duplicate({"invoice_id": "INV-1", "invoice_line_no": 2}))
+        self.assertTrue(deduplicator.is_duplicate({"invoice_id": "INV-1", "invoice_line_no": 1}))
+        self.assertEqual(len(deduplicator), 2)
+
+    def test_keeps_updated_copies(self):
+        deduplicator = KeyDeduplicator(["payment_id"], change_property="updated_date")
+
+        self.assertFalse(deduplicator.is_duplicate({"payment_id": 1, "updated_date": "2021-01-01"}))
+        self.assertTrue(deduplicator.is_duplicate({"payment_id": 1, "updated_date": "2021-01-01"}))
+        # Updated mid-sync, so moved to a later page with its new updated_date
+        self.assertFalse(deduplicator.is_duplicate({"payment_id": 1, "updated_date": "2021-01-02"}))
+
+    def test_without_key_properties(self):
+        deduplicator = KeyDeduplicator([])
+
+        self.assertFalse(deduplicator.is_duplicate({"foo": "bar"}))
+        self.assertFalse(deduplicator.is_duplicate({"foo": "bar"}))
+
+    def test_spills_to_disk_when_over_budget(self):
+        with TemporaryDirectory() as spill_dir:
+            # Budget for ~4 keys in memory
+            deduplicator = KeyDeduplicator(["id"], max_memory_bytes=256, spill_dir=spill_dir)
+
+            for i in range(50):
+                self.assertFalse(deduplicator.is_duplicate({"id": i}))
+
+            self.assertEqual(len(os.listdir(spill_dir)), 1)
+            self.assertEqual(len(deduplicator), 50)
+
+            for i in range(50):
+                self.assertTrue(deduplicator.is_duplicate({"id": i}), msg=i)
+
+            self.assertFalse(deduplicator.is_duplicate({"id": 50}))
+
+            deduplicator.close()
+            self.assertListEqual(os.listdir(spill_dir), [])
+
+
+class RecordDeduplicatorTestCase(TestCase):
+    @patch("tap_ordway.dedupe.log_metric")
+    def test_counts_and_reports_dropped_records(self, mock_log_metric):
+        stream_def = MagicMock(
+            key_properties=["payment_id"],
+            is_valid_incremental=True,
+            replication_key="updated_date",
+        )
+
+        with RecordDeduplicator() as deduplicator:
+            self.assertFalse(deduplicator.is_duplicate("payments", {"payment_id": 1}, stream_def))
+            self.assertTrue(deduplicator.is_duplicate("payments", {"payment_id": 1}, stream_def))
+            self.assertTrue(deduplicator.is_duplicate("payments", {"payment_id": 1}, stream_def))
+            # An update picked up mid-sync
+            self.assertFalse(deduplicator.is_duplicate("payments", {"payment_id": 1, "updated_date": "2021-01-02"}, stream_def))
+            # Keys are tracked per stream
+            self.assertFalse(deduplicator.is_duplicate("refunds", {"payment_id": 1}, stream_def))
+
+            self.assertDictEqual(deduplicator.dropped, {"payments": 2, "refunds": 0})
+
+        points = {call.args[1].tags["endpoint"]: call.args[1] for call in mock_log_metric.call_args_list}
+
+        self.assertEqual(points["payments"].metric, "duplicate_record_count")
+        self.assertEqual(points["payments"].value, 2)
+        self.assertEqual(points["refunds"].value, 0)
+
+    def test_keeps_updated_copies_of_full_table_records(self):
+        invoice_lines = MagicMock(
+            key_properties=["invoice_id", "line_no"],
+            is_valid_incremental=False,
+            schema_dict={"properties": {"invoice_id": {}, "line_no": {}, "quantity": {}}},
+        )
+        plans = MagicMock(
+            key_properties=["plan_id"],
+            is_valid_incremental=False,
+            schema_dict={"properties": {"plan_id": {}, "updated_date": {}}},
+        )
+        line = {"invoice_id": "INV-1", "line_no": 1, "quantity": 1}
+        plan = {"plan_id": "PLN-1", "name": "Basic", "updated_date": "2021-01-01"}
+
+        with RecordDeduplicator() as deduplicator:
+            self.assertFalse(deduplicator.is_duplicate("invoice_lines", line, invoice_lines))
+            self.assertTrue(deduplicator.is_duplicate("invoice_lines", dict(line), invoice_lines))
+            # Updated mid-sync - told apart by its fingerprint
+            self.assertFalse(deduplicator.is_duplicate("invoice_lines", {**line, "quantity": 2}, invoice_lines))
+
+            self.assertFalse(deduplicator.is_duplicate("plans", plan, plans))
+            # Only changes marked by updated_date count
+            self.assertTrue(deduplicator.is_duplicate("plans", {**plan, "name": "Pro"}, plans))
+            self.assertFalse(deduplicator.is_duplicate("plans", {**plan, "updated_date": "2021-01-02"}, plans))
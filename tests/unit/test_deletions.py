@@ -0,0 +1,124 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+import os
+from tempfile import TemporaryDirectory
+from tap_ordway.deletions import (
+    DELETED_AT_PROPERTY,
+    CorruptKeySnapshot,
+    DeletionDetection,
+    KeySnapshot,
+)
+
+
+class KeySnapshotTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = os.path.join(self.tmp_dir.name, "plans.keys")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        KeySnapshot.from_keys({3: ["PLN-3"], 1: ["PLN-1"], 2: ["PLN-2"]}).write(
+            self.path
+        )
+        snapshot = KeySnapshot.read(self.path)
+
+        self.assertEqual(len(snapshot), 3)
+        self.assertListEqual(list(snapshot.key_hashes), [1, 2, 3])
+        self.assertListEqual(snapshot.missing_from({2: None}), [["PLN-1"], ["PLN-3"]])
+        self.assertListEqual(snapshot.missing_from({1: None, 2: None, 3: None}), [])
+
+    def test_corrupt_snapshot(self):
+        KeySnapshot.from_keys({1: ["PLN-1"]}).write(self.path)
+
+        with open(self.path, "r+b") as file:
+            file.seek(-1, os.SEEK_END)
+            file.write(b"\x00")
+
+        with self.assertRaises(CorruptKeySnapshot):
+            KeySnapshot.read(self.path)
+
+
+class DeletionDetectionTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.stream_def = MagicMock(
+            tap_stream_id="plans",
+            key_properties=["plan_id"],
+            is_valid_incremental=False,
+        )
+        self.state = {"bookmarks": {"plans": {"wrote_initial_activate_version": True}}}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @patch("tap_ordway.deletions.print_record")
+    def _sync(self, plan_ids, mock_print_record, commit=True):
+        deletion_detection = DeletionDetection(self.tmp_dir.name)
+        versionless = deletion_detection.start(self.stream_def, self.state)
+
+        if not versionless:
+            deletion_detection.fall_back("plans")
+
+        for plan_id in plan_ids:
+            self.assertTrue(deletion_detection.should_emit("plans", {"plan_id": plan_id}))
+
+        deletion_detection.emit({"plans": None if versionless else 1})
+
+        if commit:
+            deletion_detection.commit()
+
+        for call in mock_print_record.call_args_list:
+            self.assertEqual(call.kwargs["version"], None if versionless else 1)
+
+        return versionless, [call.args[1] for call in mock_print_record.call_args_list]
+
+    def test_emits_delete_markers(self):
+        versionless, deleted = self._sync(["PLN-1", "PLN-2", "PLN-3"])
+
+        self.assertFalse(versionless)
+        self.assertListEqual(deleted, [])
+
+        versionless, deleted = self._sync(["PLN-2"])
+
+        self.assertTrue(versionless)
+        self.assertListEqual(
+            sorted(record["plan_id"] for record in deleted), ["PLN-1", "PLN-3"]
+        )
+        self.assertTrue(all(record[DELETED_AT_PROPERTY] for record in deleted))
+
+        # The snapshot now only holds PLN-2
+        _, deleted = self._sync([])
+        self.assertListEqual([record["plan_id"] for record in deleted], ["PLN-2"])
+
+    def test_uncommitted_markers_are_emitted_again(self):
+        self._sync(["PLN-1", "PLN-2"])
+
+        # Interrupted before its STATE was written
+        _, deleted = self._sync(["PLN-2"], commit=False)
+        self.assertListEqual([record["plan_id"] for record in deleted], ["PLN-1"])
+
+        _, deleted = self._sync(["PLN-2"])
+        self.assertListEqual([record["plan_id"] for record in deleted], ["PLN-1"])
+
+    def test_first_run_falls_back(self):
+        self._sync(["PLN-1"])
+        self.state = {}
+
+        versionless, deleted = self._sync([])
+
+        self.assertFalse(versionless)
+        self.assertListEqual(deleted, [])
+
+    def test_extend_schema(self):
+        deletion_detection = DeletionDetection(self.tmp_dir.name)
+        schema = {"type": "object", "properties": {"plan_id": {"type": "string"}}}
+
+        extended = deletion_detection.extend_schema(self.stream_def, schema)
+
+        self.assertIn(DELETED_AT_PROPERTY, extended["properties"])
+        self.assertNotIn(DELETED_AT_PROPERTY, schema["properties"])
+
+        self.stream_def.is_valid_incremental = True
+        self.assertIs(deletion_detection.extend_schema(self.stream_def, schema), schema)
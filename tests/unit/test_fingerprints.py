@@ -0,0 +1,142 @@
+from unittest import TestCase
+from unittest.mock import MagicMock
+from decimal import Decimal
+import os
+from tempfile import TemporaryDirectory
+from tap_ordway.fingerprints import (
+    ChangeDetection,
+    CorruptFingerprintStore,
+    hash_record,
+    read_fingerprints,
+    write_fingerprints,
+)
+
+
+def test_hash_record_ignores_key_order():
+    assert hash_record({"a": 1, "b": Decimal("1.10")}) == hash_record(
+        {"b": Decimal("1.10"), "a": 1}
+    )
+    assert hash_record({"a": 1}) != hash_record({"a": 2})
+
+
+class FingerprintStoreTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = os.path.join(self.tmp_dir.name, "plans.fingerprints")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        fingerprints = {1: 2, 2 ** 64 - 1: 0, 12345: 67890}
+        write_fingerprints(self.path, fingerprints)
+
+        self.assertDictEqual(read_fingerprints(self.path), fingerprints)
+
+    def test_detects_corruption(self):
+        write_fingerprints(self.path, {1: 2, 3: 4})
+
+        with open(self.path, "r+b") as file:
+            file.seek(20)
+            file.write(b"\xff")
+
+        with self.assertRaises(CorruptFingerprintStore):
+            read_fingerprints(self.path)
+
+        with open(self.path, "wb") as file:
+            file.write(b"TOFP")
+
+        with self.assertRaises(CorruptFingerprintStore):
+            read_fingerprints(self.path)
+
+
+class ChangeDetectionTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.stream_def = MagicMock(
+            tap_stream_id="plans",
+            key_properties=["plan_id", "company_id"],
+            is_valid_incremental=False,
+        )
+        self.state = {"bookmarks": {"plans": {"wrote_initial_activate_version": True}}}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _sync(self, records, state=None):
+        change_detection = ChangeDetection(self.tmp_dir.name)
+        versionless = change_detection.start(self.stream_def, state or self.state)
+
+        if not versionless:
+            change_detection.fall_back("plans")
+
+        emitted = [
+            record
+            for record in records
+            if change_detection.should_emit("plans", record)
+        ]
+        change_detection.commit()
+
+        return versionless, emitted
+
+    def test_emits_all_records_without_store(self):
+        records = [{"plan_id": "PLN-1", "name": "a"}, {"plan_id": "PLN-2", "name": "b"}]
+
+        versionless, emitted = self._sync(records)
+
+        self.assertFalse(versionless)
+        self.assertListEqual(emitted, records)
+
+    def test_emits_only_new_or_changed_records(self):
+        self._sync([{"plan_id": "PLN-1", "name": "a"}, {"plan_id": "PLN-2", "name": "b"}])
+
+        versionless, emitted = self._sync(
+            [
+                {"plan_id": "PLN-1", "name": "a"},
+                {"plan_id": "PLN-2", "name": "changed"},
+                {"plan_id": "PLN-3", "name": "new"},
+            ]
+        )
+
+        self.assertTrue(versionless)
+        self.assertListEqual(
+            emitted,
+            [{"plan_id": "PLN-2", "name": "changed"}, {"plan_id": "PLN-3", "name": "new"}],
+        )
+
+    def test_falls_back_with_corrupt_store(self):
+        self._sync([{"plan_id": "PLN-1", "name": "a"}])
+
+        with open(os.path.join(self.tmp_dir.name, "plans.fingerprints"), "ab") as file:
+            file.write(b"garbage")
+
+        versionless, emitted = self._sync([{"plan_id": "PLN-1", "name": "a"}])
+
+        self.assertFalse(versionless)
+        self.assertEqual(len(emitted), 1)
+
+        # The store was rebuilt
+        versionless, emitted = self._sync([{"plan_id": "PLN-1", "name": "a"}])
+
+        self.assertTrue(versionless)
+        self.assertListEqual(emitted, [])
+
+    def test_falls_back_on_first_run(self):
+        self._sync([{"plan_id": "PLN-1", "name": "a"}])
+
+        versionless, emitted = self._sync(
+            [{"plan_id": "PLN-1", "name": "a"}], state={"bookmarks": {}}
+        )
+
+        self.assertFalse(versionless)
+        self.assertEqual(len(emitted), 1)
+
+    def test_only_applies_to_configured_full_table_streams(self):
+        change_detection = ChangeDetection(self.tmp_dir.name, ["customers"])
+        self.assertFalse(change_detection.is_enabled(self.stream_def))
+
+        change_detection = ChangeDetection(self.tmp_dir.name)
+        self.assertTrue(change_detection.is_enabled(self.stream_def))
+
+        self.stream_def.is_valid_incremental = True
+        self.assertFalse(change_detection.is_enabled(self.stream_def))
@@ -3,9 +3,12 @@ from unittest.mock import MagicMock, patch
 from datetime import datetime
 from pytz import UTC
 from tests.utils import generate_catalog
-from tap_ordway import filter_record, handle_record, prepare_stream
+from tap_ordway import filter_record, get_stream_version, handle_record, prepare_stream
+from tap_ordway.bookmarks import BookmarkTracker
 
 
+# Streams resolve the company ID on instantiation
+@patch.dict("tap_ordway.configs.api_credentials", {"company": "Acme"})
 class PrepareStreamTestCase(TestCase):
     @patch("tap_ordway.write_activate_version", autospec=True)
     def test_is_first_run_true_full_table(self, mock_write_activate_version):
@@ -89,6 +92,47 @@ class PrepareStreamTestCase(TestCase):
         mock_write_activate_version.assert_not_called()
 
 
+class GetStreamVersionTestCase(TestCase):
+    def test_incremental_streams_have_no_version(self):
+        self.assertIsNone(
+            get_stream_version(MagicMock(is_valid_incremental=True), state={})
+        )
+
+    @patch("tap_ordway.get_full_table_version", return_value=123)
+    def test_full_table_streams_have_a_version(self, _):
+        self.assertEqual(
+            get_stream_version(MagicMock(is_valid_incremental=False), state={}), 123
+        )
+
+    @patch("tap_ordway.get_full_table_version", return_value=123)
+    def test_trackers_decide_full_table_version(self, _):
+        stream_def = MagicMock(is_valid_incremental=False)
+        change_detection = MagicMock()
+        deletion_detection = MagicMock()
+        trackers = [change_detection, deletion_detection]
+
+        change_detection.start.return_value = True
+        deletion_detection.start.return_value = True
+        self.assertIsNone(get_stream_version(stream_def, {}, trackers))
+        change_detection.fall_back.assert_not_called()
+
+        deletion_detection.start.return_value = False
+        self.assertEqual(get_stream_version(stream_def, {}, trackers), 123)
+        change_detection.fall_back.assert_called_once_with(stream_def.tap_stream_id)
+        deletion_detection.fall_back.assert_called_once_with(stream_def.tap_stream_id)
+
+    @patch("tap_ordway.get_full_table_version", return_value=123)
+    def test_disabled_trackers_are_ignored(self, _):
+        tracker = MagicMock()
+        tracker.is_enabled.return_value = False
+
+        self.assertEqual(
+            get_stream_version(MagicMock(is_valid_incremental=False), {}, [tracker]),
+            123,
+        )
+        tracker.start.assert_not_called()
+
+
 class FilterRecordTestCase(TestCase):
     def test_update_date_none(self):
         """Ensure False is returned if updated_date is not found"""
@@ -126,84 +170,44 @@ class FilterRecordTestCase(TestCase):
 
 
 class HandleRecordTestCase(TestCase):
-    def test_with_full_table_stream(self):
-        state = handle_record(
+    @patch("tap_ordway.print_record", autospec=True)
+    def test_with_full_table_stream(self, mock_print_record):
+        handle_record(
             "foo",
             record={"bar": "biz"},
-            stream_def=MagicMock(is_valid_incremental=False, replication_key=None),
             stream_version=1234,
-            state={"foo": "bar"},
         )
 
-        self.assertDictEqual(state, {"currently_syncing": "foo", "foo": "bar"})
+        mock_print_record.assert_called_once_with("foo", {"bar": "biz"}, version=1234)
 
     def test_with_incremental_stream(self):
-        """Ensure currently_syncing is set and bookmark add/updated"""
+        """Ensure the bookmark is advanced, but only written when checkpointed"""
 
-        state = handle_record(
-            "foo",
-            record={"bar": "biz", "modified_at": "2020-01-01"},
-            stream_def=MagicMock(
-                is_valid_incremental=True, replication_key="modified_at"
-            ),
-            stream_version=1,
-            state={"foo": "bar"},
-        )
-
-        self.assertDictEqual(
-            state,
-            {
-                "currently_syncing": "foo",
-                "bookmarks": {"foo": {"modified_at": "2020-01-01"}},
-                "foo": "bar",
-            },
-        )
+        state = {"foo": "bar"}
+        bookmark = BookmarkTracker("foo", "modified_at", state)
 
-    @patch("tap_ordway.is_substream", return_value=True)
-    def test_with_incremental_substream(self, _):
-        """Ensure substreams don't set currently_syncing"""
-
-        # There's no point in setting currently_syncing
-        # substreams since we rely on the parent stream, so
-        # we can't immediately pick-up there.
-
-        state = handle_record(
+        handle_record(
             "foo",
             record={"bar": "biz", "modified_at": "2020-01-01"},
-            stream_def=MagicMock(
-                is_valid_incremental=True, replication_key="modified_at"
-            ),
             stream_version=1,
-            state={"foo": "bar"},
+            bookmark=bookmark,
         )
 
-        self.assertDictEqual(
-            state,
-            {
-                "bookmarks": {"foo": {"modified_at": "2020-01-01"}},
-                "foo": "bar",
-            },
-        )
+        self.assertEqual(bookmark.value, "2020-01-01")
+        self.assertDictEqual(state, {"foo": "bar"})
 
     def test_with_missing_replication_key(self):
-        """Ensure the bookmarks aren't touched when the replication_key
+        """Ensure the bookmark isn't touched when the replication_key
         is missing from the record
         """
 
-        state = handle_record(
+        bookmark = BookmarkTracker("foo", "modified_at", {})
+
+        handle_record(
             "foo",
             record={"bar": "biz"},
-            stream_def=MagicMock(
-                is_valid_incremental=True, replication_key="modified_at"
-            ),
             stream_version=1,
-            state={"foo": "bar"},
+            bookmark=bookmark,
         )
 
-        self.assertDictEqual(
-            state,
-            {
-                "currently_syncing": "foo",
-                "foo": "bar",
-            },
-        )
+        self.assertIsNone(bookmark.value)
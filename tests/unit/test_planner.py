@@ -0,0 +1,97 @@
+from unittest import TestCase
+from unittest.mock import MagicMock
+from datetime import datetime
+from io import StringIO
+from pytz import UTC
+from tap_ordway.planner import (
+    StreamEstimate,
+    SyncPlan,
+    _Prober,
+    plan_stream,
+    write_report,
+)
+from tap_ordway.streams.base import EndpointSubstream
+
+
+def get_stream_def(tap_stream_id, records, page_size=50, spec=None):
+    stream_def = MagicMock(spec=spec, tap_stream_id=tap_stream_id)
+    stream_def.request_handler.page_size = page_size
+    stream_def.request_handler.fetch_page.side_effect = (
+        lambda context, page, size: records[(page - 1) * size : page * size]
+    )
+
+    return stream_def
+
+
+class ProberTestCase(TestCase):
+    def test_count_records(self):
+        for count in [0, 1, 2, 3, 64, 100, 1000]:
+            prober = _Prober()
+            stream_def = get_stream_def("customers", [{"id": i} for i in range(count)])
+
+            records, first_record = prober.count_records(stream_def, MagicMock())
+
+            self.assertEqual(records, count)
+            self.assertEqual(first_record, {"id": 0} if count else None)
+            # Logarithmically many requests
+            self.assertLessEqual(prober.requests, 2 * count.bit_length() + 1)
+
+
+class PlanStreamTestCase(TestCase):
+    def test_fans_out_endpoint_substreams(self):
+        payment_methods = get_stream_def(
+            "payment_methods",
+            [{"id": i} for i in range(3)],
+            page_size=2,
+            spec=EndpointSubstream,
+        )
+        contacts = MagicMock(tap_stream_id="contacts")
+        customers = get_stream_def("customers", [{"id": i} for i in range(120)])
+        customers.substreams = [payment_methods, contacts]
+
+        estimates = plan_stream(customers, datetime(2020, 1, 1, tzinfo=UTC), _Prober())
+
+        self.assertListEqual(
+            estimates,
+            [
+                StreamEstimate("customers", 120, 3, 4),
+                StreamEstimate("payment_methods", 360, 240, 360, "customers"),
+                StreamEstimate("contacts", None, 0, 0, "customers"),
+            ],
+        )
+        self.assertEqual(
+            payment_methods.request_handler.fetch_page.call_args.args[0].parent_record,
+            {"id": 0},
+        )
+
+
+class SyncPlanTestCase(TestCase):
+    def setUp(self):
+        self.sync_plan = SyncPlan(
+            [
+                StreamEstimate("customers", 120, 3, 4),
+                StreamEstimate("contacts", None, 0, 0, "customers"),
+                StreamEstimate("usages", 1000, 20, 21),
+            ],
+            10,
+            5.0,
+        )
+
+    def test_estimate_seconds(self):
+        self.assertEqual(self.sync_plan.requests, 25)
+        self.assertEqual(self.sync_plan.estimate_seconds(), 12.5)
+        self.assertEqual(self.sync_plan.estimate_seconds(concurrency=5), 2.5)
+        self.assertEqual(self.sync_plan.estimate_seconds(1, concurrency=5), 25)
+
+    def test_write_report(self):
+        report = StringIO()
+        write_report(self.sync_plan, report)
+
+        lines = report.getvalue().splitlines()
+
+        self.assertEqual(lines[0].split(), ["STREAM", "RECORDS", "PAGES", "REQUESTS"])
+        self.assertEqual(
+            lines[2].split(), ["contacts", "(via", "customers)", "-", "0", "0"]
+        )
+        self.assertEqual(lines[4].split(), ["TOTAL", "1120", "23", "25"])
+        self.assertIn("10 requests spent probing", lines[-1])
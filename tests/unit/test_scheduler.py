@@ -0,0 +1,62 @@
+from unittest import TestCase
+from unittest.mock import MagicMock
+from threading import Barrier
+from tap_ordway.scheduler import StreamScheduler, get_resumed_streams
+
+
+class StreamSchedulerTestCase(TestCase):
+    def test_syncs_streams_concurrently(self):
+        state = {}
+        scheduler = StreamScheduler(2)
+        # Both streams have to be running at once to get past the barrier
+        barrier = Barrier(2, timeout=5)
+        seen = {}
+
+        def sync_stream(tap_stream_id):
+            barrier.wait()
+
+            with scheduler.lock:
+                seen[tap_stream_id] = list(state["currently_syncing"])
+
+            barrier.wait()
+
+        scheduler.run(["invoices", "customers"], sync_stream, state)
+
+        self.assertDictEqual(
+            seen,
+            {
+                "invoices": ["customers", "invoices"],
+                "customers": ["customers", "invoices"],
+            },
+        )
+        self.assertDictEqual(state, {"currently_syncing": None})
+
+    def test_raises_first_error(self):
+        synced = []
+
+        def sync_stream(tap_stream_id):
+            if tap_stream_id == "invoices":
+                raise RuntimeError(tap_stream_id)
+
+            synced.append(tap_stream_id)
+
+        with self.assertRaisesRegex(RuntimeError, "invoices"):
+            StreamScheduler(1).run(
+                ["customers", "invoices", "payments"], sync_stream, {}
+            )
+
+        self.assertListEqual(synced, ["customers"])
+
+
+def test_get_resumed_streams():
+    streams = [MagicMock(tap_stream_id=tap_stream_id) for tap_stream_id in "abcd"]
+    catalog = MagicMock()
+    catalog.get_selected_streams.return_value = streams
+
+    assert get_resumed_streams(catalog, {}) == streams
+    assert get_resumed_streams(catalog, {"currently_syncing": ["d", "b"]}) == [
+        streams[1],
+        streams[3],
+        streams[0],
+        streams[2],
+    ]
@@ -0,0 +1,246 @@
+from unittest import TestCase
+from unittest.mock import patch
+import json
+import os
+import socket
+from datetime import datetime
+from io import StringIO
+from tempfile import TemporaryDirectory
+from pytz import UTC
+from singer.messages import RecordMessage, StateMessage
+from tests.utils import generate_catalog
+from tap_ordway.shards import (
+    Shard,
+    claim_shards,
+    finish_shards,
+    get_run_dir,
+    merge_states,
+    plan_shards,
+    read_shards,
+    replay_messages,
+    run_worker,
+    wait_for_shards,
+    write_shards,
+)
+from tap_ordway.utils import write_message, write_state
+
+CATALOG = generate_catalog(
+    [
+        {"tap_stream_id": "usages", "selected": True},
+        {
+            "tap_stream_id": "plans",
+            "selected": True,
+            "replication_method": "FULL_TABLE",
+            "replication_key": None,
+        },
+        {
+            "tap_stream_id": "charges",
+            "selected": False,
+            "replication_method": "FULL_TABLE",
+            "replication_key": None,
+        },
+    ]
+)
+
+
+def get_shard(shard_id, tap_stream_id, sync_until=None, state=None):
+    return Shard(
+        shard_id,
+        tap_stream_id,
+        [tap_stream_id],
+        state or {},
+        "updated_date" if sync_until else None,
+        sync_until,
+    )
+
+
+# Streams resolve the company ID on instantiation
+@patch.dict("tap_ordway.configs.api_credentials", {"company": "Acme"})
+class PlanShardsTestCase(TestCase):
+    @patch(
+        "tap_ordway.shards.now", return_value=datetime(2021, 1, 4, tzinfo=UTC)
+    )
+    def test_splits_windows(self, _):
+        shards = plan_shards(
+            {"start_date": "2021-01-01T00:00:00Z"},
+            {"bookmarks": {"usages": {"updated_date": "2021-01-02T00:00:00Z"}}},
+            [CATALOG.get_stream("usages"), CATALOG.get_stream("plans")],
+            CATALOG,
+            windows=2,
+            window_streams=["usages", "plans"],
+        )
+
+        self.assertListEqual(
+            [
+                (
+                    shard.shard_id,
+                    shard.tap_stream_id,
+                    shard.state["bookmarks"].get(shard.tap_stream_id),
+                    shard.sync_until,
+                )
+                for shard in shards
+            ],
+            [
+                (
+                    "shard-0000",
+                    "usages",
+                    {"updated_date": "2021-01-02T00:00:00.000000Z"},
+                    "2021-01-03T00:00:00.000000Z",
+                ),
+                (
+                    "shard-0001",
+                    "usages",
+                    {"updated_date": "2021-01-03T00:00:00.000000Z"},
+                    "2021-01-04T00:00:00.000000Z",
+                ),
+                # FULL_TABLE streams can't be windowed
+                ("shard-0002", "plans", None, None),
+            ],
+        )
+
+
+class MergeStatesTestCase(TestCase):
+    def test_merges_bookmarks(self):
+        state = {
+            "currently_syncing": "usages",
+            "bookmarks": {
+                "usages": {"updated_date": "2021-01-01T00:00:00Z"},
+                "charges": {"updated_date": "2021-01-01T00:00:00Z"},
+            },
+        }
+        shards = [
+            get_shard("shard-0000", "plans"),
+            get_shard("shard-0001", "usages", "2021-01-02T00:00:00Z"),
+            get_shard("shard-0002", "usages", "2021-01-03T00:00:00Z"),
+            get_shard("shard-0003", "usages", "2021-01-04T00:00:00Z"),
+            get_shard("shard-0004", "charges"),
+        ]
+
+        def get_result(tap_stream_id, **bookmark):
+            return {"bookmarks": {tap_stream_id: bookmark}}
+
+        merged = merge_states(
+            state,
+            shards,
+            {
+                "shard-0000": get_result("plans", wrote_initial_activate_version=True),
+                "shard-0001": get_result("usages", updated_date="2021-01-01T12:00:00Z"),
+                # A window without records keeps its start
+                "shard-0002": get_result("usages", updated_date="2021-01-02T00:00:00Z"),
+                "shard-0003": None,
+                "shard-0004": None,
+            },
+        )
+
+        self.assertDictEqual(
+            merged,
+            {
+                "currently_syncing": None,
+                "bookmarks": {
+                    "plans": {"wrote_initial_activate_version": True},
+                    "usages": {"updated_date": "2021-01-02T00:00:00Z"},
+                    "charges": {"updated_date": "2021-01-01T00:00:00Z"},
+                },
+            },
+        )
+
+    def test_windows_only_advance_in_order(self):
+        shards = [
+            get_shard("shard-0000", "usages", "2021-01-02T00:00:00Z"),
+            get_shard("shard-0001", "usages", "2021-01-03T00:00:00Z"),
+        ]
+
+        merged = merge_states(
+            {},
+            shards,
+            {
+                "shard-0000": None,
+                "shard-0001": {
+                    "bookmarks": {"usages": {"updated_date": "2021-01-02T12:00:00Z"}}
+                },
+            },
+        )
+
+        self.assertDictEqual(merged, {"currently_syncing": None, "bookmarks": {}})
+
+
+class WorkerTestCase(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.shard_dir = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_runs_and_replays_shards(self):
+        shards = [get_shard("shard-0000", "plans"), get_shard("shard-0001", "usages")]
+        write_shards(self.shard_dir, shards, "run-1")
+        run_dir = get_run_dir(self.shard_dir, "run-1")
+
+        def sync_shard(shard):
+            if shard.tap_stream_id == "usages":
+                raise RuntimeError("Ordway is down")
+
+            write_message(RecordMessage(shard.tap_stream_id, {"id": "PLN-1"}))
+            write_state({"bookmarks": {"plans": {}}})
+
+            return {"bookmarks": {"plans": {}}}
+
+        run_worker(self.shard_dir, sync_shard)
+
+        # Every shard is claimed, so another worker has nothing to do
+        run_worker(self.shard_dir, sync_shard)
+
+        results = wait_for_shards(run_dir, read_shards(self.shard_dir)[1], [])
+
+        self.assertDictEqual(
+            results, {"shard-0000": {"bookmarks": {"plans": {}}}, "shard-0001": None}
+        )
+        with open(os.path.join(run_dir, "shard-0001.error")) as file:
+            self.assertIn("Ordway is down", file.read())
+
+        with patch("sys.stdout", new_callable=StringIO) as stdout:
+            replay_messages(os.path.join(run_dir, "shard-0000.jsonl"))
+
+        self.assertListEqual(
+            [json.loads(line)["type"] for line in stdout.getvalue().splitlines()],
+            ["RECORD"],
+        )
+
+        # Published again, for a new sync
+        write_shards(self.shard_dir, shards[:1], "run-2")
+
+        self.assertListEqual(
+            sorted(os.listdir(self.shard_dir)), ["run-2", "shards.json"]
+        )
+        self.assertListEqual(os.listdir(get_run_dir(self.shard_dir, "run-2")), [])
+
+        finish_shards(self.shard_dir, "run-2")
+
+        self.assertTupleEqual(read_shards(self.shard_dir), (None, []))
+
+    def test_stops_claiming_once_sync_is_replaced(self):
+        shards = [get_shard("shard-0000", "plans"), get_shard("shard-0001", "usages")]
+        write_shards(self.shard_dir, shards, "run-1")
+
+        claimed = []
+
+        for shard in claim_shards(self.shard_dir, "run-1", shards):
+            claimed.append(shard.shard_id)
+            # A new sync is published while the worker syncs its first shard
+            write_shards(self.shard_dir, shards, "run-2")
+
+        self.assertListEqual(claimed, ["shard-0000"])
+        self.assertListEqual(os.listdir(get_run_dir(self.shard_dir, "run-2")), [])
+
+    @patch("tap_ordway.shards.sleep")
+    @patch("tap_ordway.shards.CLAIM_LEASE_SECONDS", 0.0)
+    def test_orphans_remote_claims_once_lease_expires(self, _):
+        shards = [get_shard("shard-0000", "plans")]
+        write_shards(self.shard_dir, shards, "run-1")
+        run_dir = get_run_dir(self.shard_dir, "run-1")
+
+        with open(os.path.join(run_dir, "shard-0000.claim"), "w") as file:
+            json.dump({"host": f"not-{socket.gethostname()}", "pid": 1}, file)
+
+        self.assertDictEqual(wait_for_shards(run_dir, shards, []), {"shard-0000": None})
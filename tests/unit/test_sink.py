@@ -0,0 +1,185 @@
+from unittest import TestCase
+from decimal import Decimal
+import gzip
+import json
+import os
+from tempfile import TemporaryDirectory
+from singer.messages import (
+    ActivateVersionMessage,
+    RecordMessage,
+    SchemaMessage,
+    StateMessage,
+)
+import tap_ordway.configs as TAP_CONFIG
+from tap_ordway.sink import LocalSink, _key_sort_value, use_local_sink
+from tap_ordway.utils import print_record, write_state
+
+
+def test_key_sort_value():
+    assert _key_sort_value([2, "b"]) < _key_sort_value([10, "a"])
+    assert _key_sort_value([Decimal("1.5")]) < _key_sort_value(["1"])
+    assert _key_sort_value(["a"]) < _key_sort_value([None])
+
+
+class LocalSinkTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.directory = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _read_json(self, *path):
+        with open(os.path.join(self.directory, *path)) as file:
+            return json.load(file)
+
+    def test_writes_rotating_shards_and_manifest(self):
+        with LocalSink(self.directory, max_records_per_shard=2) as sink:
+            sink.write(SchemaMessage("invoices", {"type": "object"}, ["invoice_id"]))
+
+            for invoice_id in ["INV-3", "INV-1", "INV-2"]:
+                sink.write(
+                    RecordMessage(
+                        "invoices",
+                        {"invoice_id": invoice_id, "amount": Decimal("1.10")},
+                        version=1,
+                    )
+                )
+
+            sink.write(ActivateVersionMessage("invoices", 1))
+
+        self.assertListEqual(
+            sorted(os.listdir(os.path.join(self.directory, "invoices"))),
+            ["part-00000.jsonl", "part-00001.jsonl", "schema.json"],
+        )
+
+        with open(os.path.join(self.directory, "invoices", "part-00000.jsonl")) as file:
+            lines = file.read().splitlines()
+
+        self.assertListEqual(
+            lines,
+            [
+                '{"invoice_id": "INV-3", "amount": 1.10}',
+                '{"invoice_id": "INV-1", "amount": 1.10}',
+            ],
+        )
+
+        manifest = self._read_json("manifest.json")
+        stream_manifest = manifest["streams"]["invoices"]
+
+        self.assertEqual(stream_manifest["record_count"], 3)
+        self.assertListEqual(stream_manifest["key_properties"], ["invoice_id"])
+        self.assertDictEqual(
+            stream_manifest["shards"][0],
+            {
+                "path": os.path.join("invoices", "part-00000.jsonl"),
+                "version": 1,
+                "record_count": 2,
+                "min_key": ["INV-1"],
+                "max_key": ["INV-3"],
+            },
+        )
+        self.assertEqual(stream_manifest["shards"][1]["record_count"], 1)
+
+    def test_resumed_run_continues_shards(self):
+        for run, invoice_ids in enumerate([["INV-1", "INV-2", "INV-3"], ["INV-4"]]):
+            with LocalSink(self.directory, max_records_per_shard=2) as sink:
+                sink.write(
+                    SchemaMessage("invoices", {"type": "object"}, ["invoice_id"])
+                )
+
+                if run == 0:
+                    sink.write(RecordMessage("webhooks", {"name": "foo"}))
+
+                for invoice_id in invoice_ids:
+                    sink.write(RecordMessage("invoices", {"invoice_id": invoice_id}))
+
+        self.assertListEqual(
+            sorted(os.listdir(os.path.join(self.directory, "invoices"))),
+            ["part-00000.jsonl", "part-00001.jsonl", "part-00002.jsonl", "schema.json"],
+        )
+
+        with open(os.path.join(self.directory, "invoices", "part-00000.jsonl")) as file:
+            self.assertEqual(len(file.read().splitlines()), 2)
+
+        manifest = self._read_json("manifest.json")
+        stream_manifest = manifest["streams"]["invoices"]
+
+        self.assertEqual(stream_manifest["record_count"], 4)
+        self.assertListEqual(
+            [
+                (shard["path"], shard["min_key"])
+                for shard in stream_manifest["shards"]
+            ],
+            [
+                (os.path.join("invoices", "part-00000.jsonl"), ["INV-1"]),
+                (os.path.join("invoices", "part-00001.jsonl"), ["INV-3"]),
+                (os.path.join("invoices", "part-00002.jsonl"), ["INV-4"]),
+            ],
+        )
+        self.assertEqual(manifest["streams"]["webhooks"]["record_count"], 1)
+
+    def test_activate_version_supersedes_earlier_runs(self):
+        for version, plan_ids in [(1, ["PLN-1", "PLN-2", "PLN-3"]), (2, ["PLN-1"])]:
+            with LocalSink(self.directory, max_records_per_shard=2) as sink:
+                sink.write(SchemaMessage("plans", {"type": "object"}, ["plan_id"]))
+
+                for plan_id in plan_ids:
+                    sink.write(
+                        RecordMessage("plans", {"plan_id": plan_id}, version=version)
+                    )
+
+                sink.write(ActivateVersionMessage("plans", version))
+
+        stream_manifest = self._read_json("manifest.json")["streams"]["plans"]
+
+        self.assertEqual(stream_manifest["record_count"], 1)
+        self.assertListEqual(
+            [(shard["path"], shard["version"]) for shard in stream_manifest["shards"]],
+            [(os.path.join("plans", "part-00002.jsonl"), 2)],
+        )
+        self.assertListEqual(
+            sorted(os.listdir(os.path.join(self.directory, "plans"))),
+            ["part-00002.jsonl", "schema.json"],
+        )
+
+    def test_gzip_compression(self):
+        with LocalSink(self.directory, compression="gzip") as sink:
+            sink.write(RecordMessage("webhooks", {"name": "foo"}))
+
+        path = os.path.join(self.directory, "webhooks", "part-00000.jsonl.gz")
+
+        with gzip.open(path, "rt") as file:
+            self.assertEqual(file.read(), '{"name": "foo"}\n')
+
+    def test_writes_latest_state_on_close(self):
+        with LocalSink(self.directory) as sink:
+            sink.write(StateMessage({"bookmarks": {"foo": {"updated_date": "1"}}}))
+            sink.write(StateMessage({"bookmarks": {"foo": {"updated_date": "2"}}}))
+
+        self.assertDictEqual(
+            self._read_json("state.json"),
+            {"bookmarks": {"foo": {"updated_date": "2"}}},
+        )
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            LocalSink(self.directory, compression="zip")
+
+        with self.assertRaises(ValueError):
+            LocalSink(self.directory, max_records_per_shard=0)
+
+    def test_use_local_sink_routes_tap_messages(self):
+        with use_local_sink(self.directory) as sink:
+            self.assertIs(TAP_CONFIG.message_writer, sink)
+
+            print_record("payments", {"payment_id": "PMT-1"}, version=None)
+            write_state({"currently_syncing": "payments"})
+
+        self.assertIsNone(TAP_CONFIG.message_writer)
+        self.assertEqual(
+            self._read_json("manifest.json")["streams"]["payments"]["record_count"], 1
+        )
+        self.assertDictEqual(
+            self._read_json("state.json"), {"currently_syncing": "payments"}
+        )
@@ -0,0 +1,108 @@
+from unittest import TestCase
+from unittest.mock import patch
+import os
+from tempfile import TemporaryDirectory
+from tap_ordway.stats import RunStats, StreamStats, SyncProgress
+
+
+class RunStatsTestCase(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "stats.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        run_stats = RunStats(self.path)
+        run_stats.record("usages", StreamStats(100.0, 40, 2000))
+        run_stats.write()
+
+        run_stats = RunStats(self.path).load()
+        run_stats.record("usages", StreamStats(50.0, 20, 1000))
+
+        self.assertDictEqual(
+            RunStats(self.path).load().streams,
+            {"usages": StreamStats(100.0, 40, 2000)},
+        )
+        # Averaged with the previous runs
+        self.assertEqual(run_stats.streams["usages"], StreamStats(75.0, 30, 1500))
+
+    def test_writes_into_missing_directory(self):
+        path = os.path.join(self.directory.name, "acme", "stats.json")
+        RunStats(path).write()
+
+        self.assertTrue(os.path.exists(path))
+
+    def test_ignores_unreadable_stats(self):
+        with open(self.path, "w") as file:
+            file.write('{"usages": [1, 2')
+
+        self.assertDictEqual(RunStats(self.path).load().streams, {})
+        self.assertDictEqual(RunStats(f"{self.path}.missing").load().streams, {})
+
+    def test_order_longest_first(self):
+        run_stats = RunStats(self.path)
+        run_stats.streams = {
+            "customers": StreamStats(5.0, 1, 10),
+            "usages": StreamStats(500.0, 100, 5000),
+            "plans": StreamStats(1.0, 1, 5),
+        }
+
+        self.assertListEqual(
+            run_stats.order_longest_first(
+                ["customers", "plans", "invoices", "usages", "payments"]
+            ),
+            ["invoices", "payments", "usages", "customers", "plans"],
+        )
+        self.assertListEqual(
+            run_stats.order_longest_first(
+                ["customers", "plans", "usages"], first=["plans"]
+            ),
+            ["plans", "usages", "customers"],
+        )
+
+
+class SyncProgressTestCase(TestCase):
+    def setUp(self):
+        self.run_stats = RunStats("stats.json")
+        self.run_stats.streams = {
+            "customers": StreamStats(10.0, 1, 10),
+            "usages": StreamStats(30.0, 10, 500),
+            "plans": StreamStats(20.0, 1, 5),
+        }
+
+    @patch("tap_ordway.stats.monotonic")
+    def test_estimate_seconds(self, mocked_monotonic):
+        mocked_monotonic.return_value = 0.0
+        progress = SyncProgress(self.run_stats, ["usages", "plans", "customers"], 2)
+
+        self.assertEqual(progress.estimate_seconds(), 30.0)
+
+        progress.start("usages")
+        progress.start("plans")
+        mocked_monotonic.return_value = 25.0
+
+        # 5 seconds left of usages, none of plans and all 10 of customers
+        self.assertEqual(progress.estimate_seconds(), 10.0)
+
+        progress.pending.append("invoices")
+
+        self.assertIsNone(progress.estimate_seconds())
+        self.assertIsNone(SyncProgress(None, ["usages"]).estimate_seconds())
+
+    @patch.object(RunStats, "write")
+    @patch("tap_ordway.stats.monotonic")
+    def test_finish_records_stats(self, mocked_monotonic, mocked_write):
+        mocked_monotonic.return_value = 0.0
+        progress = SyncProgress(self.run_stats, ["customers", "invoices"])
+        progress.start("invoices")
+        mocked_monotonic.return_value = 40.0
+
+        progress.finish("invoices", 4, 200)
+
+        self.assertListEqual(progress.pending, ["customers"])
+        self.assertEqual(
+            self.run_stats.streams["invoices"], StreamStats(40.0, 4, 200)
+        )
+        mocked_write.assert_called_once_with()
@@ -0,0 +1,116 @@
+from unittest import TestCase
+from unittest.mock import MagicMock
+from io import StringIO
+from threading import Event, Thread
+from singer.messages import ActivateVersionMessage, RecordMessage, StateMessage
+import tap_ordway.configs as TAP_CONFIG
+from tap_ordway.writer import MessageWriter, WriterError, use_message_writer
+
+
+class _BlockingOutput(StringIO):
+    """ A StringIO whose writes block until released """
+
+    def __init__(self):
+        super().__init__()
+        self.released = Event()
+
+    def write(self, s):
+        self.released.wait(timeout=5)
+        return super().write(s)
+
+
+class MessageWriterTestCase(TestCase):
+    def test_preserves_message_order(self):
+        output = StringIO()
+
+        with MessageWriter(output, max_queue_bytes=64) as writer:
+            writer.write(RecordMessage("foo", {"id": 1}, version=1))
+            writer.write(StateMessage({"bookmarks": {}}))
+            writer.write(ActivateVersionMessage("foo", 1))
+
+        lines = output.getvalue().splitlines()
+
+        self.assertEqual(len(lines), 3)
+        self.assertIn('"type": "RECORD"', lines[0])
+        self.assertIn('"type": "STATE"', lines[1])
+        self.assertIn('"type": "ACTIVATE_VERSION"', lines[2])
+
+    def test_write_blocks_when_queue_is_full(self):
+        """Ensure the producer can't queue more than `max_queue_bytes`
+        while the writer thread is stalled
+        """
+
+        output = _BlockingOutput()
+        writer = MessageWriter(output, max_queue_bytes=20)
+        writer.start()
+
+        writer.write_line("a" * 8)
+        writer.write_line("b" * 8)
+
+        producer = Thread(target=writer.write_line, args=("c" * 8,))
+        producer.start()
+        producer.join(timeout=0.2)
+
+        self.assertTrue(producer.is_alive())
+        self.assertEqual(writer.queued_bytes, 18)
+
+        output.released.set()
+        producer.join(timeout=5)
+        writer.close()
+
+        self.assertEqual(output.getvalue(), "aaaaaaaa\nbbbbbbbb\ncccccccc\n")
+        self.assertEqual(writer.queued_bytes, 0)
+
+    def test_accepts_oversized_message_when_empty(self):
+        output = StringIO()
+
+        with MessageWriter(output, max_queue_bytes=1) as writer:
+            writer.write_line("oversized")
+
+        self.assertEqual(output.getvalue(), "oversized\n")
+
+    def test_propagates_writer_errors(self):
+        output = MagicMock()
+        output.write.side_effect = OSError("Broken pipe")
+
+        writer = MessageWriter(output)
+        writer.start()
+        writer.write_line("foo")
+
+        with self.assertRaises(WriterError) as ctx:
+            writer.close()
+
+        self.assertIsInstance(ctx.exception.__cause__, OSError)
+
+        with self.assertRaises(WriterError):
+            writer.write_line("bar")
+
+    def test_write_after_close_raises(self):
+        writer = MessageWriter(StringIO())
+        writer.start()
+        writer.close()
+
+        with self.assertRaises(WriterError):
+            writer.write_line("foo")
+
+    def test_exit_does_not_mask_propagating_exception(self):
+        output = MagicMock()
+        output.write.side_effect = OSError("Broken pipe")
+
+        with self.assertRaises(KeyError):
+            with MessageWriter(output) as writer:
+                writer.write_line("foo")
+                raise KeyError("foo")
+
+    def test_invalid_max_queue_bytes(self):
+        with self.assertRaises(ValueError):
+            MessageWriter(StringIO(), max_queue_bytes=0)
+
+
+def test_use_message_writer_sets_global_writer():
+    assert TAP_CONFIG.message_writer is None
+
+    with use_message_writer() as writer:
+        assert TAP_CONFIG.message_writer is writer
+
+    assert TAP_CONFIG.message_writer is None
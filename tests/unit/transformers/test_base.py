@@ -1,13 +1,19 @@
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
+from copy import deepcopy
+from decimal import Decimal
+from singer.transform import SchemaMismatch
 from tap_ordway.transformers.base import (
     NO_INTEGER_DATETIME_PARSING,
     DataContext,
+    PrecisionSafeTransformer,
     RecordTransformer,
     _transform_boolean,
     _transform_string,
     transformer_prehook,
 )
+from tap_ordway.transformers.plan import TransformPlan
+from tap_ordway.transformers.trusted import SampledValidation
 
 
 def test_transform_string():
@@ -41,21 +47,46 @@ def test_tranform_prehook(mock_transform_boolean, mock_transform_string):
     assert transformer_prehook("-", "null", None) is None
 
 
+class PrecisionSafeTransformerTestCase(TestCase):
+    @patch("tap_ordway.transformers.base.LOGGER")
+    def test_log_warning_reports_number_failures(self, mocked_logger):
+        transformer = PrecisionSafeTransformer(pre_hook=transformer_prehook)
+        schema = {
+            "type": "object",
+            "properties": {
+                "lines": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"price": {"type": "number"}},
+                    },
+                }
+            },
+        }
+
+        with self.assertRaises(SchemaMismatch):
+            transformer.transform({"lines": [{"price": "x"}, {"price": "y"}]}, schema)
+
+        transformer.log_warning()
+
+        mocked_logger.warning.assert_called_once_with(
+            'Failed to convert %d value(s) of "%s" to a number', 2, "lines.price"
+        )
+
+
 class RecordTransformerTestCase(TestCase):
     def setUp(self):
         self.transformer = RecordTransformer()
 
-        self.get_company_id_patcher = patch(
-            "tap_ordway.transformers.base.get_company_id"
-        )
-        self.mocked_get_company_id = self.get_company_id_patcher.start()
-        self.mocked_get_company_id.return_value = "Sirius Cybernetics Corp"
-
         self.mocked_context = MagicMock(spec=DataContext)
         self.mocked_context.tap_stream_id = "charges"
+        self.mocked_context.stream.transform_plan = self.get_plan({})
 
-    def tearDown(self):
-        self.get_company_id_patcher.stop()
+    @staticmethod
+    def get_plan(schema, transformer_class=RecordTransformer):
+        return TransformPlan(
+            "charges", transformer_class, schema, {}, "Sirius Cybernetics Corp"
+        )
 
     def test_pre_transform_converts_ids(self):
         """A tap_stream_id of 'charges' should result in:
@@ -129,3 +160,80 @@ class RecordTransformerTestCase(TestCase):
             self.transformer.__exit__(None)
 
             self.assertEqual(mocked_log_warning.call_count, 1)
+
+    def test_transform_batch_matches_transform(self):
+        schema = {
+            "type": "object",
+            "properties": {
+                "charge_id": {"type": "string"},
+                "company_id": {"type": "string"},
+                "amount": {"type": ["null", "number"]},
+                "updated_date": {"type": ["null", "string"], "format": "date-time"},
+            },
+        }
+        self.mocked_context.stream.transform_plan = self.get_plan(schema)
+        records = [
+            {"id": "CHG-1", "amount": "1,000.50", "updated_date": "2020-01-01"},
+            {"id": "CHG-2", "amount": "1,000.50", "updated_date": "2020-01-01"},
+            {"id": "CHG-3", "amount": "-", "updated_date": ""},
+        ]
+
+        expected = [
+            record
+            for data in deepcopy(records)
+            for record in self.transformer.transform(
+                data, schema, self.mocked_context, metadata={}
+            )
+        ]
+
+        self.assertListEqual(
+            self.transformer.transform_batch(records, self.mocked_context), expected
+        )
+        self.assertEqual(expected[1]["amount"], Decimal("1000.50"))
+        self.assertEqual(expected[1]["updated_date"], "2020-01-01T00:00:00.000000Z")
+
+    def test_transform_batch_trusted_stream(self):
+        schema = {
+            "type": "object",
+            "properties": {
+                "charge_id": {"type": "string"},
+                "company_id": {"type": "string"},
+                "amount": {"type": ["null", "number"]},
+            },
+        }
+        records = [{"id": f"CHG-{index}", "amount": "1,000.50"} for index in range(5)]
+
+        self.mocked_context.stream.transform_plan = self.get_plan(schema)
+        expected = self.transformer.transform_batch(
+            deepcopy(records), self.mocked_context
+        )
+
+        self.mocked_context.stream.transform_plan.validation_interval = 2
+
+        with patch(
+            "tap_ordway.transformers.base.SampledValidation.transform_batch",
+            autospec=True,
+            side_effect=SampledValidation.transform_batch,
+        ) as mocked_transform_batch:
+            results = self.transformer.transform_batch(records, self.mocked_context)
+
+        self.assertListEqual(results, expected)
+        mocked_transform_batch.assert_called_once()
+
+    def test_transform_batch_with_generator_pre_transform(self):
+        class LineTransformer(RecordTransformer):
+            def pre_transform(self, data, context):
+                yield from data["lines"]
+
+        self.mocked_context.stream.transform_plan = self.get_plan(
+            {"type": "object", "properties": {"line_no": {"type": "integer"}}},
+            LineTransformer,
+        )
+
+        self.assertListEqual(
+            LineTransformer().transform_batch(
+                [{"lines": [{"line_no": "1"}, {"line_no": "2"}]}, {"lines": []}],
+                self.mocked_context,
+            ),
+            [{"line_no": 1}, {"line_no": 2}],
+        )
@@ -0,0 +1,303 @@
+from unittest import TestCase
+from copy import deepcopy
+from decimal import Decimal
+import random
+from singer.metadata import to_map
+from singer.transform import (
+    UNIX_MILLISECONDS_INTEGER_DATETIME_PARSING,
+    UNIX_SECONDS_INTEGER_DATETIME_PARSING,
+    SchemaMismatch,
+)
+from tap_ordway import discover
+from tap_ordway.transformers.base import (
+    CompiledSchemaTransformer,
+    PrecisionSafeTransformer,
+    transformer_prehook,
+)
+
+SAMPLE_VALUES = {
+    "string": ["foo", "", "-", 5, None],
+    "number": ["1,234.50", "0.1", 3, 2.5, "", "-", "abc", None],
+    "integer": ["1,000", 7, "", "-", "1.5", None],
+    "boolean": [True, False, "false", "-", "yes", "", None],
+    "date-time": ["2020-01-01", "2020-11-14T05:59:48.842000Z", "", "-", "nope", None],
+}
+
+
+def _sample(schema, rng, values=None):
+    """ Generates an API-like value for `schema`, valid or not """
+
+    values = SAMPLE_VALUES if values is None else values
+
+    if "anyOf" in schema:
+        return _sample(rng.choice(schema["anyOf"]), rng, values)
+
+    types = schema.get("type", ["string"])
+    types = [t for t in (types if isinstance(types, list) else [types]) if t != "null"]
+    typ = rng.choice(types or ["string"])
+
+    if typ == "object":
+        value = {
+            key: _sample(subschema, rng, values)
+            for key, subschema in schema.get("properties", {}).items()
+            if rng.random() < 0.9
+        }
+        if rng.random() < 0.1:
+            value["unknown_field"] = "surprise"
+        return value
+    if typ == "array":
+        return [
+            _sample(schema.get("items", {}), rng, values)
+            for _ in range(rng.randint(0, 3))
+        ]
+    if typ == "string" and schema.get("format") == "date-time":
+        return rng.choice(values["date-time"])
+
+    return rng.choice(values.get(typ, [None]))
+
+
+class CompiledSchemaTransformerTestCase(TestCase):
+    def assertTransformsEqual(self, data, schema, metadata=None, **kwargs):
+        expected_transformer = PrecisionSafeTransformer(**kwargs)
+        transformer = CompiledSchemaTransformer(**kwargs)
+
+        # Compiling reorders all of the schema's type lists up front, while
+        # Transformer reorders them as it goes, so the compiled transformer
+        # runs first for both to report the same schema in errors
+        try:
+            result = transformer.transform(deepcopy(data), schema, metadata)
+        except SchemaMismatch:
+            result = SchemaMismatch
+
+        try:
+            expected = expected_transformer.transform(
+                deepcopy(data), schema, deepcopy(metadata)
+            )
+        except SchemaMismatch:
+            expected = SchemaMismatch
+
+        self.assertEqual(result, expected)
+        self.assertListEqual(
+            [error.tostr() for error in transformer.errors],
+            [error.tostr() for error in expected_transformer.errors],
+        )
+        self.assertSetEqual(transformer.removed, expected_transformer.removed)
+        self.assertSetEqual(transformer.filtered, expected_transformer.filtered)
+        self.assertDictEqual(
+            dict(transformer.number_failures), dict(expected_transformer.number_failures)
+        )
+
+        return result
+
+    def test_decimal_numbers(self):
+        result = self.assertTransformsEqual(
+            {"amount": "1,234.50"},
+            {"type": "object", "properties": {"amount": {"type": ["null", "number"]}}},
+            pre_hook=transformer_prehook,
+        )
+
+        self.assertEqual(result["amount"], Decimal("1234.50"))
+        self.assertIsInstance(result["amount"], Decimal)
+
+    def test_number_failures(self):
+        schema = {
+            "type": "object",
+            "properties": {
+                "amount": {"type": ["null", "number"]},
+                "tax": {"type": ["number", "string"]},
+                "lines": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"price": {"type": ["null", "number"]}},
+                    },
+                },
+            },
+        }
+
+        transformer = CompiledSchemaTransformer(pre_hook=transformer_prehook)
+
+        for amount in ["-", "", None, "1,000"]:
+            self.assertTransformsEqual(
+                {
+                    "amount": amount,
+                    "tax": "N/A",
+                    "lines": [{"price": "free"}, {"price": "-"}, {"price": "TBD"}],
+                },
+                schema,
+                pre_hook=transformer_prehook,
+            )
+
+        with self.assertRaises(SchemaMismatch):
+            transformer.transform({"amount": "abc", "tax": "1"}, schema)
+
+        transformer.transform({"tax": "N/A", "lines": [{"price": "1.50"}]}, schema)
+
+        # Empty values are valid nulls, and strings valid for another type of
+        # the union, rather than failed numbers
+        self.assertDictEqual(dict(transformer.number_failures), {"amount": 1})
+
+    def test_any_of_number_failures(self):
+        schema = {
+            "type": "object",
+            "properties": {
+                "tax": {"anyOf": [{"type": "number"}, {"type": "string"}]},
+                "rate": {"anyOf": [{"type": "number"}, {"type": "integer"}]},
+            },
+        }
+
+        for data in [{"tax": "N/A"}, {"rate": "N/A"}, {"rate": "1"}]:
+            self.assertTransformsEqual(data, schema)
+
+        transformer = CompiledSchemaTransformer()
+        transformer.transform({"tax": "N/A"}, schema)
+
+        self.assertDictEqual(dict(transformer.number_failures), {})
+
+        with self.assertRaises(SchemaMismatch):
+            transformer.transform({"rate": "N/A"}, schema)
+
+        self.assertEqual(transformer.number_failures["rate"], 1)
+
+    def test_prehook_semantics(self):
+        schema = {
+            "type": "object",
+            "properties": {
+                "name": {"type": ["null", "string"]},
+                "active": {"type": ["null", "boolean"]},
+                "count": {"type": ["null", "integer"]},
+                "date": {"type": ["null", "string"], "format": "date-time"},
+            },
+        }
+
+        for value in ["-", "", None, "false", "3"]:
+            data = {"name": value, "active": value, "count": value, "date": value}
+
+            self.assertTransformsEqual(data, schema, pre_hook=transformer_prehook)
+            self.assertTransformsEqual(data, schema)
+
+    def test_custom_prehook(self):
+        def pre_hook(data, typ, schema):
+            return f"{data}!" if typ == "string" and schema.get("upper") else data
+
+        self.assertTransformsEqual(
+            {"a": "x", "b": "y"},
+            {
+                "type": "object",
+                "properties": {
+                    "a": {"type": "string", "upper": True},
+                    "b": {"type": "string"},
+                },
+            },
+            pre_hook=pre_hook,
+        )
+
+    def test_mismatch_errors_and_removed_paths(self):
+        schema = {
+            "type": "object",
+            "properties": {
+                "lines": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"quantity": {"type": "integer"}},
+                    },
+                },
+                "either": {"anyOf": [{"type": "integer"}, {"type": "boolean"}]},
+            },
+        }
+
+        self.assertTransformsEqual(
+            {"lines": [{"quantity": "1"}, {"quantity": "x", "extra": 1}], "either": 2},
+            schema,
+        )
+        self.assertTransformsEqual({"lines": "nope", "either": {}}, schema)
+
+    def test_pattern_properties_and_untyped_schemas(self):
+        schema = {
+            "type": "object",
+            "properties": {"raw": {}, "empty": {"type": "object"}},
+            "patternProperties": {
+                "^n_": {"type": "number"},
+                "^n_i": {"type": "integer"},
+            },
+        }
+
+        self.assertTransformsEqual(
+            {"raw": [1], "empty": {"a": 1}, "n_x": "1.5", "n_i": "2", "other": 1},
+            schema,
+        )
+
+    def test_singer_decimal_and_integer_datetimes(self):
+        schema = {
+            "type": "object",
+            "properties": {
+                "amount": {"type": "string", "format": "singer.decimal"},
+                "date": {"type": "string", "format": "date-time"},
+            },
+        }
+
+        for data in [{"amount": 1.5, "date": 1600000000}, {"amount": Decimal("sNaN")}]:
+            for integer_datetime_fmt in [
+                UNIX_SECONDS_INTEGER_DATETIME_PARSING,
+                UNIX_MILLISECONDS_INTEGER_DATETIME_PARSING,
+            ]:
+                self.assertTransformsEqual(
+                    data, schema, integer_datetime_fmt=integer_datetime_fmt
+                )
+
+    def test_metadata_filtering(self):
+        schema = {
+            "type": "object",
+            "properties": {
+                "id": {"type": "string"},
+                "name": {"type": "string"},
+                "contact": {
+                    "type": "object",
+                    "properties": {"email": {"type": "string"}},
+                },
+            },
+        }
+        metadata = {
+            ("properties", "id"): {"inclusion": "automatic", "selected": False},
+            ("properties", "name"): {"selected": False},
+            ("properties", "contact", "properties", "email"): {
+                "inclusion": "unsupported"
+            },
+        }
+
+        result = self.assertTransformsEqual(
+            {"id": "1", "name": "a", "contact": {"email": "b"}}, schema, metadata
+        )
+
+        self.assertDictEqual(result, {"id": "1", "contact": {}})
+
+    def test_catalog_schemas(self):
+        rng = random.Random(42)
+
+        for catalog_entry in discover().streams:
+            schema = catalog_entry.schema.to_dict()
+            metadata = to_map(catalog_entry.metadata)
+
+            # Deselect a property, to exercise filtering too
+            breadcrumb = ("properties", next(iter(schema["properties"])))
+            metadata[breadcrumb] = {**metadata.get(breadcrumb, {}), "selected": False}
+
+            for _ in range(20):
+                self.assertTransformsEqual(
+                    _sample(schema, rng),
+                    schema,
+                    metadata,
+                    pre_hook=transformer_prehook,
+                )
+
+    def test_compiles_once(self):
+        schema = {"type": "object", "properties": {"a": {"type": "integer"}}}
+        transformer = CompiledSchemaTransformer()
+
+        self.assertEqual(transformer.transform({"a": "1"}, schema), {"a": 1})
+
+        schema["properties"]["a"]["type"] = "string"
+
+        # The compiled schema is reused, as stream schemas don't change
+        self.assertEqual(CompiledSchemaTransformer().transform({"a": "1"}, schema), {"a": 1})
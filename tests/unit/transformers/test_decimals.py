@@ -0,0 +1,52 @@
+from decimal import Decimal
+from tap_ordway.transformers.decimals import to_decimal
+
+
+def _legacy_to_decimal(data):
+    if isinstance(data, str):
+        data = data.replace(",", "")
+
+    try:
+        return Decimal(data)
+    except:  # pylint: disable=bare-except
+        return None
+
+
+def test_to_decimal_matches_decimal():
+    for data in [
+        0,
+        -15,
+        True,
+        2.5,
+        0.1,
+        float("nan"),
+        Decimal("1.10"),
+        "1234.50",
+        "-0.001",
+        "007",
+        "1,234.50",
+        "-12,345,678",
+        "1,2,3",
+        "1,23",
+        "1e5",
+        " 12 ",
+        ".5",
+        "+3",
+        "NaN",
+        "-Infinity",
+        "1_000",
+        "",
+        "-",
+        "abc",
+        ",",
+        None,
+        [],
+        (0, (1, 4), -1),
+    ]:
+        expected = _legacy_to_decimal(data)
+        result = to_decimal(data)
+
+        if expected is None or expected.is_nan():
+            assert result is None or result.is_nan() and str(result) == str(expected)
+        else:
+            assert result == expected and str(result) == str(expected), data
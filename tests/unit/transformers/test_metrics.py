@@ -0,0 +1,134 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from collections import Counter
+from singer.transform import SchemaMismatch
+from tap_ordway.transformers import RecordTransformer
+from tap_ordway.transformers.base import CompiledSchemaTransformer
+from tap_ordway.transformers.metrics import CountingSet, get_field_name
+from tap_ordway.transformers.plan import TransformPlan
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "charge_id": {"type": "string"},
+        "company_id": {"type": "string"},
+        "amount": {"type": ["null", "number"]},
+        "lines": {
+            "type": ["null", "array"],
+            "items": {"type": "object", "properties": {"price": {"type": "number"}}},
+        },
+        "secret": {"type": ["null", "string"]},
+    },
+}
+
+
+class CountingSetTestCase(TestCase):
+    def test_counts_additions(self):
+        paths = CountingSet()
+        paths.add("new")
+        paths.add("new")
+        paths.update({"lines.0.new"}, Counter({"new": 3}))
+
+        self.assertSetEqual(paths, {"new", "lines.0.new"})
+        self.assertDictEqual(dict(paths.counts), {"new": 5, "lines.0.new": 1})
+
+        paths.clear()
+
+        self.assertSetEqual(paths, set())
+        self.assertDictEqual(dict(paths.counts), {})
+
+
+def test_get_field_name():
+    assert get_field_name(["lines", 0, "price"]) == "lines.price"
+    assert get_field_name("lines.0.price") == "lines.price"
+
+
+class TransformMetricsTestCase(TestCase):
+    def setUp(self):
+        self.context = MagicMock(
+            tap_stream_id="charges",
+            stream=MagicMock(
+                transform_plan=TransformPlan(
+                    "charges",
+                    RecordTransformer,
+                    SCHEMA,
+                    {("properties", "secret"): {"selected": False}},
+                    "acme",
+                )
+            ),
+        )
+
+    @patch("tap_ordway.transformers.metrics.log_metric")
+    def test_emits_metrics_on_exit(self, mocked_log_metric):
+        with RecordTransformer() as transformer:
+            transformer.transform_batch(
+                [
+                    {
+                        "id": f"CHG-{index}",
+                        "amount": "-",
+                        "secret": "x",
+                        "new": True,
+                        "lines": [{"price": "1", "new": True}, {"price": "1"}],
+                    }
+                    for index in range(3)
+                ],
+                self.context,
+            )
+
+            with self.assertRaises(SchemaMismatch):
+                transformer.transform_batch(
+                    [{"id": "CHG-4", "amount": "abc", "lines": [{"price": "x"}]}],
+                    self.context,
+                )
+
+        points = {
+            (call.args[1].metric, call.args[1].tags.get("field")): call.args[1]
+            for call in mocked_log_metric.call_args_list
+        }
+
+        self.assertEqual(points[("transform_record_count", None)].value, 3)
+        self.assertEqual(points[("transform_duration", None)].metric_type, "timer")
+        self.assertGreater(points[("transform_duration", None)].value, 0)
+        self.assertEqual(points[("transform_removed_count", "new")].value, 3)
+        self.assertEqual(points[("transform_removed_count", "lines.new")].value, 3)
+        self.assertEqual(points[("transform_filtered_count", "secret")].value, 3)
+        self.assertEqual(points[("transform_error_count", "amount")].value, 1)
+        self.assertEqual(points[("transform_error_count", "lines.price")].value, 1)
+        self.assertEqual(
+            points[("transform_number_failure_count", "lines.price")].value, 1
+        )
+        self.assertTrue(
+            all(point.tags["endpoint"] == "charges" for point in points.values())
+        )
+
+    @patch("tap_ordway.transformers.metrics.log_metric")
+    def test_skips_metrics_without_records(self, mocked_log_metric):
+        with RecordTransformer() as transformer:
+            transformer.transform_batch([], self.context)
+
+        mocked_log_metric.assert_not_called()
+
+    def test_transform_lines_fallback_counts_once(self):
+        transformer = CompiledSchemaTransformer()
+        compiled = transformer.get_compiled_schema(
+            {
+                "type": "object",
+                "properties": {
+                    "charge_id": {"type": "string"},
+                    "price": {"type": ["null", "number"]},
+                },
+            },
+            {},
+        )
+
+        records = transformer.transform_lines(
+            {"charge_id": "CHG-1", "new": True},
+            [({"price": "1", "extra": 1}, {}), ({"price": "abc"}, {})],
+            compiled,
+        )
+
+        self.assertIsNone(records)
+        self.assertListEqual(transformer.errors, [])
+        self.assertDictEqual(dict(transformer.removed.counts), {})
+        self.assertSetEqual(transformer.removed, set())
+        self.assertDictEqual(dict(transformer.number_failures), {})
@@ -0,0 +1,64 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+import pickle
+from tap_ordway.transformers import InvoiceTransformer, RecordTransformer
+from tap_ordway.transformers.base import CompiledSchemaTransformer, transformer_prehook
+from tap_ordway.transformers.plan import TransformPlan
+
+SCHEMA = {"type": "object", "properties": {"amount": {"type": ["null", "number"]}}}
+
+
+class TransformPlanTestCase(TestCase):
+    def test_init(self):
+        plan = TransformPlan("invoices", InvoiceTransformer, SCHEMA, {}, "acme")
+
+        self.assertEqual(plan.id_property, "invoice_id")
+        self.assertTrue(plan.pre_transform_yields)
+        self.assertIsNone(plan.selected_properties)
+
+        plan = TransformPlan("charges", RecordTransformer, SCHEMA, {}, "acme")
+
+        self.assertEqual(plan.id_property, "charge_id")
+        self.assertFalse(plan.pre_transform_yields)
+
+    @patch.dict("tap_ordway.configs.api_credentials", {"company": "AcmeCorp"})
+    def test_for_stream(self):
+        stream = MagicMock(
+            tap_stream_id="invoices",
+            transformer_class=InvoiceTransformer,
+            schema_dict=SCHEMA,
+            mapped_metadata={},
+            selected_properties=["amount"],
+        )
+
+        plan = TransformPlan.for_stream(stream)
+
+        self.assertEqual(plan.company_id, "acme_corp")
+        self.assertIs(plan.schema, SCHEMA)
+        self.assertListEqual(plan.selected_properties, ["amount"])
+
+    def test_get_compiled_schema(self):
+        plan = TransformPlan("invoices", InvoiceTransformer, SCHEMA, {}, "acme")
+        transformer = CompiledSchemaTransformer(pre_hook=transformer_prehook)
+
+        compiled = plan.get_compiled_schema(transformer)
+
+        self.assertIs(plan.get_compiled_schema(transformer), compiled)
+        self.assertIs(
+            plan.get_compiled_schema(
+                CompiledSchemaTransformer(pre_hook=transformer_prehook)
+            ),
+            compiled,
+        )
+        self.assertIsNot(
+            plan.get_compiled_schema(CompiledSchemaTransformer()), compiled
+        )
+
+    def test_pickle_drops_compiled_schemas(self):
+        plan = TransformPlan("invoices", InvoiceTransformer, SCHEMA, {}, "acme")
+        plan.get_compiled_schema(CompiledSchemaTransformer(pre_hook=transformer_prehook))
+
+        unpickled = pickle.loads(pickle.dumps(plan))
+
+        self.assertEqual(unpickled.company_id, "acme")
+        self.assertDictEqual(unpickled._compiled_schemas, {})  # pylint: disable=protected-access
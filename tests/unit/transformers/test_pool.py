@@ -0,0 +1,93 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from decimal import Decimal
+from singer.transform import SchemaMismatch
+from tap_ordway.transformers import RecordTransformer
+from tap_ordway.transformers.plan import TransformPlan
+from tap_ordway.transformers.pool import TransformPool, get_transform_processes
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "company_id": {"type": "string"},
+        "invoice_id": {"type": "string"},
+        "amount": {"type": ["null", "number"]},
+    },
+}
+
+
+class TransformPoolTestCase(TestCase):
+    def setUp(self):
+        # Only the plan is passed on to the worker processes
+        self.stream = MagicMock(
+            transformer_class=RecordTransformer,
+            tap_stream_id="invoices",
+            transform_plan=TransformPlan(
+                "invoices", RecordTransformer, SCHEMA, {}, "acme"
+            ),
+        )
+        self.transformer = RecordTransformer()
+
+    def test_results_in_order(self):
+        with TransformPool(self.stream, self.transformer, 2) as pool:
+            for index in range(10):
+                pool.submit([{"id": f"INV-{index}", "amount": "1,000", "new": True}])
+            pool.submit([])
+
+            pages = list(pool.results(wait=True))
+
+        self.assertListEqual(
+            pages,
+            [
+                [
+                    {
+                        "invoice_id": f"INV-{index}",
+                        "amount": Decimal("1000"),
+                        "company_id": "acme",
+                    }
+                ]
+                for index in range(10)
+            ],
+        )
+        self.assertSetEqual(self.transformer.removed, {"new"})
+        self.assertEqual(self.transformer.removed.counts["new"], 10)
+        self.assertEqual(self.transformer.transformed_records, 10)
+        self.assertEqual(self.transformer.tap_stream_id, "invoices")
+
+    def test_results_bounded_by_pending_pages(self):
+        with TransformPool(self.stream, self.transformer, 1) as pool:
+            for index in range(5):
+                pool.submit([{"id": f"INV-{index}"}])
+
+            # Only PAGES_PER_PROCESS pages may be left pending
+            ready = len(list(pool.results()))
+
+            self.assertGreaterEqual(ready, 3)
+            self.assertEqual(ready + len(list(pool.results(wait=True))), 5)
+
+    def test_schema_mismatch(self):
+        with TransformPool(self.stream, self.transformer, 2) as pool:
+            pool.submit([{"id": "INV-1", "amount": "abc"}])
+
+            with self.assertRaises(SchemaMismatch) as context:
+                list(pool.results(wait=True))
+
+        self.assertIn("amount", str(context.exception))
+        self.assertDictEqual(dict(self.transformer.number_failures), {"amount": 1})
+
+
+@patch("tap_ordway.transformers.pool.TAP_CONFIG")
+def test_get_transform_processes(mocked_tap_config):
+    mocked_tap_config.transform_processes = None
+    mocked_tap_config.transform_process_streams = None
+    assert get_transform_processes("invoices") is None
+
+    mocked_tap_config.transform_processes = 1
+    assert get_transform_processes("invoices") is None
+
+    mocked_tap_config.transform_processes = 4
+    assert get_transform_processes("invoices") == 4
+
+    mocked_tap_config.transform_process_streams = ["subscriptions"]
+    assert get_transform_processes("invoices") is None
+    assert get_transform_processes("subscriptions") == 4
@@ -1,5 +1,10 @@
 from unittest import TestCase
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
+from copy import deepcopy
+import random
+from singer.metadata import to_map
+from singer.transform import SchemaMismatch
+from tap_ordway import discover
 from tap_ordway.transformers import (
     BillingScheduleTransformer,
     CustomerTransformer,
@@ -7,17 +12,33 @@ from tap_ordway.transformers import (
     OrderTransformer,
     SubscriptionTransformer,
 )
+from tap_ordway.transformers.base import PrecisionSafeTransformer, transformer_prehook
+from tap_ordway.transformers.plan import TransformPlan
+from .test_compiled import _sample
+
+VALID_VALUES = {
+    "string": ["foo", "bar"],
+    "number": ["1,234.50", "0.1", None],
+    "integer": ["1,000", 7, None],
+    "boolean": [True, "false", "-", None],
+    "date-time": ["2020-01-01", "2020-11-14T05:59:48.842000Z", None],
+}
 
 
 class TransformerBaseTestCase(TestCase):
-    def setUp(self):
-        self.get_company_id_patcher = patch(
-            "tap_ordway.transformers.base.get_company_id"
+    @staticmethod
+    def get_context(tap_stream_id, transformer_class, schema=None, metadata=None):
+        plan = TransformPlan(
+            tap_stream_id,
+            transformer_class,
+            schema or {},
+            metadata or {},
+            "company",
         )
-        self.mock_get_company_id = self.get_company_id_patcher.start()
 
-    def tearDown(self):
-        self.get_company_id_patcher.stop()
+        return MagicMock(
+            tap_stream_id=tap_stream_id, stream=MagicMock(transform_plan=plan)
+        )
 
 
 class BillingScheduleTransformerTestCase(TransformerBaseTestCase):
@@ -33,7 +54,7 @@ class BillingScheduleTransformerTestCase(TransformerBaseTestCase):
                     "amount_invoiced": "5",
                 }
             },
-            MagicMock(tap_stream_id="billing_schedules"),
+            self.get_context("billing_schedules", BillingScheduleTransformer),
         )
 
         self.assertIn("company_id", results)
@@ -54,7 +75,7 @@ class CustomerTransformerTestCsae(TransformerBaseTestCase):
                 "discounted_cmrr": "-4",
                 "customer_type": "bar",
             },
-            MagicMock(tap_stream_id="customers"),
+            self.get_context("customers", CustomerTransformer),
         )
 
         self.assertIn("company_id", results)
@@ -89,7 +110,7 @@ class InvoiceTransformerTestCase(TransformerBaseTestCase):
                     }
                 ],
             },
-            MagicMock(tap_stream_id="invoices"),
+            self.get_context("invoices", InvoiceTransformer),
         )
 
         for result in results:
@@ -130,7 +151,7 @@ class OrderTransformerTestCase(TransformerBaseTestCase):
                 "created_date": "2020-01-01",
                 "line_items": [{"line_no": "1"}, {"line_no": "2"}],
             },
-            MagicMock(tap_stream_id="orders"),
+            self.get_context("orders", OrderTransformer),
         )
 
         for result in results:
@@ -174,7 +195,7 @@ class SubscriptionTransformerTestCase(TransformerBaseTestCase):
                     {"id": "PLN-002", "custom_fields": {"foo": "bar"}},
                 ],
             },
-            MagicMock(tap_stream_id="subscriptions"),
+            self.get_context("subscriptions", SubscriptionTransformer),
         )
 
         for result in results:
@@ -191,3 +212,86 @@ class SubscriptionTransformerTestCase(TransformerBaseTestCase):
             self.assertEqual(result["updated_date"], "2020-01-01")
             self.assertEqual(result["created_date"], "2020-01-01")
             self.assertDictEqual(result["charge_custom_fields"], {"foo": "bar"})
+
+
+class LineItemTransformerTestCase(TransformerBaseTestCase):
+    def assertExplodesEqual(self, transformer_class, data, catalog_entry, metadata):
+        schema = catalog_entry.schema.to_dict()
+        context = self.get_context(
+            catalog_entry.tap_stream_id, transformer_class, schema, metadata
+        )
+        transformer = transformer_class()
+        expected_transformer = PrecisionSafeTransformer(pre_hook=transformer_prehook)
+
+        try:
+            results = transformer.transform_batch([deepcopy(data)], context)
+        except SchemaMismatch:
+            results = SchemaMismatch
+
+        try:
+            expected = [
+                expected_transformer.transform(line, schema, metadata)
+                for line in transformer.pre_transform(deepcopy(data), context)
+            ]
+        except SchemaMismatch:
+            expected = SchemaMismatch
+
+        if results is SchemaMismatch or expected is SchemaMismatch:
+            self.assertIs(results, expected)
+        else:
+            # Including the order of each record's properties
+            self.assertListEqual(
+                [list(record.items()) for record in results],
+                [list(record.items()) for record in expected],
+            )
+
+        self.assertListEqual(
+            [error.tostr() for error in transformer.errors],
+            [error.tostr() for error in expected_transformer.errors],
+        )
+        self.assertSetEqual(transformer.removed, expected_transformer.removed)
+        self.assertSetEqual(transformer.filtered, expected_transformer.filtered)
+
+    def test_transform_batch_matches_pre_transform(self):
+        rng = random.Random(7)
+        catalog_entries = {entry.tap_stream_id: entry for entry in discover().streams}
+
+        for transformer_class, tap_stream_id in [
+            (InvoiceTransformer, "invoices"),
+            (OrderTransformer, "orders"),
+            (SubscriptionTransformer, "subscriptions"),
+        ]:
+            catalog_entry = catalog_entries[tap_stream_id]
+            schema = catalog_entry.schema.to_dict()
+
+            for index in range(30):
+                metadata = to_map(catalog_entry.metadata)
+
+                if index % 3 == 0:
+                    # Deselect a header property
+                    breadcrumb = ("properties", "customer_id")
+                    metadata[breadcrumb] = {**metadata[breadcrumb], "selected": False}
+                elif index % 3 == 1:
+                    # Deselect properties nested in the header and lines
+                    for breadcrumb in [
+                        ("properties", "custom_fields", "properties", "secret"),
+                        ("properties", "tax_lines", "items", "properties", "secret"),
+                    ]:
+                        metadata[breadcrumb] = {"selected": False}
+
+                # Mostly valid, so most parents take the compiled path
+                values = VALID_VALUES if index % 4 else None
+                data = _sample(schema, rng, values)
+                data["id"] = "PARENT-1"
+                data["custom_fields"] = {"secret": "x", "public": "y"}
+                data[transformer_class.lines_property] = [
+                    {
+                        **_sample(schema, rng, values),
+                        "line_no": str(line_no),
+                        "custom_fields": {"secret": "x"},
+                        "tax_lines": [{"secret": "x", "rate": "1"}],
+                    }
+                    for line_no in range(rng.randint(0, 4))
+                ]
+
+                self.assertExplodesEqual(transformer_class, data, catalog_entry, metadata)
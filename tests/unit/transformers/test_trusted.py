@@ -0,0 +1,161 @@
+from unittest import TestCase
+from unittest.mock import patch
+from copy import deepcopy
+from decimal import Decimal
+from singer.transform import SchemaMismatch
+from tap_ordway.transformers.base import CompiledSchemaTransformer, transformer_prehook
+from tap_ordway.transformers.trusted import SampledValidation, get_validation_interval
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "code": {"type": ["string"]},
+        "balance": {"type": ["null", "number"]},
+        "attempts": {"type": ["null", "integer"]},
+        "active": {"type": ["null", "boolean"]},
+        "updated_date": {"type": ["null", "string"], "format": "date-time"},
+        "custom_fields": {"type": ["null", "object"], "properties": {}},
+    },
+}
+
+RECORDS = [
+    {
+        "code": f"ACC-{index}",
+        "balance": ["1,000.50", "-", "", "7"][index % 4],
+        "attempts": ["3", None, "1,000", 2][index % 4],
+        "active": [True, "false", "-", None][index % 4],
+        "updated_date": ["2020-01-01", "", None, "2020-11-14T05:59:48.842000Z"][
+            index % 4
+        ],
+        "custom_fields": {"foo": "bar"} if index % 2 else None,
+    }
+    for index in range(10)
+]
+
+
+class SampledValidationTestCase(TestCase):
+    def setUp(self):
+        self.transformer = CompiledSchemaTransformer(pre_hook=transformer_prehook)
+        self.compiled = self.transformer.get_compiled_schema(SCHEMA, {})
+
+    def get_sampled_validation(self, interval, metadata=None, selected_properties=None):
+        projection = self.transformer.get_projection(
+            SCHEMA, metadata or {}, selected_properties
+        )
+
+        return SampledValidation("chart_of_accounts", projection, interval)
+
+    def test_matches_full_transformation(self):
+        sampled_validation = self.get_sampled_validation(3)
+
+        expected = CompiledSchemaTransformer(
+            pre_hook=transformer_prehook
+        ).transform_batch(deepcopy(RECORDS), SCHEMA, {})
+
+        with patch.object(
+            self.transformer,
+            "transform_compiled",
+            wraps=self.transformer.transform_compiled,
+        ) as mocked_transform_compiled:
+            results = sampled_validation.transform_batch(
+                deepcopy(RECORDS[:5]), self.transformer, self.compiled
+            ) + sampled_validation.transform_batch(
+                deepcopy(RECORDS[5:]), self.transformer, self.compiled
+            )
+
+        self.assertListEqual(results, expected)
+        self.assertTrue(sampled_validation.trusted)
+        # The 1st, 4th, 7th and 10th records
+        self.assertEqual(mocked_transform_compiled.call_count, 4)
+        self.assertEqual(results[0]["balance"], Decimal("1000.50"))
+
+    def test_projects_selected_properties(self):
+        metadata = {("properties", "custom_fields"): {"selected": False}}
+        sampled_validation = self.get_sampled_validation(
+            100,
+            metadata,
+            [key for key in SCHEMA["properties"] if key != "custom_fields"],
+        )
+        compiled = self.transformer.get_compiled_schema(SCHEMA, metadata)
+
+        results = sampled_validation.transform_batch(
+            [{**record, "new": 1} for record in RECORDS[1:3]],
+            self.transformer,
+            compiled,
+        )
+
+        self.assertNotIn("custom_fields", results[1])
+        self.assertNotIn("new", results[1])
+
+    def test_keeps_values_of_converted_types(self):
+        projection = self.transformer.get_projection(SCHEMA, {}, None)
+
+        self.assertDictEqual(
+            projection(
+                {"code": "ACC-1", "attempts": True, "active": "-", "balance": 1},
+                self.transformer,
+            ),
+            {"code": "ACC-1", "attempts": 1, "active": False, "balance": Decimal("1")},
+        )
+        self.assertDictEqual(
+            projection.verbatim, {"code": str, "attempts": int, "active": bool}
+        )
+        # Required strings can't be empty
+        self.assertIsNone(projection({"code": ""}, self.transformer))
+
+    def test_value_mismatch_distrusts(self):
+        sampled_validation = self.get_sampled_validation(100)
+        records = deepcopy(RECORDS[:4])
+        records[2]["attempts"] = "many"
+
+        with self.assertRaises(SchemaMismatch):
+            sampled_validation.transform_batch(records, self.transformer, self.compiled)
+
+        self.assertFalse(sampled_validation.trusted)
+
+    def test_new_properties_distrust(self):
+        sampled_validation = self.get_sampled_validation(100)
+        records = deepcopy(RECORDS[:4])
+        records[0]["new"] = True
+
+        expected = CompiledSchemaTransformer(
+            pre_hook=transformer_prehook
+        ).transform_batch(deepcopy(records), SCHEMA, {})
+
+        results = sampled_validation.transform_batch(
+            records, self.transformer, self.compiled
+        )
+
+        self.assertFalse(sampled_validation.trusted)
+        self.assertSetEqual(self.transformer.removed, {"new"})
+        self.assertListEqual(results, expected)
+
+    def test_nested_metadata_cant_be_projected(self):
+        self.assertIsNone(
+            self.transformer.get_projection(
+                SCHEMA,
+                {
+                    ("properties", "custom_fields", "properties", "foo"): {
+                        "selected": False
+                    }
+                },
+                None,
+            )
+        )
+        self.assertIsNone(
+            self.transformer.get_projection({"type": "object"}, {}, None)
+        )
+
+
+@patch("tap_ordway.transformers.trusted.TAP_CONFIG")
+def test_get_validation_interval(mocked_tap_config):
+    mocked_tap_config.trusted_streams = None
+    mocked_tap_config.trusted_validation_interval = 100
+    assert get_validation_interval("webhooks") is None
+
+    mocked_tap_config.trusted_streams = ["webhooks"]
+    assert get_validation_interval("webhooks") == 100
+    assert get_validation_interval("invoices") is None
+
+    mocked_tap_config.trusted_validation_interval = 0
+    assert get_validation_interval("webhooks") == 1